@@ -4,99 +4,113 @@ Easing Functions - Timing functions for smooth animations.
 
 Provides various easing functions for natural motion and timing.
 All functions take a value t (0.0 to 1.0) and return eased value (0.0 to 1.0).
+t may also be a NumPy array, in which case every element is eased at once;
+timing_table() precomputes the eased progress of a whole animation.
 """
 
-import math
+from functools import lru_cache
+from typing import Sequence
 
+import numpy as np
 
-def linear(t: float) -> float:
+
+TIMING_CACHE_SIZE = 64  # Cached (num_frames, easings) timing tables
+
+
+def _as_input(t: float | np.ndarray) -> np.ndarray:
+    """t as a float array, for the branchless np.where forms."""
+    return np.asarray(t, dtype=float)
+
+
+def _as_output(value: np.ndarray, t: float | np.ndarray) -> float | np.ndarray:
+    """Return a float for scalar t and an array for array t."""
+    return float(value) if np.ndim(t) == 0 else value
+
+
+def linear(t: float | np.ndarray) -> float | np.ndarray:
     """Linear interpolation (no easing)."""
     return t
 
 
-def ease_in_quad(t: float) -> float:
+def ease_in_quad(t: float | np.ndarray) -> float | np.ndarray:
     """Quadratic ease-in (slow start, accelerating)."""
     return t * t
 
 
-def ease_out_quad(t: float) -> float:
+def ease_out_quad(t: float | np.ndarray) -> float | np.ndarray:
     """Quadratic ease-out (fast start, decelerating)."""
     return t * (2 - t)
 
 
-def ease_in_out_quad(t: float) -> float:
+def ease_in_out_quad(t: float | np.ndarray) -> float | np.ndarray:
     """Quadratic ease-in-out (slow start and end)."""
-    if t < 0.5:
-        return 2 * t * t
-    return -1 + (4 - 2 * t) * t
+    x = _as_input(t)
+    return _as_output(np.where(x < 0.5, 2 * x * x, -1 + (4 - 2 * x) * x), t)
 
 
-def ease_in_cubic(t: float) -> float:
+def ease_in_cubic(t: float | np.ndarray) -> float | np.ndarray:
     """Cubic ease-in (slow start)."""
     return t * t * t
 
 
-def ease_out_cubic(t: float) -> float:
+def ease_out_cubic(t: float | np.ndarray) -> float | np.ndarray:
     """Cubic ease-out (fast start)."""
     return (t - 1) * (t - 1) * (t - 1) + 1
 
 
-def ease_in_out_cubic(t: float) -> float:
+def ease_in_out_cubic(t: float | np.ndarray) -> float | np.ndarray:
     """Cubic ease-in-out."""
-    if t < 0.5:
-        return 4 * t * t * t
-    return (t - 1) * (2 * t - 2) * (2 * t - 2) + 1
+    x = _as_input(t)
+    return _as_output(np.where(x < 0.5, 4 * x * x * x,
+                               (x - 1) * (2 * x - 2) * (2 * x - 2) + 1), t)
 
 
-def ease_in_bounce(t: float) -> float:
+def ease_in_bounce(t: float | np.ndarray) -> float | np.ndarray:
     """Bounce ease-in (bouncy start)."""
     return 1 - ease_out_bounce(1 - t)
 
 
-def ease_out_bounce(t: float) -> float:
+def ease_out_bounce(t: float | np.ndarray) -> float | np.ndarray:
     """Bounce ease-out (bouncy end)."""
-    if t < 1 / 2.75:
-        return 7.5625 * t * t
-    elif t < 2 / 2.75:
-        t -= 1.5 / 2.75
-        return 7.5625 * t * t + 0.75
-    elif t < 2.5 / 2.75:
-        t -= 2.25 / 2.75
-        return 7.5625 * t * t + 0.9375
-    else:
-        t -= 2.625 / 2.75
-        return 7.5625 * t * t + 0.984375
-
-
-def ease_in_out_bounce(t: float) -> float:
+    x = _as_input(t)
+    # Each arc is a parabola shifted to its segment
+    shift = np.select([x < 1 / 2.75, x < 2 / 2.75, x < 2.5 / 2.75],
+                      [0.0, 1.5 / 2.75, 2.25 / 2.75], 2.625 / 2.75)
+    offset = np.select([x < 1 / 2.75, x < 2 / 2.75, x < 2.5 / 2.75],
+                       [0.0, 0.75, 0.9375], 0.984375)
+    x = x - shift
+    return _as_output(7.5625 * x * x + offset, t)
+
+
+def ease_in_out_bounce(t: float | np.ndarray) -> float | np.ndarray:
     """Bounce ease-in-out."""
-    if t < 0.5:
-        return ease_in_bounce(t * 2) * 0.5
-    return ease_out_bounce(t * 2 - 1) * 0.5 + 0.5
+    x = _as_input(t)
+    return _as_output(np.where(x < 0.5, ease_in_bounce(x * 2) * 0.5,
+                               ease_out_bounce(x * 2 - 1) * 0.5 + 0.5), t)
 
 
-def ease_in_elastic(t: float) -> float:
+def ease_in_elastic(t: float | np.ndarray) -> float | np.ndarray:
     """Elastic ease-in (spring effect)."""
-    if t == 0 or t == 1:
-        return t
-    return -math.pow(2, 10 * (t - 1)) * math.sin((t - 1.1) * 5 * math.pi)
+    x = _as_input(t)
+    eased = -np.power(2, 10 * (x - 1)) * np.sin((x - 1.1) * 5 * np.pi)
+    return _as_output(np.where((x == 0) | (x == 1), x, eased), t)
 
 
-def ease_out_elastic(t: float) -> float:
+def ease_out_elastic(t: float | np.ndarray) -> float | np.ndarray:
     """Elastic ease-out (spring effect)."""
-    if t == 0 or t == 1:
-        return t
-    return math.pow(2, -10 * t) * math.sin((t - 0.1) * 5 * math.pi) + 1
+    x = _as_input(t)
+    eased = np.power(2, -10 * x) * np.sin((x - 0.1) * 5 * np.pi) + 1
+    return _as_output(np.where((x == 0) | (x == 1), x, eased), t)
 
 
-def ease_in_out_elastic(t: float) -> float:
+def ease_in_out_elastic(t: float | np.ndarray) -> float | np.ndarray:
     """Elastic ease-in-out."""
-    if t == 0 or t == 1:
-        return t
-    t = t * 2 - 1
-    if t < 0:
-        return -0.5 * math.pow(2, 10 * t) * math.sin((t - 0.1) * 5 * math.pi)
-    return math.pow(2, -10 * t) * math.sin((t - 0.1) * 5 * math.pi) * 0.5 + 1
+    x = _as_input(t)
+    u = x * 2 - 1
+    wave = np.sin((u - 0.1) * 5 * np.pi)
+    eased = np.where(u < 0, -0.5 * np.power(2, 10 * u) * wave,
+                     np.power(2, -10 * u) * wave * 0.5 + 1)
+    return _as_output(np.where((x == 0) | (x == 1), x, eased), t)
 
 
 # Convenience mapping
@@ -119,45 +133,47 @@ def get_easing(name: str = 'linear'):
     return EASING_FUNCTIONS.get(name, linear)
 
 
-def interpolate(start: float, end: float, t: float, easing: str = 'linear') -> float:
+def interpolate(start: float | np.ndarray, end: float | np.ndarray,
+                t: float | np.ndarray, easing: str = 'linear') -> float | np.ndarray:
     """
     Interpolate between two values with easing.
 
     Args:
         start: Start value
         end: End value
-        t: Progress from 0.0 to 1.0
+        t: Progress from 0.0 to 1.0 (or an array of progress values, e.g. a
+            timing_table() column, to interpolate every frame at once)
         easing: Name of easing function
 
     Returns:
-        Interpolated value
+        Interpolated value (an array if any argument is one)
     """
     ease_func = get_easing(easing)
     eased_t = ease_func(t)
     return start + (end - start) * eased_t
 
 
-def ease_back_in(t: float) -> float:
+def ease_back_in(t: float | np.ndarray) -> float | np.ndarray:
     """Back ease-in (slight overshoot backward before forward motion)."""
     c1 = 1.70158
     c3 = c1 + 1
     return c3 * t * t * t - c1 * t * t
 
 
-def ease_back_out(t: float) -> float:
+def ease_back_out(t: float | np.ndarray) -> float | np.ndarray:
     """Back ease-out (overshoot forward then settle back)."""
     c1 = 1.70158
     c3 = c1 + 1
     return 1 + c3 * pow(t - 1, 3) + c1 * pow(t - 1, 2)
 
 
-def ease_back_in_out(t: float) -> float:
+def ease_back_in_out(t: float | np.ndarray) -> float | np.ndarray:
     """Back ease-in-out (overshoot at both ends)."""
     c1 = 1.70158
     c2 = c1 * 1.525
-    if t < 0.5:
-        return (pow(2 * t, 2) * ((c2 + 1) * 2 * t - c2)) / 2
-    return (pow(2 * t - 2, 2) * ((c2 + 1) * (t * 2 - 2) + c2) + 2) / 2
+    x = _as_input(t)
+    return _as_output(np.where(x < 0.5, (pow(2 * x, 2) * ((c2 + 1) * 2 * x - c2)) / 2,
+                               (pow(2 * x - 2, 2) * ((c2 + 1) * (x * 2 - 2) + c2) + 2) / 2), t)
 
 
 def apply_squash_stretch(base_scale: tuple[float, float], intensity: float,
@@ -227,4 +243,53 @@ EASING_FUNCTIONS.update({
     'back_in_out': ease_back_in_out,
     'anticipate': ease_back_in,     # Alias
     'overshoot': ease_back_out,     # Alias
-})
\ No newline at end of file
+})
+
+
+def frame_progress(num_frames: int) -> np.ndarray:
+    """
+    Progress of each frame from 0.0 to 1.0, as the templates compute it.
+
+    Args:
+        num_frames: Number of frames in the animation
+
+    Returns:
+        (num_frames,) array of i / (num_frames - 1) (all 0.0 for a single frame)
+    """
+    if num_frames <= 1:
+        return np.zeros(max(0, num_frames))
+    return np.arange(num_frames) / (num_frames - 1)
+
+
+def timing_table(num_frames: int, easings: str | Sequence[str] = 'linear') -> np.ndarray:
+    """
+    Precompute the eased progress of every frame for several properties.
+
+    Computed in one vectorized pass per easing and cached, so a template can
+    derive all of its positions, scales and angles up front:
+
+        table = timing_table(30, ['ease_out', 'bounce_out'])
+        xs = 50 + 380 * table[:, 0]
+        ys = 350 - 150 * table[:, 1]
+
+    Args:
+        num_frames: Number of frames in the animation
+        easings: Easing name per property (names as for get_easing())
+
+    Returns:
+        Read-only (num_frames, len(easings)) array; a single name gives one column
+    """
+    if isinstance(easings, str):
+        easings = [easings]
+    return _timing_table(num_frames, tuple(easings))
+
+
+@lru_cache(maxsize=TIMING_CACHE_SIZE)
+def _timing_table(num_frames: int, easings: tuple[str, ...]) -> np.ndarray:
+    """Build (and cache) a timing_table()."""
+    t = frame_progress(num_frames)
+    table = np.empty((len(t), len(easings)))
+    for column, name in enumerate(easings):
+        table[:, column] = get_easing(name)(t)
+    table.flags.writeable = False
+    return table
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Emoji Atlas - Rasterize each emoji once, serve transformed sprites from a cache.
+
+Templates that spin, wiggle, flip or zoom an emoji need it at a different
+angle or scale on every frame. The atlas renders the glyph once at a reference
+size and derives scaled, rotated and blurred variants from that master copy.
+Angles, sizes and blur radii are quantized to a small tolerance, so periodic
+animations (spin loops, wiggles, flips) hit the cache instead of re-rendering.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import math
+
+from PIL import Image, ImageFilter
+
+from core.fonts import has_color
+from core.frame_composer import render_emoji
+
+
+REFERENCE_SIZE = 160          # Master glyph size (Apple Color Emoji's native strike; Noto's 109 is upscaled)
+ANGLE_STEP = 2.0              # Degrees; angles are rounded to this step
+SCALE_TOLERANCE = 0.02        # Relative size error allowed when reusing a sprite
+BLUR_STEP = 0.5               # Blur radii are rounded to this step
+ATLAS_CACHE_PIXELS = 16_000_000  # About 64 MB of RGBA sprites
+
+
+class EmojiAtlas:
+    """LRU cache of emoji sprites keyed by quantized (emoji, size, angle, blur)."""
+
+    def __init__(self, reference_size: int = REFERENCE_SIZE, angle_step: float = ANGLE_STEP,
+                 scale_tolerance: float = SCALE_TOLERANCE, blur_step: float = BLUR_STEP,
+                 max_pixels: int = ATLAS_CACHE_PIXELS):
+        """
+        Args:
+            reference_size: Size the master glyph is rasterized at (color
+                emoji fonts are bitmaps, so rendering larger adds no detail)
+            angle_step: Rotation quantization in degrees (0 = exact)
+            scale_tolerance: Relative size quantization (0 = exact pixels)
+            blur_step: Blur radius quantization
+            max_pixels: Total sprite pixels to keep before evicting
+        """
+        self.reference_size = reference_size
+        self.angle_step = angle_step
+        self.scale_tolerance = scale_tolerance
+        self.blur_step = blur_step
+        self.max_pixels = max_pixels
+        self.hits = 0
+        self.misses = 0
+        self._sprites: OrderedDict = OrderedDict()
+        self._pixels = 0
+        self._warned = False  # Missing-color warning printed
+
+    def sprite(self, emoji: str, size: int, angle: float = 0.0,
+               scale: tuple[float, float] = (1.0, 1.0),
+               blur: float = 0.0) -> tuple[Image.Image, tuple[int, int]]:
+        """
+        Get an emoji sprite, rendering it only on a cache miss.
+
+        Args:
+            emoji: Emoji character(s)
+            size: Emoji size in pixels, as for draw_emoji_enhanced()
+            angle: Rotation in degrees, counterclockwise (as Image.rotate)
+            scale: (x, y) stretch applied before rotating
+            blur: Gaussian blur radius applied last
+
+        Returns:
+            Tuple of (RGBA sprite cropped to its content, (x, y) offset of
+            the sprite's top-left corner from the emoji's center). Do not
+            modify the sprite.
+        """
+        width = self._quantize_size(size * scale[0])
+        height = self._quantize_size(size * scale[1])
+        angle = self._quantize(angle % 360, self.angle_step) % 360
+        blur = self._quantize(blur, self.blur_step)
+
+        key = (emoji, width, height, angle, blur)
+        cached = self._sprites.get(key)
+        if cached is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = self._render(emoji, width, height, angle, blur)
+        self._sprites[key] = result
+        self._pixels += result[0].width * result[0].height
+        while self._pixels > self.max_pixels and len(self._sprites) > 1:
+            _, (evicted, _) = self._sprites.popitem(last=False)
+            self._pixels -= evicted.width * evicted.height
+        return result
+
+    def paste(self, frame: Image.Image, emoji: str, center: tuple[float, float], size: int,
+              angle: float = 0.0, scale: tuple[float, float] = (1.0, 1.0),
+              blur: float = 0.0) -> Image.Image:
+        """
+        Paste an emoji sprite centered at a point.
+
+        Args:
+            frame: PIL Image to draw on (modified in place)
+            emoji: Emoji character(s)
+            center: (x, y) center of the emoji
+            size: Emoji size in pixels
+            angle: Rotation in degrees, counterclockwise
+            scale: (x, y) stretch applied before rotating
+            blur: Gaussian blur radius
+
+        Returns:
+            Modified frame
+        """
+        sprite, (offset_x, offset_y) = self.sprite(emoji, size, angle, scale, blur)
+        frame.paste(sprite, (int(center[0]) + offset_x, int(center[1]) + offset_y), sprite)
+        return frame
+
+    def clear(self):
+        """Drop every cached sprite and reset the counters."""
+        self._sprites.clear()
+        self._pixels = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _quantize(self, value: float, step: float) -> float:
+        """Round value to a multiple of step (no-op for step 0)."""
+        return round(value / step) * step if step else value
+
+    def _quantize_size(self, pixels: float) -> int:
+        """Round a size to the nearest of a geometric series of sizes."""
+        pixels = max(1.0, pixels)
+        if not self.scale_tolerance:
+            return max(1, int(pixels))
+        ratio = 1 + self.scale_tolerance
+        return max(1, round(ratio ** round(math.log(pixels, ratio))))
+
+    def _master(self, emoji: str) -> tuple[Image.Image, tuple[int, int]]:
+        """The emoji rasterized once at the reference size, cropped to its content."""
+        key = (emoji, self.reference_size)
+        cached = self._sprites.get(key)
+        if cached is not None:
+            self._sprites.move_to_end(key)
+            return cached
+
+        # Bitmap fonts are drawn at their native strike and resized to size
+        size = self.reference_size
+        sprite = render_emoji(emoji, size)
+        if not self._warned and not has_color(sprite):
+            self._warned = True
+            print(f"⚠️  {emoji!r} rendered without color - is a color emoji font "
+                  "(Noto Color Emoji, Apple Color Emoji, Segoe UI Emoji) installed?")
+        cached = _crop_to_content(sprite, (size // 2 - size, size // 2 - size))
+        self._sprites[key] = cached
+        self._pixels += cached[0].width * cached[0].height
+        return cached
+
+    def _render(self, emoji: str, width: int, height: int, angle: float,
+                blur: float) -> tuple[Image.Image, tuple[int, int]]:
+        """Scale, rotate and blur the master glyph, then crop to its content."""
+        sprite, (offset_x, offset_y) = self._master(emoji)
+
+        if (width, height) != (self.reference_size, self.reference_size):
+            scale_x = width / self.reference_size
+            scale_y = height / self.reference_size
+            sprite = sprite.resize((max(1, round(sprite.width * scale_x)),
+                                    max(1, round(sprite.height * scale_y))), Image.LANCZOS)
+            offset_x, offset_y = round(offset_x * scale_x), round(offset_y * scale_y)
+
+        if angle:
+            # Center the emoji on the canvas so rotation pivots on the emoji
+            half_width = max(-offset_x, sprite.width + offset_x, 1)
+            half_height = max(-offset_y, sprite.height + offset_y, 1)
+            canvas = Image.new('RGBA', (half_width * 2, half_height * 2), (0, 0, 0, 0))
+            canvas.paste(sprite, (half_width + offset_x, half_height + offset_y))
+            sprite = canvas.rotate(angle, resample=Image.BICUBIC, expand=True)
+            offset_x, offset_y = -(sprite.width // 2), -(sprite.height // 2)
+
+        if blur:
+            # Leave room for the blur to spread
+            pad = int(math.ceil(blur * 3))
+            canvas = Image.new('RGBA', (sprite.width + 2 * pad, sprite.height + 2 * pad), (0, 0, 0, 0))
+            canvas.paste(sprite, (pad, pad))
+            sprite = canvas.filter(ImageFilter.GaussianBlur(blur))
+            offset_x, offset_y = offset_x - pad, offset_y - pad
+
+        return _crop_to_content(sprite, (offset_x, offset_y))
+
+
+def _crop_to_content(sprite: Image.Image,
+                     offset: tuple[int, int]) -> tuple[Image.Image, tuple[int, int]]:
+    """Crop an RGBA sprite to its non-transparent pixels, adjusting its offset."""
+    bbox = sprite.getchannel('A').getbbox()
+    if bbox is None:
+        return Image.new('RGBA', (1, 1), (0, 0, 0, 0)), (0, 0)
+    return sprite.crop(bbox), (offset[0] + bbox[0], offset[1] + bbox[1])
+
+
+_default_atlas: Optional[EmojiAtlas] = None
+
+
+def get_atlas() -> EmojiAtlas:
+    """Return the shared atlas used by the templates."""
+    global _default_atlas
+    if _default_atlas is None:
+        _default_atlas = EmojiAtlas()
+    return _default_atlas
+
+
+def paste_emoji(frame: Image.Image, emoji: str, center: tuple[float, float], size: int,
+                angle: float = 0.0, scale: tuple[float, float] = (1.0, 1.0),
+                blur: float = 0.0) -> Image.Image:
+    """
+    Paste a cached emoji sprite centered at a point, using the shared atlas.
+
+    Args:
+        frame: PIL Image to draw on (modified in place)
+        emoji: Emoji character(s)
+        center: (x, y) center of the emoji
+        size: Emoji size in pixels
+        angle: Rotation in degrees, counterclockwise (as Image.rotate)
+        scale: (x, y) stretch applied before rotating
+        blur: Gaussian blur radius
+
+    Returns:
+        Modified frame
+    """
+    return get_atlas().paste(frame, emoji, center, size, angle, scale, blur)
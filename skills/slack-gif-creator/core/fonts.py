@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Fonts - Cross-platform font discovery and a memoized font loader.
+
+The system font directories are scanned once and indexed by file name.
+Fonts are then resolved by role (sans, bold sans, emoji) from a list of
+preferred files, and each loaded FreeTypeFont is cached per (path, size), so
+drawing helpers can ask for a font on every frame at no cost.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+import os
+import sys
+
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+
+
+FONT_CACHE_SIZE = 128  # Loaded (path, size) fonts
+
+# Preferred font files per role, best first (macOS, Linux, Windows)
+FONT_ROLES = {
+    'sans': [
+        'Helvetica.ttc', 'SF-Pro.ttf', 'Arial.ttf',
+        'DejaVuSans.ttf', 'LiberationSans-Regular.ttf',
+        'arial.ttf',
+    ],
+    'sans-bold': [
+        'Helvetica.ttc', 'SF-Pro.ttf', 'Arial Bold.ttf',
+        'DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf',
+        'arialbd.ttf',
+    ],
+    'emoji': [
+        'Apple Color Emoji.ttc',
+        'NotoColorEmoji.ttf',
+        'seguiemj.ttf',
+    ],
+}
+
+# Native strike sizes of bitmap color emoji fonts (lowercased file names).
+# FreeType only loads these at their strike size, so glyphs are drawn there
+# and resized
+EMOJI_STRIKES = {
+    'apple color emoji.ttc': 160,
+    'notocoloremoji.ttf': 109,
+}
+
+EMOJI_PROBE = '\U0001F600'  # Glyph drawn to check that a font renders in color
+
+# Roles to try when none of a role's own files can be loaded
+FALLBACK_ROLES = {
+    'sans-bold': ['sans'],
+    'emoji': ['sans'],
+}
+
+
+def font_dirs() -> list[Path]:
+    """Return the system and user font directories for this platform."""
+    home = Path.home()
+    if sys.platform == 'darwin':
+        dirs = [Path('/System/Library/Fonts'), Path('/Library/Fonts'), home / 'Library/Fonts']
+    elif sys.platform == 'win32':
+        dirs = [Path(os.environ.get('WINDIR', 'C:\\Windows')) / 'Fonts',
+                home / 'AppData/Local/Microsoft/Windows/Fonts']
+    else:
+        dirs = [Path('/usr/share/fonts'), Path('/usr/local/share/fonts'),
+                home / '.local/share/fonts', home / '.fonts']
+    return [d for d in dirs if d.is_dir()]
+
+
+@lru_cache(maxsize=None)
+def font_index() -> dict[str, str]:
+    """
+    Scan the font directories once and map each font file name to its path.
+
+    Earlier directories win when a name appears twice. Names are stored
+    lowercased.
+
+    Returns:
+        Dict of lowercased file name -> absolute path
+    """
+    index = {}
+    for directory in font_dirs():
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(('.ttf', '.ttc', '.otf')):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+
+@lru_cache(maxsize=None)
+def font_paths(role: str = 'sans') -> tuple[str, ...]:
+    """
+    Installed font files for a role, best first, followed by its fallbacks.
+
+    Args:
+        role: 'sans', 'sans-bold' or 'emoji'
+
+    Returns:
+        Tuple of font file paths (empty if nothing suitable is installed)
+    """
+    if role not in FONT_ROLES:
+        raise ValueError(f"Unknown font role: {role!r} (use one of {', '.join(FONT_ROLES)})")
+
+    index = font_index()
+    paths = [index[name.lower()] for name in FONT_ROLES[role] if name.lower() in index]
+    for fallback in FALLBACK_ROLES.get(role, []):
+        paths += [path for path in font_paths(fallback) if path not in paths]
+    return tuple(paths)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font_file(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Load a font file at a size, memoized per (path, size)."""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(size: int, role: str = 'sans', bold: bool = False) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """
+    Get a font for a role with fallback support, memoized per (size, role, bold).
+
+    Files that cannot be loaded at this size (e.g. bitmap emoji fonts that
+    only come in one size) are skipped; use emoji_font() to draw emoji.
+
+    Args:
+        size: Font size in pixels
+        role: 'sans' or 'emoji'
+        bold: Use the bold variant of 'sans' if available
+
+    Returns:
+        ImageFont object (Pillow's built-in font if nothing else loads)
+    """
+    if bold and role == 'sans':
+        role = 'sans-bold'
+
+    for path in font_paths(role):
+        try:
+            return load_font_file(path, size)
+        except OSError:
+            continue
+
+    # Ultimate fallback
+    return _default_font(size)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def emoji_font(size: int) -> tuple[ImageFont.FreeTypeFont | ImageFont.ImageFont, int]:
+    """
+    Get a color emoji font for drawing emoji at a size.
+
+    Bitmap fonts (Noto Color Emoji, Apple Color Emoji) are loaded at their
+    native strike from EMOJI_STRIKES when they cannot be loaded at this
+    size; the caller scales what it draws by size / native size. Fonts that
+    load but do not draw EMOJI_PROBE in color are skipped.
+
+    Args:
+        size: Emoji size in pixels
+
+    Returns:
+        Tuple of (font, size the font draws at). Falls back to
+        get_font(size, 'emoji') - a text font - if no color font works.
+    """
+    index = font_index()
+    for name in FONT_ROLES['emoji']:
+        path = index.get(name.lower())
+        if path is None:
+            continue
+        for font_size in (size, EMOJI_STRIKES.get(name.lower())):
+            if font_size is None:
+                continue
+            try:
+                font = load_font_file(path, font_size)
+            except OSError:
+                continue
+            if draws_in_color(path, font_size):
+                return font, font_size
+            break
+
+    return get_font(size, role='emoji'), size
+
+
+@lru_cache(maxsize=None)
+def draws_in_color(path: str, size: int) -> bool:
+    """Whether a font file draws EMOJI_PROBE with colored pixels (memoized)."""
+    font = load_font_file(path, size)
+    left, top, right, bottom = font.getbbox(EMOJI_PROBE)
+    layer = Image.new('RGBA', (max(1, right), max(1, bottom)), (0, 0, 0, 0))
+    try:
+        ImageDraw.Draw(layer).text((0, 0), EMOJI_PROBE, font=font, embedded_color=True)
+    except (OSError, ValueError):
+        return False
+    return has_color(layer)
+
+
+def has_color(image: Image.Image, min_spread: int = 32) -> bool:
+    """
+    Whether an RGBA image has any visible colored (non-gray) pixels.
+
+    Tofu boxes and text-font fallbacks are drawn in a single gray level, so
+    this tells a real color emoji from a missing glyph.
+
+    Args:
+        image: RGBA image
+        min_spread: Smallest difference between a pixel's largest and
+            smallest channel that counts as color
+
+    Returns:
+        True if some pixel with alpha above 0 has a channel spread of at
+        least min_spread
+    """
+    pixels = np.asarray(image.convert('RGBA'))
+    visible = pixels[..., 3] > 0
+    rgb = pixels[..., :3][visible]
+    if not len(rgb):
+        return False
+    spread = rgb.max(axis=1).astype(np.int16) - rgb.min(axis=1)
+    return bool((spread >= min_spread).any())
+
+
+def _default_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Pillow's built-in font, scaled where the Pillow version supports it."""
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
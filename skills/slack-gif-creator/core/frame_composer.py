@@ -6,10 +6,17 @@ Provides functions for drawing shapes, text, emojis, and compositing elements
 together to create animation frames.
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+from PIL import Image, ImageDraw
 import numpy as np
 from typing import Optional
 
+from core.fonts import emoji_font, get_font
+
+
+BACKGROUND_CACHE_SIZE = 32  # Cached gradients and vignette masks
+EMOJI_CACHE_SIZE = 64  # Cached emoji resized from a bitmap font's native size
+
 
 def create_blank_frame(width: int, height: int, color: tuple[int, int, int] = (255, 255, 255)) -> Image.Image:
     """
@@ -112,12 +119,7 @@ def draw_text(frame: Image.Image, text: str, position: tuple[int, int],
         Modified frame
     """
     draw = ImageDraw.Draw(frame)
-
-    # Try to use default font, fall back to basic if not available
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-    except:
-        font = ImageFont.load_default()
+    font = get_font(font_size)
 
     if centered:
         bbox = draw.textbbox((0, 0), text, font=font)
@@ -144,19 +146,54 @@ def draw_emoji(frame: Image.Image, emoji: str, position: tuple[int, int], size:
     Returns:
         Modified frame
     """
-    draw = ImageDraw.Draw(frame)
-
-    # Use Apple Color Emoji font on macOS
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", size)
-    except:
-        # Fallback to text-based emoji
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", size)
+    # Color emoji font if installed, otherwise a text font
+    font, font_size = emoji_font(size)
+    if font_size != size:
+        sprite = render_emoji(emoji, size)
+        frame.paste(sprite, (int(position[0]), int(position[1])), sprite)
+        return frame
 
+    draw = ImageDraw.Draw(frame)
     draw.text(position, emoji, font=font, embedded_color=True)
     return frame
 
 
+def _scale_length(value: float, scale: float) -> int:
+    """Pixel length of a design-unit length; a non-zero length never rounds to 0."""
+    pixels = round(value * scale)
+    if pixels == 0 and value:
+        return 1 if value > 0 else -1
+    return pixels
+
+
+@lru_cache(maxsize=EMOJI_CACHE_SIZE)
+def render_emoji(emoji: str, size: int) -> Image.Image:
+    """
+    Render an emoji into a transparent sprite, cached per (emoji, size).
+
+    Bitmap emoji fonts only draw at their native size (109px for Noto Color
+    Emoji); the glyph is drawn there and LANCZOS-resized to size.
+
+    Args:
+        emoji: Emoji character(s)
+        size: Emoji size in pixels
+
+    Returns:
+        RGBA sprite whose top-left corner is the text origin, as for
+        ImageDraw.text() at position (0, 0). Do not modify it.
+    """
+    font, font_size = emoji_font(size)
+    _, _, right, bottom = font.getbbox(emoji)
+    sprite = Image.new('RGBA', (max(1, right), max(1, bottom)), (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).text((0, 0), emoji, font=font, embedded_color=True)
+
+    if font_size != size:
+        scale = size / font_size
+        sprite = sprite.resize((max(1, round(sprite.width * scale)),
+                                max(1, round(sprite.height * scale))), Image.LANCZOS)
+    return sprite
+
+
 def composite_layers(base: Image.Image, overlay: Image.Image,
                      position: tuple[int, int] = (0, 0), alpha: float = 1.0) -> Image.Image:
     """
@@ -247,29 +284,26 @@ def create_gradient_background(width: int, height: int,
     Returns:
         PIL Image with gradient
     """
-    frame = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(frame)
+    return _gradient(width, height, tuple(top_color), tuple(bottom_color)).copy()
 
-    # Calculate color step for each row
-    r1, g1, b1 = top_color
-    r2, g2, b2 = bottom_color
 
-    for y in range(height):
-        # Interpolate color
-        ratio = y / height
-        r = int(r1 * (1 - ratio) + r2 * ratio)
-        g = int(g1 * (1 - ratio) + g2 * ratio)
-        b = int(b1 * (1 - ratio) + b2 * ratio)
+@lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def _gradient(width: int, height: int, top_color: tuple[int, int, int],
+              bottom_color: tuple[int, int, int]) -> Image.Image:
+    """Build a vertical gradient once per (size, colors); callers get copies."""
+    # Interpolate every row's color at once
+    ratio = (np.arange(height) / height)[:, None]
+    top = np.array(top_color, dtype=np.float64)
+    bottom = np.array(bottom_color, dtype=np.float64)
+    rows = (top * (1 - ratio) + bottom * ratio).astype(np.uint8)
 
-        # Draw horizontal line
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-    return frame
+    return Image.fromarray(np.ascontiguousarray(np.broadcast_to(rows[:, None], (height, width, 3))))
 
 
 def draw_emoji_enhanced(frame: Image.Image, emoji: str, position: tuple[int, int],
                        size: int = 60, shadow: bool = True,
-                       shadow_offset: tuple[int, int] = (2, 2)) -> Image.Image:
+                       shadow_offset: tuple[int, int] = (2, 2),
+                       scale: float = 1.0) -> Image.Image:
     """
     Draw emoji with optional shadow for better visual quality.
 
@@ -279,7 +313,11 @@ def draw_emoji_enhanced(frame: Image.Image, emoji: str, position: tuple[int, int
         position: (x, y) position
         size: Emoji size in pixels (minimum 12)
         shadow: Whether to add drop shadow
-        shadow_offset: Shadow offset
+        shadow_offset: Shadow offset, in design units
+        scale: Pixels per design unit (Canvas.scale). The shadow's offsets
+            and its minimum emoji size (20) are design units, so an emoji
+            drawn directly at 128px gets the same shadow as one drawn at
+            480px and downscaled
 
     Returns:
         Modified frame
@@ -289,21 +327,28 @@ def draw_emoji_enhanced(frame: Image.Image, emoji: str, position: tuple[int, int
     # Ensure minimum size to avoid font rendering errors
     size = max(12, size)
 
-    # Use Apple Color Emoji font on macOS
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", size)
-    except:
-        # Fallback to text-based emoji
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", size)
-        except:
-            font = ImageFont.load_default()
+    # Only draw shadow for larger emojis; offsets scale with the canvas
+    shadow = shadow and size >= 20 * scale
+    shadow_offset = (_scale_length(shadow_offset[0], scale), _scale_length(shadow_offset[1], scale))
+    shadow_steps = [_scale_length(offset, scale) for offset in range(1, 3)]
+
+    # Color emoji font if installed, otherwise a text font
+    font, font_size = emoji_font(size)
+    if font_size != size:
+        # Bitmap font: paste the glyph resized from its native size
+        sprite = render_emoji(emoji, size)
+        if shadow:
+            for offset in shadow_steps:
+                frame.paste(sprite, (int(position[0]) + shadow_offset[0] + offset,
+                                     int(position[1]) + shadow_offset[1] + offset), sprite)
+        frame.paste(sprite, (int(position[0]), int(position[1])), sprite)
+        return frame
 
     # Draw shadow first if enabled
-    if shadow and size >= 20:  # Only draw shadow for larger emojis
+    if shadow:
         shadow_pos = (position[0] + shadow_offset[0], position[1] + shadow_offset[1])
         # Draw semi-transparent shadow (simulated by drawing multiple times)
-        for offset in range(1, 3):
+        for offset in shadow_steps:
             try:
                 draw.text((shadow_pos[0] + offset, shadow_pos[1] + offset),
                          emoji, font=font, embedded_color=True, fill=(0, 0, 0, 100))
@@ -398,38 +443,38 @@ def add_vignette(frame: Image.Image, strength: float = 0.5) -> Image.Image:
         strength: Vignette strength (0.0-1.0)
 
     Returns:
-        Frame with vignette
+        Frame with vignette (RGBA keeps its alpha; other modes become RGB)
     """
+    if frame.mode not in ('RGB', 'RGBA'):
+        frame = frame.convert('RGB')
     width, height = frame.size
+    mask = _vignette_mask(width, height, float(strength))
 
-    # Create radial gradient mask
-    center_x, center_y = width // 2, height // 2
-    max_dist = ((width / 2) ** 2 + (height / 2) ** 2) ** 0.5
+    # Blend the color channels with the mask using multiply; alpha is kept
+    frame_array = np.array(frame)
+    rgb = frame_array[:, :, :3].astype(np.float32) / 255
+    frame_array[:, :, :3] = (rgb * mask[:, :, None] * 255).astype(np.uint8)
 
-    # Create overlay
-    overlay = Image.new('RGB', (width, height), (0, 0, 0))
-    pixels = overlay.load()
+    return Image.fromarray(frame_array, mode=frame.mode)
 
-    for y in range(height):
-        for x in range(width):
-            # Calculate distance from center
-            dx = x - center_x
-            dy = y - center_y
-            dist = (dx ** 2 + dy ** 2) ** 0.5
 
-            # Calculate vignette value
-            vignette = min(1, (dist / max_dist) * strength)
-            value = int(255 * (1 - vignette))
-            pixels[x, y] = (value, value, value)
+@lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def _vignette_mask(width: int, height: int, strength: float) -> np.ndarray:
+    """Per-pixel vignette multiplier (0.0-1.0), built once per (size, strength)."""
+    # Radial gradient from the center
+    center_x, center_y = width // 2, height // 2
+    max_dist = ((width / 2) ** 2 + (height / 2) ** 2) ** 0.5
 
-    # Blend with original using multiply
-    frame_array = np.array(frame, dtype=np.float32) / 255
-    overlay_array = np.array(overlay, dtype=np.float32) / 255
+    y, x = np.ogrid[0:height, 0:width]
+    dist = np.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
 
-    result = frame_array * overlay_array
-    result = (result * 255).astype(np.uint8)
+    # Quantize to 8 bits as the overlay image used to be
+    vignette = np.minimum(1, (dist / max_dist) * strength)
+    value = (255 * (1 - vignette)).astype(np.uint8)
 
-    return Image.fromarray(result)
+    mask = value.astype(np.float32) / 255
+    mask.setflags(write=False)
+    return mask
 
 
 def draw_star(frame: Image.Image, center: tuple[int, int], size: int,
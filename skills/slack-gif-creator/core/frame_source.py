@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Frame Source - Lazy frame pipelines.
+
+A frame source is any iterable of frames (PIL Images or RGB arrays). Each
+template has an iter_* generator that renders one frame at a time, effects
+such as iter_trail_effect() and iter_screen_shake() wrap one source in
+another, and GIFBuilder.add_frames() consumes the result as it goes. With a
+streaming builder, only the frames an effect looks back on are ever in memory:
+
+    frames = iter_bounce_animation(num_frames=300)
+    frames = iter_screen_shake(frames, intensity=4)
+    builder = GIFBuilder(480, 480, fps=20, stream_to='bounce.gif')
+    builder.add_frames(frames)
+    builder.finish()
+
+The create_* functions are the same generators collected into a list.
+
+The scene-based templates (bounce, move, slide) take with_rects=True to yield
+(frame, dirty_rect) pairs instead; add_frames() passes each rectangle on to
+add_frame(), so delta encoding writes it without diffing the frames. Effects
+change pixels outside those rectangles, so pairs are for feeding a builder
+directly, not for wrapping in effects.
+"""
+
+from functools import wraps
+from typing import Callable, Iterable, Iterator
+
+from PIL import Image
+import numpy as np
+
+
+FrameSource = Iterable[Image.Image | np.ndarray]
+
+
+def collect_frames(generator: Callable[..., Iterator[Image.Image]]) -> Callable[..., list[Image.Image]]:
+    """
+    Make the list-returning form of a frame generator.
+
+    create_bounce_animation = collect_frames(iter_bounce_animation) takes the
+    same arguments and returns every frame in a list.
+
+    Args:
+        generator: Generator function yielding frames, named iter_*
+
+    Returns:
+        Function returning the generated frames as a list, named create_*
+    """
+    @wraps(generator)
+    def create(*args, **kwargs) -> list[Image.Image]:
+        return list(generator(*args, **kwargs))
+
+    create.__name__ = generator.__name__.replace('iter_', 'create_', 1)
+    create.__qualname__ = generator.__qualname__.replace('iter_', 'create_', 1)
+    create.__annotations__ = {**generator.__annotations__, 'return': list[Image.Image]}
+    return create
@@ -6,17 +6,36 @@ This module provides the main interface for creating GIFs from programmatically
 generated frames, with automatic optimization for Slack's requirements.
 """
 
+from functools import partial
 from pathlib import Path
-from typing import Optional
-import imageio.v3 as imageio
+from typing import Iterable, Optional
+import io
 from PIL import Image
 import numpy as np
 
+from core.gif_writer import (GIFWriter, EMPTY_RECT, encode_frame, encode_delta_frame,
+                              union_rects)
+from core.metrics import Metrics
+from core.parallel import map_frames, parallel_map
+from core.quantizer import build_palette, map_to_palette, named_palette
+from core.validators import get_size_limit_bytes
+
+
+# Search ladders for save_within_budget(), best quality first
+BUDGET_COLOR_STEPS = (255, 192, 128, 96, 64, 48, 32, 24, 16, 8)
+BUDGET_SCALE_STEPS = (1.0, 0.875, 0.75, 0.625, 0.5)
+BUDGET_FRAME_STEPS = (1, 2, 3, 4)
+
 
 class GIFBuilder:
     """Builder for creating optimized GIFs from frames."""
 
-    def __init__(self, width: int = 480, height: int = 480, fps: int = 15):
+    def __init__(self, width: int = 480, height: int = 480, fps: int = 15,
+                 stream_to: str | Path | None = None,
+                 palette: Optional[list[tuple[int, int, int]] | str] = None,
+                 num_colors: int = 128, sample_frames: int = 8,
+                 remove_duplicates: bool = True, delta_encode: bool = True,
+                 dither: Optional[str] = None):
         """
         Initialize GIF builder.
 
@@ -24,19 +43,56 @@ class GIFBuilder:
             width: Frame width in pixels
             height: Frame height in pixels
             fps: Frames per second
+            stream_to: If set, encode frames to this path as they are added
+                instead of keeping them in memory (call finish() when done)
+            palette: Fixed palette for streaming mode - RGB colors or a name
+                from core.color_palettes (None = build one from the first
+                sample_frames frames)
+            num_colors: Palette size when streaming without a fixed palette
+            sample_frames: Frames buffered to build the streaming palette
+            remove_duplicates: Skip near-duplicate frames while streaming
+            delta_encode: Write only changed regions while streaming (see save())
+            dither: Dithering while streaming: None or 'bayer' (see save())
         """
         self.width = width
         self.height = height
         self.fps = fps
         self.frames: list[np.ndarray] = []
-
-    def add_frame(self, frame: np.ndarray | Image.Image):
-        """
-        Add a frame to the GIF.
-
-        Args:
-            frame: Frame as numpy array or PIL Image (will be converted to RGB)
-        """
+        self.durations: list[float] = []  # Display time of each frame in ms
+        # Region that changed since the previous frame, if the caller knows it
+        self.dirty_rects: list[Optional[tuple[int, int, int, int]]] = []
+
+        # Streaming state - only the palette, a bounded sample reservoir and
+        # the last written frame are kept in memory.
+        self.stream_path = Path(stream_to) if stream_to is not None else None
+        self.num_colors = num_colors
+        self.sample_frames = max(1, sample_frames)
+        self.remove_duplicates = remove_duplicates
+        self.delta_encode = delta_encode
+        self.dither = dither
+        self._writer: Optional[GIFWriter] = None
+        self._stream_palette: Optional[np.ndarray] = None
+        self._reservoir: list[tuple[np.ndarray, float, Optional[tuple]]] = []
+        self._last_streamed: Optional[np.ndarray] = None
+        self._pending: Optional[tuple[np.ndarray, float, Optional[tuple]]] = None
+        self._skipped_rect: Optional[tuple] = EMPTY_RECT  # Changes in skipped duplicates
+        self._streamed_count = 0
+        self._streamed_ms = 0.0
+        self._skipped_count = 0
+        self._delta_saved: list[int] = []
+
+        if self.stream_path is not None and palette is not None:
+            palette = _as_palette(palette)
+            self.num_colors = min(_max_colors(delta_encode), len(palette))
+            self._open_stream(palette[:self.num_colors])
+
+    @property
+    def is_streaming(self) -> bool:
+        """True if frames are encoded as they arrive rather than on save()."""
+        return self.stream_path is not None
+
+    def _to_rgb(self, frame: np.ndarray | Image.Image) -> np.ndarray:
+        """Convert a frame to an RGB array at the builder's dimensions."""
         if isinstance(frame, Image.Image):
             frame = np.array(frame.convert('RGB'))
 
@@ -46,74 +102,237 @@ class GIFBuilder:
             pil_frame = pil_frame.resize((self.width, self.height), Image.Resampling.LANCZOS)
             frame = np.array(pil_frame)
 
-        self.frames.append(frame)
+        return frame
+
+    def add_frame(self, frame: np.ndarray | Image.Image, duration_ms: Optional[float] = None,
+                  dirty_rect: Optional[tuple[int, int, int, int]] = None):
+        """
+        Add a frame to the GIF.
+
+        In streaming mode the frame is quantized and written as soon as the
+        next distinct frame arrives (so duplicates can extend its duration).
+
+        Args:
+            frame: Frame as numpy array or PIL Image (will be converted to RGB)
+            duration_ms: Display time of this frame (None = 1000 / fps)
+            dirty_rect: (x0, y0, x1, y1) box, exclusive end, holding every
+                pixel that differs from the previous frame (e.g.
+                Scene.dirty_rect). Delta encoding then skips diffing the
+                frames. None = unknown; dropped if the frame is resized
+        """
+        size = frame.size if isinstance(frame, Image.Image) else (frame.shape[1], frame.shape[0])
+        if size != (self.width, self.height):
+            dirty_rect = None
+        frame = self._to_rgb(frame)
+        if duration_ms is None:
+            duration_ms = 1000 / self.fps
+
+        if not self.is_streaming:
+            self.frames.append(frame)
+            self.durations.append(duration_ms)
+            self.dirty_rects.append(dirty_rect)
+            return
+
+        if self._writer is None:
+            # Still filling the sample reservoir used to build the palette
+            self._reservoir.append((frame, duration_ms, dirty_rect))
+            if len(self._reservoir) >= self.sample_frames:
+                self._flush_reservoir()
+            return
+
+        self._stream_frame(frame, duration_ms, dirty_rect)
+
+    def add_frames(self, frames: Iterable[np.ndarray | Image.Image | tuple],
+                   duration_ms: Optional[float] = None) -> int:
+        """
+        Add multiple frames at once, from a list or any other iterable.
+
+        Frames are consumed one at a time, so a generator (e.g. a template's
+        iter_* function) is never held in memory as a whole; in streaming
+        mode only the palette sample and the pending frame are kept.
+
+        Args:
+            frames: Frames as numpy arrays or PIL Images, or (frame,
+                dirty_rect) pairs as yielded by the scene templates with
+                with_rects=True (see add_frame())
+            duration_ms: Display time of each frame (None = 1000 / fps)
 
-    def add_frames(self, frames: list[np.ndarray | Image.Image]):
-        """Add multiple frames at once."""
+        Returns:
+            Number of frames added
+        """
+        count = 0
         for frame in frames:
-            self.add_frame(frame)
+            dirty_rect = None
+            if isinstance(frame, tuple):
+                frame, dirty_rect = frame
+            self.add_frame(frame, duration_ms, dirty_rect)
+            count += 1
+        return count
+
+    def frame_durations(self) -> list[float]:
+        """Display time of each frame in ms (1000 / fps if frames were set directly)."""
+        if len(self.durations) != len(self.frames):
+            return [1000 / self.fps] * len(self.frames)
+        return list(self.durations)
+
+    def frame_rects(self) -> list[Optional[tuple[int, int, int, int]]]:
+        """Dirty rectangle of each frame (all None if frames were set directly)."""
+        if len(self.dirty_rects) != len(self.frames):
+            return [None] * len(self.frames)
+        return list(self.dirty_rects)
+
+    def _open_stream(self, palette: np.ndarray):
+        """Open the encoder with the given (N, 3) palette."""
+        self._stream_palette = palette
+        if self.delta_encode:
+            palette = _with_transparent_slot(palette)
+        self._writer = GIFWriter(self.stream_path, self.width, self.height, palette, loop=0)
+
+    def _flush_reservoir(self):
+        """Build the palette from the buffered samples and write them out."""
+        num_colors = min(self.num_colors, _max_colors(self.delta_encode))
+        self._open_stream(build_palette([frame for frame, _, _ in self._reservoir], num_colors))
+        reservoir, self._reservoir = self._reservoir, []
+        for frame, duration_ms, dirty_rect in reservoir:
+            self._stream_frame(frame, duration_ms, dirty_rect)
+
+    def _stream_frame(self, frame: np.ndarray, duration_ms: float,
+                      dirty_rect: Optional[tuple[int, int, int, int]] = None):
+        """Quantize a single frame against the stream palette and queue it."""
+        if (self.remove_duplicates and self._pending is not None
+                and _frames_match(self._last_streamed, frame, 0.98)):
+            # Hold the pending frame longer instead of writing a duplicate;
+            # the next written frame must also cover what this one changed
+            indices, pending_ms, pending_rect = self._pending
+            self._pending = (indices, pending_ms + duration_ms, pending_rect)
+            self._skipped_rect = union_rects([self._skipped_rect, dirty_rect])
+            self._skipped_count += 1
+            return
+
+        self._write_pending()
+        dirty_rect = union_rects([self._skipped_rect, dirty_rect])
+        self._skipped_rect = EMPTY_RECT
+        self._pending = (map_to_palette(frame, self._stream_palette, dither=self.dither),
+                         duration_ms, dirty_rect)
+        self._last_streamed = frame
+
+    def _write_pending(self):
+        """Encode the queued frame, now that its final duration is known."""
+        if self._pending is None:
+            return
+
+        quantized, duration_ms, dirty_rect = self._pending
+        delay = _gif_delays([self._streamed_ms, duration_ms])[1]
+        if self.delta_encode:
+            transparent_index = len(self._writer.palette) - 1
+            _, saved = self._writer.write_delta_frame(quantized, delay, transparent_index,
+                                                      dirty_rect)
+            self._delta_saved.append(saved)
+        else:
+            self._writer.write_frame(quantized, delay)
+        self._pending = None
+        self._streamed_count += 1
+        self._streamed_ms += duration_ms
+
+    def finish(self) -> dict:
+        """
+        Finalize a streaming GIF.
+
+        Returns:
+            Dictionary with file info (path, size, dimensions, frame_count)
+        """
+        if not self.is_streaming:
+            raise ValueError("finish() is only used in streaming mode; call save() instead.")
+
+        if self._writer is None:
+            if not self._reservoir:
+                raise ValueError("No frames to save. Add frames with add_frame() first.")
+            self._flush_reservoir()
+
+        self._write_pending()
+        self._writer.close()
+        if self._skipped_count > 0:
+            print(f"  Removed {self._skipped_count} duplicate frames")
+        if self.delta_encode:
+            print(f"  Delta encoding saved {sum(self._delta_saved) / 1024:.1f} KB")
+
+        colors = len(self._writer.palette) - (1 if self.delta_encode else 0)
+        info = self._report(self.stream_path, self._streamed_count, colors,
+                            optimize_for_emoji=False, total_ms=self._streamed_ms)
+        if self.delta_encode:
+            _add_delta_info(info, self._delta_saved)
+        return info
 
-    def optimize_colors(self, num_colors: int = 128, use_global_palette: bool = True) -> list[np.ndarray]:
+    def optimize_colors(self, num_colors: int = 128, use_global_palette: bool = True,
+                        workers: int = 1) -> list[np.ndarray]:
         """
         Reduce colors in all frames using quantization.
 
         Args:
             num_colors: Target number of colors (8-256)
             use_global_palette: Use a single palette for all frames (better compression)
+            workers: Frames processed in parallel (1 = serial, 0 = one per CPU)
 
         Returns:
             List of color-optimized frames
         """
-        optimized = []
-
         if use_global_palette and len(self.frames) > 1:
-            # Create a global palette from all frames
-            # Sample frames to build palette
-            sample_size = min(5, len(self.frames))
-            sample_indices = [int(i * len(self.frames) / sample_size) for i in range(sample_size)]
-            sample_frames = [self.frames[i] for i in sample_indices]
-
-            # Combine sample frames into a single image for palette generation
-            # Flatten each frame to get all pixels, then stack them
-            all_pixels = np.vstack([f.reshape(-1, 3) for f in sample_frames])  # (total_pixels, 3)
-
-            # Create a properly-shaped RGB image from the pixel data
-            # We'll make a roughly square image from all the pixels
-            total_pixels = len(all_pixels)
-            width = min(512, int(np.sqrt(total_pixels)))  # Reasonable width, max 512
-            height = (total_pixels + width - 1) // width  # Ceiling division
-
-            # Pad if necessary to fill the rectangle
-            pixels_needed = width * height
-            if pixels_needed > total_pixels:
-                padding = np.zeros((pixels_needed - total_pixels, 3), dtype=np.uint8)
-                all_pixels = np.vstack([all_pixels, padding])
-
-            # Reshape to proper RGB image format (H, W, 3)
-            img_array = all_pixels[:pixels_needed].reshape(height, width, 3).astype(np.uint8)
-            combined_img = Image.fromarray(img_array, mode='RGB')
-
-            # Generate global palette
-            global_palette = combined_img.quantize(colors=num_colors, method=2)
-
-            # Apply global palette to all frames
-            for frame in self.frames:
-                pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(palette=global_palette, dither=1)
-                optimized.append(np.array(quantized.convert('RGB')))
-        else:
-            # Use per-frame quantization
-            for frame in self.frames:
-                pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(colors=num_colors, method=2, dither=1)
-                optimized.append(np.array(quantized.convert('RGB')))
+            # Map all frames to one global palette, then expand back to RGB
+            palette, indices = self.quantize_to_indices(num_colors, workers=workers)
+            return list(palette[indices])
+
+        # Use per-frame quantization
+        return parallel_map(partial(_quantize_frame, num_colors=num_colors), self.frames, workers)
 
-        return optimized
+    def quantize_to_indices(self, num_colors: int = 128, dither: Optional[str] = None,
+                            palette: Optional[list[tuple[int, int, int]] | str] = None,
+                            workers: int = 1, executor: str = 'thread'
+                            ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Quantize all frames against one global palette, keeping them indexed.
+
+        The palette is built from every frame, weighted towards moving pixels,
+        and cached by frame content (see core.quantizer). Frames are mapped
+        through a cached RGB -> index lookup table in vectorized batches, with
+        no RGB round-trip.
+
+        Args:
+            num_colors: Target number of colors (8-256)
+            dither: None for nearest color, or 'bayer' for ordered dithering
+            palette: Fixed palette - RGB colors or a name from
+                core.color_palettes (None = build one from the frames)
+            workers: Frames mapped in parallel (1 = one vectorized pass)
+            executor: 'thread' or 'process' (see core.parallel)
+
+        Returns:
+            Tuple of (palette as (N, 3) uint8 array, (T, H, W) uint8 index array)
+        """
+        palette = self._resolve_palette(num_colors, palette)
+        return palette, self._map_frames(palette, dither, workers, executor)
+
+    def _resolve_palette(self, num_colors: int,
+                         palette: Optional[list[tuple[int, int, int]] | str]) -> np.ndarray:
+        """Return the fixed palette as an array, or build one from the frames."""
+        if palette is None:
+            return build_palette(self.frames, num_colors)
+        return _as_palette(palette)[:num_colors]
+
+    def _map_frames(self, palette: np.ndarray, dither: Optional[str],
+                    workers: int, executor: str) -> np.ndarray:
+        """Map all frames to palette indices, in parallel if requested."""
+        if workers == 1:
+            return map_to_palette(self.frames, palette, dither=dither)
+        mapper = partial(map_to_palette, palette=palette, dither=dither)
+        return map_frames(mapper, self.frames, workers, executor)
 
     def deduplicate_frames(self, threshold: float = 0.995) -> int:
         """
         Remove duplicate or near-duplicate consecutive frames.
 
+        A removed frame's display time is added to the frame kept before it,
+        so the animation plays at its authored speed and a long static hold
+        costs a single frame.
+
         Args:
             threshold: Similarity threshold (0.0-1.0). Higher = more strict (0.995 = very similar).
 
@@ -123,30 +342,60 @@ class GIFBuilder:
         if len(self.frames) < 2:
             return 0
 
+        durations = self.frame_durations()
+        rects = self.frame_rects()
         deduplicated = [self.frames[0]]
+        merged = [durations[0]]
+        keep = [0]
         removed_count = 0
 
-        for i in range(1, len(self.frames)):
-            # Compare with previous frame
-            prev_frame = np.array(deduplicated[-1], dtype=np.float32)
-            curr_frame = np.array(self.frames[i], dtype=np.float32)
-
-            # Calculate similarity (normalized)
-            diff = np.abs(prev_frame - curr_frame)
-            similarity = 1.0 - (np.mean(diff) / 255.0)
-
-            # Keep frame if sufficiently different
+        for index, (frame, duration_ms) in enumerate(zip(self.frames[1:], durations[1:]), 1):
+            # Keep frame if sufficiently different from the last kept one
             # High threshold (0.995) means only remove truly identical frames
-            if similarity < threshold:
-                deduplicated.append(self.frames[i])
+            if not _frames_match(deduplicated[-1], frame, threshold):
+                deduplicated.append(frame)
+                merged.append(duration_ms)
+                keep.append(index)
             else:
+                merged[-1] += duration_ms
                 removed_count += 1
 
         self.frames = deduplicated
+        self.durations = merged
+        self.dirty_rects = _merge_rects(rects, keep)
+        return removed_count
+
+    def decimate_frames(self, target_count: int) -> int:
+        """
+        Reduce the animation to target_count frames, keeping the motion.
+
+        Frames are chosen by motion energy rather than uniformly: fast
+        movement keeps more frames and idle stretches collapse to one. Each
+        kept frame absorbs the display time of the frames dropped after it,
+        so the total duration is unchanged.
+
+        Args:
+            target_count: Maximum number of frames to keep
+
+        Returns:
+            Number of frames removed
+        """
+        if len(self.frames) <= target_count:
+            return 0
+
+        keep = _select_frames(_motion_energy(self.frames), target_count)
+        removed_count = len(self.frames) - len(keep)
+        self.durations = _merge_durations(self.frame_durations(), keep)
+        self.dirty_rects = _merge_rects(self.frame_rects(), keep)
+        self.frames = [self.frames[i] for i in keep]
         return removed_count
 
     def save(self, output_path: str | Path, num_colors: int = 128,
-             optimize_for_emoji: bool = False, remove_duplicates: bool = True) -> dict:
+             optimize_for_emoji: bool = False, remove_duplicates: bool = True,
+             delta_encode: bool = True, dither: Optional[str] = None,
+             palette: Optional[list[tuple[int, int, int]] | str] = None,
+             workers: int = 1, executor: str = 'thread', lossy: int = 0,
+             metrics: bool = False) -> dict:
         """
         Save frames as optimized GIF for Slack.
 
@@ -155,58 +404,132 @@ class GIFBuilder:
             num_colors: Number of colors to use (fewer = smaller file)
             optimize_for_emoji: If True, optimize for <64KB emoji size
             remove_duplicates: Remove duplicate consecutive frames
+            delta_encode: Write each frame as the changed rectangle over the
+                previous one, with unchanged pixels transparent
+            dither: None for nearest-color mapping, or 'bayer' for ordered
+                dithering (smooths gradients and compresses far better than
+                error diffusion)
+            palette: Fixed palette - RGB colors or a name from
+                core.color_palettes such as 'vibrant_emoji' (None = build
+                one from all frames)
+            workers: Frames resized, quantized and encoded in parallel
+                (1 = serial, 0 = one per CPU); output order is preserved
+            executor: 'thread' or 'process' for palette mapping and encoding.
+                Frames up to 256x256 (every emoji) and all lossy frames are
+                LZW-coded in Python, which holds the GIL, so their encoding
+                only scales with workers on 'process'. Resizing always uses
+                threads (Pillow's resize releases the GIL).
+            lossy: Lossy LZW tolerance as an RGB distance (0 = lossless,
+                20-60 = smaller files with barely visible speckle)
+            metrics: Record wall time, peak memory and bytes in/out for each
+                stage (dedup, resize, decimate, palette, mapping, encode,
+                write) as info['metrics']; see core.metrics.export_metrics()
+                for JSON and Chrome-trace export
 
         Returns:
-            Dictionary with file info (path, size, dimensions, frame_count)
+            Dictionary with file info (path, size, dimensions, frame_count).
+            With delta encoding it also has 'delta_bytes_saved' (per frame)
+            and 'delta_bytes_saved_total'.
         """
+        if self.is_streaming:
+            raise ValueError("Builder is streaming to a file; call finish() instead of save().")
+
         if not self.frames:
             raise ValueError("No frames to save. Add frames with add_frame() first.")
 
         output_path = Path(output_path)
-        original_frame_count = len(self.frames)
+        recorder = Metrics(enabled=metrics)
+        try:
+            info = self._save(output_path, num_colors, optimize_for_emoji, remove_duplicates,
+                              delta_encode, dither, palette, workers, executor, lossy, recorder)
+        finally:
+            recorder.close()
+
+        if metrics:
+            info['metrics'] = recorder.as_dict()
+        return info
 
+    def _save(self, output_path: Path, num_colors: int, optimize_for_emoji: bool,
+              remove_duplicates: bool, delta_encode: bool, dither: Optional[str],
+              palette: Optional[list[tuple[int, int, int]] | str], workers: int,
+              executor: str, lossy: int, recorder: Metrics) -> dict:
+        """The stages of save(), each timed by recorder."""
         # Remove duplicate frames to reduce file size
         if remove_duplicates:
-            removed = self.deduplicate_frames(threshold=0.98)
+            with recorder.stage('dedup', bytes_in=_nbytes(self.frames)) as stage:
+                removed = self.deduplicate_frames(threshold=0.98)
+                stage['bytes_out'] = _nbytes(self.frames)
             if removed > 0:
                 print(f"  Removed {removed} duplicate frames")
 
         # Optimize for emoji if requested
         if optimize_for_emoji:
             if self.width > 128 or self.height > 128:
-                print(f"  Resizing from {self.width}x{self.height} to 128x128 for emoji")
+                print(f"  Resizing from {self.width}x{self.height} to 128x128 for emoji "
+                      f"(render templates with render_size=128 to skip this)")
                 self.width = 128
                 self.height = 128
                 # Resize all frames
-                resized_frames = []
-                for frame in self.frames:
-                    pil_frame = Image.fromarray(frame)
-                    pil_frame = pil_frame.resize((128, 128), Image.Resampling.LANCZOS)
-                    resized_frames.append(np.array(pil_frame))
-                self.frames = resized_frames
+                with recorder.stage('resize', bytes_in=_nbytes(self.frames)) as stage:
+                    self.frames = list(map_frames(partial(_resize_frame, size=(128, 128)),
+                                                  self.frames, workers))
+                    self.dirty_rects = []
+                    stage['bytes_out'] = _nbytes(self.frames)
             num_colors = min(num_colors, 48)  # More aggressive color limit for emoji
 
             # More aggressive FPS reduction for emoji
             if len(self.frames) > 12:
-                print(f"  Reducing frames from {len(self.frames)} to ~12 for emoji size")
-                # Keep every nth frame to get close to 12 frames
-                keep_every = max(1, len(self.frames) // 12)
-                self.frames = [self.frames[i] for i in range(0, len(self.frames), keep_every)]
-
-        # Optimize colors with global palette
-        optimized_frames = self.optimize_colors(num_colors, use_global_palette=True)
-
-        # Calculate frame duration in milliseconds
-        frame_duration = 1000 / self.fps
+                print(f"  Reducing frames from {len(self.frames)} to 12 for emoji size")
+                with recorder.stage('decimate', bytes_in=_nbytes(self.frames)) as stage:
+                    self.decimate_frames(12)
+                    stage['bytes_out'] = _nbytes(self.frames)
+
+        # Per-frame delays in GIF centisecond steps
+        delays = _gif_delays(self.frame_durations())
+
+        # Quantize to indices with a global palette; in delta mode one
+        # palette slot is reserved as the transparent "unchanged" index
+        num_colors = min(num_colors, _max_colors(delta_encode))
+        with recorder.stage('palette') as stage:
+            palette = self._resolve_palette(num_colors, palette)
+            stage['colors'] = len(palette)
+        with recorder.stage('mapping', bytes_in=_nbytes(self.frames)) as stage:
+            indexed_frames = self._map_frames(palette, dither, workers, executor)
+            stage['bytes_out'] = indexed_frames.nbytes
+
+        with recorder.stage('encode', bytes_in=indexed_frames.nbytes) as stage:
+            if delta_encode:
+                gif_palette = _with_transparent_slot(palette)
+                encoded = _encode_delta_frames(indexed_frames, gif_palette, delays, workers, lossy,
+                                               self.frame_rects(), executor)
+                delta_saved = [saved for _, saved in encoded]
+                encoded = [data for data, _ in encoded]
+            else:
+                gif_palette = palette
+                encoded = parallel_map(partial(_encode_frame, palette=palette, lossy=lossy),
+                                       list(zip(indexed_frames, delays)), workers,
+                                       executor=executor)
+            stage['bytes_out'] = sum(len(data) for data in encoded)
 
         # Save GIF
-        imageio.imwrite(
-            output_path,
-            optimized_frames,
-            duration=frame_duration,
-            loop=0  # Infinite loop
-        )
+        with recorder.stage('write') as stage:
+            with GIFWriter(output_path, self.width, self.height, gif_palette, loop=0) as writer:
+                for data in encoded:
+                    writer.write_encoded_frame(data)
+            stage['bytes_out'] = writer.bytes_written
+
+        if delta_encode:
+            print(f"  Delta encoding saved {sum(delta_saved) / 1024:.1f} KB")
+
+        info = self._report(output_path, len(indexed_frames), len(palette),
+                            optimize_for_emoji, total_ms=sum(delays))
+        if delta_encode:
+            _add_delta_info(info, delta_saved)
+        return info
 
+    def _report(self, output_path: Path, frame_count: int, num_colors: int,
+                optimize_for_emoji: bool, total_ms: float) -> dict:
+        """Collect file info for a written GIF, print it and warn about limits."""
         # Get file info
         file_size_kb = output_path.stat().st_size / 1024
         file_size_mb = file_size_kb / 1024
@@ -216,9 +539,9 @@ class GIFBuilder:
             'size_kb': file_size_kb,
             'size_mb': file_size_mb,
             'dimensions': f'{self.width}x{self.height}',
-            'frame_count': len(optimized_frames),
+            'frame_count': frame_count,
             'fps': self.fps,
-            'duration_seconds': len(optimized_frames) / self.fps,
+            'duration_seconds': total_ms / 1000,
             'colors': num_colors
         }
 
@@ -227,7 +550,7 @@ class GIFBuilder:
         print(f"  Path: {output_path}")
         print(f"  Size: {file_size_kb:.1f} KB ({file_size_mb:.2f} MB)")
         print(f"  Dimensions: {self.width}x{self.height}")
-        print(f"  Frames: {len(optimized_frames)} @ {self.fps} fps")
+        print(f"  Frames: {frame_count} @ {self.fps} fps")
         print(f"  Duration: {info['duration_seconds']:.1f}s")
         print(f"  Colors: {num_colors}")
 
@@ -241,6 +564,447 @@ class GIFBuilder:
 
         return info
 
+    def save_within_budget(self, output_path: str | Path, max_bytes: Optional[int] = None,
+                           is_emoji: bool = True, max_colors: int = 255,
+                           remove_duplicates: bool = True, workers: int = 1) -> dict:
+        """
+        Save the best-quality GIF that fits a size budget.
+
+        Searches over dimensions, frame decimation and color count (in that
+        order of priority - smaller canvases and dropped frames are only used
+        when fewer colors are not enough). Both dither modes are tried at each
+        color count; if both fit, the one closer to the source wins. Resized frames, palettes
+        and quantized frames are cached between attempts and every attempt is
+        encoded in memory, so only the chosen result is written to disk.
+
+        Args:
+            output_path: Where to save the GIF
+            max_bytes: Size budget in bytes (None = Slack limit from validators)
+            is_emoji: Target emoji (<=128px, 64KB) or message GIF (2MB)
+            max_colors: Upper bound for the color search (8-255)
+            remove_duplicates: Remove duplicate consecutive frames first
+            workers: Frames resized and encoded in parallel per attempt
+                (1 = serial, 0 = one per CPU)
+
+        Returns:
+            Dictionary with file info, plus 'budget' with the chosen settings
+            (including the effective fps after dropping frames), the budget,
+            whether it fits and how many encodes were tried
+        """
+        if self.is_streaming:
+            raise ValueError("Builder is streaming to a file; call finish() instead.")
+
+        if not self.frames:
+            raise ValueError("No frames to save. Add frames with add_frame() first.")
+
+        output_path = Path(output_path)
+        if max_bytes is None:
+            max_bytes = get_size_limit_bytes(is_emoji)
+
+        if remove_duplicates:
+            removed = self.deduplicate_frames(threshold=0.98)
+            if removed > 0:
+                print(f"  Removed {removed} duplicate frames")
+
+        # Candidate canvas sizes, largest first
+        base_scale = min(1.0, 128 / max(self.width, self.height)) if is_emoji else 1.0
+        min_side = 64 if is_emoji else 240
+        sizes = []
+        for scale in BUDGET_SCALE_STEPS:
+            size = (max(1, round(self.width * base_scale * scale)),
+                    max(1, round(self.height * base_scale * scale)))
+            if size not in sizes and (not sizes or min(size) >= min_side):
+                sizes.append(size)
+
+        frame_steps = [step for step in BUDGET_FRAME_STEPS
+                       if step == 1 or len(self.frames) // step >= 2]
+        color_steps = [c for c in BUDGET_COLOR_STEPS if c <= max_colors] or [max(2, max_colors)]
+
+        resized_cache: dict[tuple[int, int], list[np.ndarray] | np.ndarray] = {}
+        palette_cache: dict[tuple, np.ndarray] = {}
+        indexed_cache: dict[tuple, np.ndarray] = {}
+        encoded_cache: dict[tuple, bytes] = {}
+
+        def frames_at(size):
+            if size not in resized_cache:
+                if size == (self.width, self.height):
+                    resized_cache[size] = self.frames
+                else:
+                    resized_cache[size] = map_frames(partial(_resize_frame, size=size),
+                                                     self.frames, workers)
+            return resized_cache[size]
+
+        durations = self.frame_durations()
+        energy = _motion_energy(self.frames)
+        keep_cache: dict[int, list[int]] = {}
+
+        def keep_for(step):
+            # Frames kept when reducing the count by step, chosen by motion
+            if step not in keep_cache:
+                keep_cache[step] = _select_frames(energy, max(1, len(durations) // step))
+            return keep_cache[step]
+
+        def delays_for(step):
+            return _gif_delays(_merge_durations(durations, keep_for(step)))
+
+        def encode(size, step, colors, dither):
+            key = (size, step, colors, dither)
+            if key in encoded_cache:
+                return encoded_cache[key]
+
+            frames = frames_at(size)
+            palette_key = (size, colors)
+            if palette_key not in palette_cache:
+                palette_cache[palette_key] = build_palette(frames, colors)
+            palette = palette_cache[palette_key]
+
+            indexed_key = (size, colors, dither)
+            if indexed_key not in indexed_cache:
+                indexed_cache[indexed_key] = map_to_palette(frames, palette, dither=dither)
+
+            encoded_cache[key] = _encode_delta_gif(
+                indexed_cache[indexed_key][keep_for(step)], _with_transparent_slot(palette), size,
+                delays=delays_for(step), workers=workers,
+            )
+            return encoded_cache[key]
+
+        error_cache: dict[tuple, float] = {}
+
+        def error(size, colors, dither):
+            # How far the quantized frames look from the source
+            key = (size, colors, dither)
+            if key not in error_cache:
+                error_cache[key] = _perceived_error(frames_at(size), indexed_cache[key],
+                                                    palette_cache[(size, colors)])
+            return error_cache[key]
+
+        def fitting(size, step, colors):
+            # Dither modes that fit at this color count; both are always
+            # encoded, since which one is smaller depends on the content
+            return [dither for dither in (None, 'bayer')
+                    if len(encode(size, step, colors, dither)) <= max_bytes]
+
+        # Best fit: largest size, then fewest dropped frames, then the most
+        # colors found by binary search (size shrinks monotonically with
+        # the color count in practice), then whichever dither mode looks
+        # closer to the source
+        best = None
+        smallest = None
+        for size in sizes:
+            for step in frame_steps:
+                if not fitting(size, step, color_steps[-1]):
+                    for dither in (None, 'bayer'):
+                        config = (size, step, color_steps[-1], dither)
+                        if smallest is None or len(encoded_cache[config]) < len(smallest[1]):
+                            smallest = (config, encoded_cache[config])
+                    continue
+
+                lo, hi = 0, len(color_steps) - 1
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if fitting(size, step, color_steps[mid]):
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                colors = color_steps[lo]
+                dither = min(fitting(size, step, colors),
+                             key=lambda mode: error(size, colors, mode))
+                config = (size, step, colors, dither)
+                best = (config, encoded_cache[config])
+                break
+            if best is not None:
+                break
+
+        fits = best is not None
+        if not fits:
+            best = smallest
+        (size, step, colors, dither), data = best
+
+        output_path.write_bytes(data)
+
+        print(f"  Budget search: {len(encoded_cache)} encodes, chose {size[0]}x{size[1]}, "
+              f"{colors} colors, {len(keep_for(step))} of {len(durations)} frames, "
+              f"dither {dither or 'off'}")
+
+        rects = self.frame_rects() if size == (self.width, self.height) else []
+        self.width, self.height = size
+        resized = frames_at(size)
+        self.frames = [resized[i] for i in keep_for(step)]
+        self.durations = _merge_durations(durations, keep_for(step))
+        self.dirty_rects = _merge_rects(rects, keep_for(step)) if rects else []
+
+        # fps stays the builder's nominal rate; the kept frames' timing is in
+        # self.durations, and the effective rate is reported below
+        total_ms = sum(delays_for(step))
+        info = self._report(output_path, len(self.frames), colors, optimize_for_emoji=is_emoji,
+                            total_ms=total_ms)
+        info['budget'] = {
+            'max_bytes': max_bytes,
+            'fits': fits,
+            'attempts': len(encoded_cache),
+            'width': size[0],
+            'height': size[1],
+            'colors': colors,
+            'frame_step': step,
+            'fps': round(len(self.frames) * 1000 / total_ms, 2) if total_ms else self.fps,
+            'dither': dither,
+        }
+
+        if not fits:
+            print(f"\n⚠️  WARNING: No configuration fits {max_bytes / 1024:.1f} KB; "
+                  "saved the smallest result")
+
+        return info
+
     def clear(self):
         """Clear all frames (useful for creating multiple GIFs)."""
-        self.frames = []
\ No newline at end of file
+        self.frames = []
+        self.durations = []
+        self.dirty_rects = []
+
+
+def _frames_match(a: np.ndarray, b: np.ndarray, threshold: float,
+                  rows_per_chunk: int = 64) -> bool:
+    """
+    Return True if two frames are at least threshold similar.
+
+    Similarity is 1.0 minus the normalized mean absolute difference. The
+    uint8 absolute difference is summed a band of rows at a time, without
+    float copies, stopping as soon as the total exceeds what the threshold
+    allows.
+    """
+    if a.shape != b.shape:
+        return False
+
+    budget = (1.0 - threshold) * 255.0 * a.size
+    total = 0
+    for start in range(0, a.shape[0], rows_per_chunk):
+        band_a = a[start:start + rows_per_chunk]
+        band_b = b[start:start + rows_per_chunk]
+        # max - min is the absolute difference without leaving uint8
+        total += int(np.subtract(np.maximum(band_a, band_b), np.minimum(band_a, band_b)).sum())
+        if total > budget:
+            return False
+    return True
+
+
+def _motion_energy(frames: list[np.ndarray] | np.ndarray) -> np.ndarray:
+    """
+    Mean absolute change of each frame from the previous one, 0-255.
+
+    Computed over the whole stack at once; energy[0] is 0.
+    """
+    stack = np.asarray(frames)
+    energy = np.zeros(len(stack), dtype=np.float64)
+    if len(stack) > 1:
+        diff = np.subtract(np.maximum(stack[1:], stack[:-1]), np.minimum(stack[1:], stack[:-1]))
+        energy[1:] = diff.reshape(len(stack) - 1, -1).mean(axis=1)
+    return energy
+
+
+def _perceived_error(frames: list[np.ndarray] | np.ndarray, indexed: np.ndarray,
+                     palette: np.ndarray) -> float:
+    """
+    Mean squared difference between frames and their quantized version, 0-65025.
+
+    Both are averaged over 4x4 blocks (one Bayer tile) first, the way the
+    eye blends a dither pattern, so dithering is credited for the colors it
+    reproduces rather than penalized for its per-pixel noise.
+    """
+    stack = np.asarray(frames)
+    block = 4 if min(stack.shape[1:3]) >= 4 else 1
+    height, width = (dim - dim % block for dim in stack.shape[1:3])
+
+    def blur(pixels):
+        pixels = pixels[:, :height, :width].astype(np.float32)
+        return pixels.reshape(len(pixels), height // block, block,
+                              width // block, block, 3).mean(axis=(2, 4))
+
+    return float(((blur(stack) - blur(palette[indexed])) ** 2).mean())
+
+
+def _select_frames(energy: np.ndarray, target_count: int) -> list[int]:
+    """
+    Choose which frames to keep so the decimated animation follows the motion.
+
+    Dropping frames i+1..j-1 means frame i stays on screen in their place;
+    the error is how far the motion has moved on by each of them, measured
+    as cumulative motion energy since frame i. Dynamic programming finds the
+    split of the sequence into at most target_count such holds (each
+    starting at a kept frame) with the least total error.
+
+    Returns:
+        Sorted frame indices, starting with 0
+    """
+    count = len(energy)
+    if count <= target_count:
+        return list(range(count))
+
+    # travel[k]: motion accumulated from frame 0 to frame k;
+    # prefix[k]: sum of travel[0..k-1], so hold errors are O(1) differences
+    travel = np.cumsum(energy)
+    prefix = np.concatenate([[0.0], np.cumsum(travel)])
+    starts = np.arange(count)
+
+    def hold_error(stop):
+        # Error of holding each frame i < stop until stop (frames i..stop-1)
+        i = starts[:stop]
+        return (prefix[stop] - prefix[i]) - (stop - i) * travel[i]
+
+    # best[j]: least error covering frames 0..j-1 with the holds used so far
+    best = np.full(count + 1, np.inf)
+    best[1:] = [hold_error(stop)[0] for stop in range(1, count + 1)]
+    choices = []
+    for _ in range(target_count - 1):
+        previous = best
+        best = np.full(count + 1, np.inf)
+        choice = np.zeros(count + 1, dtype=np.int64)
+        for stop in range(2, count + 1):
+            candidates = previous[1:stop] + hold_error(stop)[1:stop]
+            choice[stop] = int(np.argmin(candidates)) + 1
+            best[stop] = candidates[choice[stop] - 1]
+        choices.append(choice)
+
+    # Walk the choices back from the end to recover the hold starts
+    keep = []
+    stop = count
+    for choice in reversed(choices):
+        start = int(choice[stop])
+        keep.append(start)
+        stop = start
+    keep.append(0)
+    return sorted(set(keep))
+
+
+def _merge_durations(durations: list[float], keep: list[int]) -> list[float]:
+    """
+    Durations of the kept frames after dropping the rest.
+
+    Each kept frame absorbs the display time of the frames dropped after it
+    (frames before the first kept one go to the first), so the total is unchanged.
+    """
+    boundaries = list(keep[1:]) + [len(durations)]
+    merged = [sum(durations[start:stop]) for start, stop in zip(keep, boundaries)]
+    if merged and keep[0] > 0:
+        merged[0] += sum(durations[:keep[0]])
+    return merged
+
+
+def _merge_rects(rects: list[Optional[tuple[int, int, int, int]]],
+                 keep: list[int]) -> list[Optional[tuple[int, int, int, int]]]:
+    """
+    Dirty rectangles of the kept frames after dropping the rest.
+
+    A kept frame follows the previous kept one, so its rectangle is the union
+    of its own and those of the frames dropped in between.
+    """
+    merged = [None]  # The first frame is always encoded in full
+    for previous, index in zip(keep, keep[1:]):
+        merged.append(union_rects(rects[previous + 1:index + 1]))
+    return merged[:len(keep)]
+
+
+def _gif_delays(durations: list[float]) -> list[int]:
+    """
+    Round durations to the GIF's 10 ms steps without drifting.
+
+    Rounds the running total rather than each frame, so e.g. 15 fps becomes
+    70/60/70 ms instead of a constant 60 ms that plays 10% fast.
+    """
+    delays = []
+    elapsed = 0.0
+    written = 0
+    for duration_ms in durations:
+        elapsed += duration_ms
+        delay = int(round(elapsed / 10)) * 10 - written
+        delays.append(delay)
+        written += delay
+    return delays
+
+
+def _max_colors(reserve_transparent: bool) -> int:
+    """Largest usable palette size, leaving room for a transparent index if needed."""
+    return 255 if reserve_transparent else 256
+
+
+def _with_transparent_slot(palette: np.ndarray) -> np.ndarray:
+    """
+    Append the transparent entry used by delta frames to an (N, 3) palette.
+
+    Frames are mapped against the original palette, so no pixel ever uses it.
+    """
+    return np.vstack([palette, np.zeros((1, 3), dtype=np.uint8)])
+
+
+def _add_delta_info(info: dict, delta_saved: list[int]):
+    """Record per-frame delta encoding savings in a save()/finish() info dict."""
+    info['delta_bytes_saved'] = delta_saved
+    info['delta_bytes_saved_total'] = sum(delta_saved)
+
+
+def _nbytes(frames: list[np.ndarray]) -> int:
+    """Total size of a list of frames in bytes."""
+    return sum(frame.nbytes for frame in frames)
+
+
+def _resize_frame(frame: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """LANCZOS-resize one RGB frame to (width, height)."""
+    return np.array(Image.fromarray(frame).resize(size, Image.Resampling.LANCZOS))
+
+
+def _quantize_frame(frame: np.ndarray, num_colors: int) -> np.ndarray:
+    """Quantize one frame with its own palette and return it as RGB."""
+    quantized = Image.fromarray(frame).quantize(colors=num_colors, method=2, dither=1)
+    return np.array(quantized.convert('RGB'))
+
+
+def _encode_delta_frames(indexed_frames: list[np.ndarray] | np.ndarray, palette: np.ndarray,
+                         delays: list[float], workers: int = 1, lossy: int = 0,
+                         rects: Optional[list[Optional[tuple]]] = None,
+                         executor: str = 'thread') -> list[tuple[bytes, int]]:
+    """
+    Delta-encode indexed frames, in parallel when workers > 1.
+
+    Every frame's predecessor is already known, so frames are encoded
+    independently and returned in order as (bytes, bytes saved) pairs.
+    The last palette entry is the transparent index. Known dirty rectangles
+    (None = diff the frames) hold in index space too, as palette mapping
+    is per pixel.
+    """
+    previous = [None] + list(indexed_frames[:-1])
+    transparency = len(palette) - 1
+    if rects is None:
+        rects = [None] * len(indexed_frames)
+    return parallel_map(
+        partial(_encode_delta_frame, palette=palette, transparency=transparency, lossy=lossy),
+        list(zip(previous, indexed_frames, delays, rects)), workers, executor=executor)
+
+
+def _encode_frame(item: tuple[np.ndarray, float], palette: np.ndarray, lossy: int) -> bytes:
+    """Encode one (indices, delay) pair; module-level so process pools can pickle it."""
+    indices, delay = item
+    return encode_frame(indices, palette, delay, lossy=lossy)
+
+
+def _encode_delta_frame(item: tuple, palette: np.ndarray, transparency: int,
+                        lossy: int) -> tuple[bytes, int]:
+    """Delta-encode one (previous, indices, delay, rect) tuple (picklable)."""
+    previous, indices, delay, rect = item
+    return encode_delta_frame(indices, previous, palette, delay, transparency, rect, lossy=lossy)
+
+
+def _encode_delta_gif(indexed_frames: list[np.ndarray] | np.ndarray, palette: np.ndarray,
+                      size: tuple[int, int], delays: list[float], workers: int = 1) -> bytes:
+    """Delta-encode indexed frames in memory; the last palette entry is transparent."""
+    buffer = io.BytesIO()
+    with GIFWriter(buffer, size[0], size[1], palette, loop=0) as writer:
+        for data, _ in _encode_delta_frames(indexed_frames, palette, delays, workers):
+            writer.write_encoded_frame(data)
+    return buffer.getvalue()
+
+
+def _as_palette(palette: list[tuple[int, int, int]] | np.ndarray | str) -> np.ndarray:
+    """Convert RGB colors or a core.color_palettes name to an (N, 3) uint8 array."""
+    if isinstance(palette, str):
+        return named_palette(palette)
+    return np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+GIF Writer - Incremental GIF89a encoder for palette-indexed frames.
+
+Writes the header and global color table once, then appends each frame as it
+is produced, so callers never have to hold the whole animation in memory.
+Frames are written as given - no re-quantization - with a per-frame choice
+between the global color table and a smaller local one, and an optional
+lossy LZW mode.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+import struct
+
+from PIL import Image, GifImagePlugin
+import numpy as np
+
+
+# Graphic Control Extension disposal methods
+DISPOSE_UNSPECIFIED = 0  # Decoder decides (usually same as DISPOSE_KEEP)
+DISPOSE_KEEP = 1         # Leave the frame in place; next frame draws on top
+DISPOSE_BACKGROUND = 2   # Clear the frame's rectangle to the background
+DISPOSE_PREVIOUS = 3     # Restore the canvas to what it was before the frame
+
+# Frames up to this many pixels are LZW-coded in Python with the smallest
+# legal code size; larger lossless frames use Pillow's C coder (fixed 8-bit
+# code size, ~3% larger output but an order of magnitude faster, and it
+# releases the GIL). The Python coder holds the GIL, so parallel encoding of
+# small or lossy frames needs processes rather than threads
+NATIVE_LZW_MAX_PIXELS = 256 * 256
+
+LZW_MAX_CODE = 4096
+
+# A dirty rectangle with nothing in it: the frame is unchanged
+EMPTY_RECT = (0, 0, 0, 0)
+
+
+def dirty_rect(previous: np.ndarray, current: np.ndarray) -> tuple[int, int, int, int] | None:
+    """
+    Find the bounding box of pixels that differ between two indexed frames.
+
+    Args:
+        previous: (H, W) indices of the frame currently on the canvas
+        current: (H, W) indices of the next frame
+
+    Returns:
+        (x0, y0, x1, y1) with exclusive x1/y1, or None if the frames are identical
+    """
+    changed = previous != current
+    rows = np.flatnonzero(changed.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+
+def union_rects(rects: list[tuple[int, int, int, int] | None]
+                ) -> tuple[int, int, int, int] | None:
+    """
+    Bounding box of several dirty rectangles.
+
+    Args:
+        rects: (x0, y0, x1, y1) rectangles; None means "unknown" and empty
+            rectangles mean "unchanged"
+
+    Returns:
+        The union, None if any rectangle is unknown, or EMPTY_RECT if all are empty
+    """
+    boxes = []
+    for rect in rects:
+        if rect is None:
+            return None
+        if rect[2] > rect[0] and rect[3] > rect[1]:
+            boxes.append(rect)
+    if not boxes:
+        return EMPTY_RECT
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def _color_table_bits(num_colors: int) -> int:
+    """Return the GIF size field for a color table holding num_colors entries."""
+    bits = 1
+    while (1 << bits) < num_colors:
+        bits += 1
+    return bits
+
+
+def _color_table_bytes(palette: np.ndarray) -> bytes:
+    """Pad an (N, 3) palette to the next power of two and return its bytes."""
+    size = 1 << _color_table_bits(len(palette))
+    table = np.zeros((size, 3), dtype=np.uint8)
+    table[:len(palette)] = palette
+    return table.tobytes()
+
+
+def lzw_encode(pixels: np.ndarray | bytes, min_code_size: int,
+               similar: tuple[tuple[int, ...], ...] | None = None) -> bytes:
+    """
+    LZW-compress palette indices into a GIF code stream.
+
+    With similar, the coder is lossy (in the style of gifsicle's --lossy):
+    when the exact next pixel would end the current string, a listed
+    near-identical color that extends it is used instead, so strings run
+    longer and fewer codes are emitted.
+
+    Args:
+        pixels: Flat sequence of palette indices (all < 2 ** min_code_size)
+        min_code_size: GIF LZW minimum code size (2-8)
+        similar: For each index, the indices it may be replaced with, best first
+
+    Returns:
+        Packed codes (not yet split into sub-blocks)
+    """
+    data = bytes(np.ascontiguousarray(pixels, dtype=np.uint8).ravel())
+    clear = 1 << min_code_size
+    end = clear + 1
+
+    out = bytearray()
+    bits = 0      # Pending output bits, LSB first
+    pending = 0   # Number of pending bits
+    code_size = min_code_size + 1
+    next_code = end + 1
+    table: dict[int, int] = {}
+    lookup = table.get
+
+    bits |= clear << pending
+    pending += code_size
+
+    prefix = data[0]
+    for pixel in data[1:]:
+        key = (prefix << 8) | pixel
+        code = lookup(key)
+        if code is None and similar is not None:
+            for substitute in similar[pixel]:
+                code = lookup((prefix << 8) | substitute)
+                if code is not None:
+                    break
+        if code is not None:
+            prefix = code
+            continue
+
+        bits |= prefix << pending
+        pending += code_size
+        while pending >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            pending -= 8
+
+        if next_code < LZW_MAX_CODE:
+            table[key] = next_code
+            next_code += 1
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size += 1
+        else:
+            # Table full: start over rather than coding with a stale table
+            bits |= clear << pending
+            pending += code_size
+            table.clear()
+            next_code = end + 1
+            code_size = min_code_size + 1
+        prefix = pixel
+
+    for code in (prefix, end):
+        bits |= code << pending
+        pending += code_size
+    while pending > 0:
+        out.append(bits & 0xFF)
+        bits >>= 8
+        pending -= 8
+    return bytes(out)
+
+
+def _sub_blocks(data: bytes) -> bytes:
+    """Split image data into length-prefixed sub-blocks plus the terminator."""
+    blocks = [bytes((len(data[i:i + 255]),)) + data[i:i + 255] for i in range(0, len(data), 255)]
+    return b''.join(blocks) + b'\x00'
+
+
+def _pillow_image_data(indices: np.ndarray) -> bytes:
+    """Minimum code size byte and sub-blocks from Pillow's C LZW coder (code size 8)."""
+    frame = Image.fromarray(indices, mode='P')
+    data = b''.join(bytes(chunk) for chunk in GifImagePlugin.getdata(frame))
+    # Without encoder options Pillow writes only the 10-byte image descriptor
+    # before the code size byte, which we re-emit with our own descriptor
+    return data[10:]
+
+
+@lru_cache(maxsize=64)
+def _similar_colors(palette_bytes: bytes, lossy: int,
+                    transparency: int | None) -> tuple[tuple[int, ...], ...]:
+    """For each palette index, the other indices within lossy RGB distance, nearest first."""
+    colors = np.frombuffer(palette_bytes, dtype=np.uint8).reshape(-1, 3).astype(np.float32)
+    distances = np.sqrt(((colors[:, None, :] - colors[None, :, :]) ** 2).sum(axis=-1))
+    np.fill_diagonal(distances, np.inf)
+    if transparency is not None and transparency < len(colors):
+        # Never trade pixels into or out of transparency
+        distances[transparency, :] = np.inf
+        distances[:, transparency] = np.inf
+
+    similar = []
+    for row in distances:
+        order = np.argsort(row, kind='stable')
+        similar.append(tuple(int(i) for i in order[row[order] <= lossy]))
+    # Indices past the palette can appear in padded tables; they match nothing
+    similar += [()] * (256 - len(similar))
+    return tuple(similar)
+
+
+def _image_block(indices: np.ndarray, offset: tuple[int, int], table: np.ndarray | None,
+                 bits: int, similar: tuple[tuple[int, ...], ...] | None) -> bytes:
+    """Image descriptor, optional local color table and LZW image data."""
+    height, width = indices.shape
+    flags = 0x80 | (bits - 1) if table is not None else 0
+    block = b',' + struct.pack('<HHHHB', offset[0], offset[1], width, height, flags)
+    if table is not None:
+        block += _color_table_bytes(table)
+
+    min_code_size = max(2, bits)
+    if similar is None and min_code_size == 8 and indices.size > NATIVE_LZW_MAX_PIXELS:
+        return block + _pillow_image_data(indices)
+    return block + bytes((min_code_size,)) + _sub_blocks(lzw_encode(indices, min_code_size, similar))
+
+
+def encode_frame(indices: np.ndarray, palette: np.ndarray, duration_ms: float,
+                 offset: tuple[int, int] = (0, 0), transparency: int | None = None,
+                 disposal: int = DISPOSE_UNSPECIFIED, local_palette: bool = True,
+                 lossy: int = 0) -> bytes:
+    """
+    Encode one frame (control extension, descriptor and image data).
+
+    Encoding has no writer state, so frames can be encoded in parallel and
+    written in order afterwards with GIFWriter.write_encoded_frame(). Only
+    Pillow's coder (large lossless frames) releases the GIL; the Python LZW
+    coder needs a process pool to scale (see core.parallel).
+
+    Small frames are LZW-coded with the smallest code size the palette
+    allows. If the frame uses few enough colors that a local color table
+    needs fewer bits than the global one, both are encoded and the smaller
+    result is kept.
+
+    Args:
+        indices: (H, W) uint8 array of indices into the global palette
+        palette: (N, 3) global palette the indices refer to
+        duration_ms: Display time of this frame in milliseconds
+        offset: (x, y) position of the frame on the canvas
+        transparency: Palette index to treat as transparent (None = opaque)
+        disposal: One of the DISPOSE_* constants
+        local_palette: Allow a local color table when it saves bytes
+        lossy: Lossy LZW tolerance as an RGB distance (0 = lossless; 20-60
+            is usually invisible on flat artwork)
+
+    Returns:
+        Encoded frame bytes
+    """
+    indices = np.ascontiguousarray(indices, dtype=np.uint8)
+    palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+    global_bits = _color_table_bits(len(palette))
+    similar = _similar_colors(palette.tobytes(), lossy, transparency) if lossy else None
+
+    # (transparent index, image block) for each candidate color table
+    candidates = [(transparency, _image_block(indices, offset, None, global_bits, similar))]
+
+    if local_palette and (lossy or indices.size <= NATIVE_LZW_MAX_PIXELS):
+        used = np.flatnonzero(np.bincount(indices.ravel(), minlength=len(palette)))
+        if transparency is not None and transparency not in used:
+            used = np.append(used, transparency)
+        if _color_table_bits(len(used)) < global_bits:
+            remap = np.zeros(256, dtype=np.uint8)
+            remap[used] = np.arange(len(used), dtype=np.uint8)
+            table = palette[used]
+            local_transparency = int(remap[transparency]) if transparency is not None else None
+            local_similar = (_similar_colors(table.tobytes(), lossy, local_transparency)
+                             if lossy else None)
+            candidates.append((local_transparency, _image_block(
+                remap[indices], offset, table, _color_table_bits(len(used)), local_similar)))
+
+    transparent_index, image = min(candidates, key=lambda candidate: len(candidate[1]))
+
+    control = b''
+    delay = int(round(duration_ms / 10))
+    if transparent_index is not None or delay or disposal:
+        packed = (disposal << 2) | (1 if transparent_index is not None else 0)
+        control = b'!\xf9\x04' + struct.pack('<BHB', packed, delay, transparent_index or 0) + b'\x00'
+    return control + image
+
+
+def encode_delta_frame(indices: np.ndarray, previous: np.ndarray | None,
+                       palette: np.ndarray, duration_ms: float, transparency: int,
+                       rect: tuple[int, int, int, int] | None = None,
+                       local_palette: bool = True, lossy: int = 0) -> tuple[bytes, int]:
+    """
+    Encode a full-canvas frame as the region that changed since the previous one.
+
+    See GIFWriter.write_delta_frame() for the format.
+
+    Args:
+        indices: (H, W) uint8 array of indices for the whole canvas
+        previous: Indices of the frame on the canvas before this one (None for
+            the first frame, which is encoded in full)
+        palette: (N, 3) global palette
+        duration_ms: Display time of this frame in milliseconds
+        transparency: Palette index reserved for "unchanged" pixels
+        rect: Optional (x0, y0, x1, y1) dirty rectangle covering every changed
+            pixel (e.g. from core.scene); computed when None, and an empty
+            rectangle means nothing changed
+        local_palette: Allow a local color table when it saves bytes
+        lossy: Lossy LZW tolerance (see encode_frame())
+
+    Returns:
+        (encoded bytes, bytes saved versus encoding the full frame)
+    """
+    options = {'local_palette': local_palette, 'lossy': lossy}
+    indices = np.asarray(indices, dtype=np.uint8)
+    full = encode_frame(indices, palette, duration_ms, (0, 0), None, DISPOSE_KEEP, **options)
+    if previous is None:
+        return full, 0
+
+    if rect is None:
+        rect = dirty_rect(previous, indices)
+
+    if rect is None or rect[2] <= rect[0] or rect[3] <= rect[1]:
+        # Nothing changed - a single transparent pixel keeps the timing
+        sub = np.full((1, 1), transparency, dtype=np.uint8)
+        offset = (0, 0)
+    else:
+        x0, y0, x1, y1 = rect
+        sub = indices[y0:y1, x0:x1].copy()
+        sub[previous[y0:y1, x0:x1] == sub] = transparency
+        offset = (x0, y0)
+
+    data = encode_frame(sub, palette, duration_ms, offset, transparency, DISPOSE_KEEP, **options)
+    if len(data) > len(full):
+        return full, 0
+    return data, len(full) - len(data)
+
+
+class GIFWriter:
+    """Streams palette-indexed frames to a GIF file or file-like object."""
+
+    def __init__(self, output: str | Path | BinaryIO, width: int, height: int,
+                 palette: np.ndarray | list[tuple[int, int, int]], loop: int = 0,
+                 local_palettes: bool = True, lossy: int = 0):
+        """
+        Open the output and write the GIF header.
+
+        Args:
+            output: Path to write to, or a binary file-like object (e.g. BytesIO)
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            palette: Global color table as (N, 3) RGB values (N <= 256)
+            loop: Number of loops (0 = infinite)
+            local_palettes: Give frames a local color table when it saves bytes
+            lossy: Lossy LZW tolerance for every frame (see encode_frame())
+        """
+        self.width = width
+        self.height = height
+        self.local_palettes = local_palettes
+        self.lossy = lossy
+        self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        if not 1 <= len(self.palette) <= 256:
+            raise ValueError(f"Palette must have 1-256 colors, got {len(self.palette)}")
+
+        if isinstance(output, (str, Path)):
+            self._fp = open(output, 'wb')
+            self._owns_fp = True
+        else:
+            self._fp = output
+            self._owns_fp = False
+
+        self.frame_count = 0
+        self.bytes_written = 0
+        self.closed = False
+
+        # Full canvas as last written by write_delta_frame()
+        self._canvas: np.ndarray | None = None
+
+        self._write_header(loop)
+
+    def _write(self, data: bytes):
+        self._fp.write(data)
+        self.bytes_written += len(data)
+
+    def _write_header(self, loop: int):
+        bits = _color_table_bits(len(self.palette))
+        # Global color table present, 8-bit color resolution, table size
+        packed = 0x80 | (7 << 4) | (bits - 1)
+        self._write(b'GIF89a' + struct.pack('<HHBBB', self.width, self.height, packed, 0, 0))
+        self._write(_color_table_bytes(self.palette))
+
+        # NETSCAPE2.0 application extension for looping
+        self._write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', loop) + b'\x00')
+
+    def write_frame(self, indices: np.ndarray, duration_ms: float,
+                    offset: tuple[int, int] = (0, 0),
+                    transparency: int | None = None,
+                    disposal: int = DISPOSE_UNSPECIFIED) -> int:
+        """
+        Append one frame.
+
+        Args:
+            indices: (H, W) uint8 array of indices into the global palette
+            duration_ms: Display time of this frame in milliseconds
+            offset: (x, y) position of the frame on the canvas
+            transparency: Palette index to treat as transparent (None = opaque)
+            disposal: One of the DISPOSE_* constants
+
+        Returns:
+            Number of bytes written for this frame
+        """
+        data = encode_frame(indices, self.palette, duration_ms, offset, transparency, disposal,
+                            local_palette=self.local_palettes, lossy=self.lossy)
+        return self.write_encoded_frame(data)
+
+    def write_delta_frame(self, indices: np.ndarray, duration_ms: float,
+                          transparency: int,
+                          rect: tuple[int, int, int, int] | None = None) -> tuple[int, int]:
+        """
+        Append a full-canvas frame, encoding only what changed since the last one.
+
+        The changed bounding box is written at its offset with DISPOSE_KEEP, and
+        pixels inside the box that did not change are set to the transparent
+        index so the previous frame shows through (long runs also LZW-compress
+        better than the original pixels).
+
+        Args:
+            indices: (H, W) uint8 array of indices for the whole canvas
+            duration_ms: Display time of this frame in milliseconds
+            transparency: Palette index reserved for "unchanged" pixels; must
+                not be used by any real pixel
+            rect: Optional (x0, y0, x1, y1) dirty rectangle if the caller
+                already knows it (EMPTY_RECT = unchanged); computed by
+                diffing when None
+
+        Returns:
+            (bytes written, bytes saved versus writing the full frame)
+        """
+        indices = np.asarray(indices, dtype=np.uint8)
+        data, saved = encode_delta_frame(indices, self._canvas, self.palette,
+                                         duration_ms, transparency, rect,
+                                         local_palette=self.local_palettes, lossy=self.lossy)
+        self.write_encoded_frame(data, canvas=indices)
+        return len(data), saved
+
+    def write_encoded_frame(self, data: bytes, canvas: np.ndarray | None = None) -> int:
+        """
+        Append a frame produced by encode_frame() or encode_delta_frame().
+
+        Args:
+            data: Encoded frame bytes (indices must refer to this writer's
+                palette, or to the frame's own local table)
+            canvas: Full-canvas indices after this frame, if later frames will
+                be written with write_delta_frame()
+
+        Returns:
+            Number of bytes written for this frame
+        """
+        if self.closed:
+            raise ValueError("Cannot write to a closed GIFWriter")
+
+        if canvas is not None:
+            self._canvas = canvas
+        self._write(data)
+        self.frame_count += 1
+        return len(data)
+
+    def close(self):
+        """Write the GIF trailer and close the output if we opened it."""
+        if self.closed:
+            return
+        self._write(b';')
+        if self._owns_fp:
+            self._fp.close()
+        else:
+            self._fp.flush()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
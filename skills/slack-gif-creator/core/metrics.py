@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Metrics - Per-stage timing, memory and size instrumentation.
+
+Records wall time, peak memory and the byte size in/out of each pipeline
+stage, so slow or oversized GIFs can be traced to a stage without attaching a
+profiler. Results are plain dicts that can be exported as JSON or as a Chrome
+trace (open in chrome://tracing or https://ui.perfetto.dev).
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+import json
+import os
+import time
+import tracemalloc
+
+
+class Metrics:
+    """Collects one record per pipeline stage; a disabled instance costs nothing."""
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        """
+        Args:
+            enabled: Record stages (False = every call is a no-op)
+            trace_memory: Measure peak memory per stage with tracemalloc
+                (slows pure-Python stages down while active)
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages: list[dict] = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str, bytes_in: Optional[int] = None) -> Iterator[dict]:
+        """
+        Time a stage.
+
+        The yielded record can be updated inside the block, e.g. with
+        record['bytes_out'] once the stage's output size is known.
+
+        Args:
+            name: Stage name (dedup, resize, palette, mapping, encode, ...)
+            bytes_in: Size of the stage's input in bytes, if meaningful
+        """
+        record = {'name': name}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            record['start_ms'] = (start - self._origin) * 1000
+            record['wall_ms'] = (end - start) * 1000
+            if self.trace_memory:
+                record['peak_memory_kb'] = (tracemalloc.get_traced_memory()[1] - memory_before) / 1024
+            if bytes_in is not None:
+                record['bytes_in'] = bytes_in
+            if bytes_in is not None and 'bytes_out' in record:
+                record['bytes_delta'] = record['bytes_out'] - bytes_in
+            self.stages.append(record)
+
+    def close(self):
+        """Stop tracemalloc if this instance started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def as_dict(self) -> dict:
+        """Return the recorded stages and their total wall time."""
+        return {
+            'stages': self.stages,
+            'total_ms': sum(stage['wall_ms'] for stage in self.stages),
+        }
+
+
+def export_metrics(metrics: dict, path: str | Path, chrome_trace: bool = False) -> Path:
+    """
+    Write metrics (as returned in info['metrics']) to a file.
+
+    Args:
+        metrics: Metrics dict from Metrics.as_dict()
+        path: Output file
+        chrome_trace: Write Chrome trace-event format instead of plain JSON
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    if not chrome_trace:
+        path.write_text(json.dumps(metrics, indent=2))
+        return path
+
+    pid = os.getpid()
+    events = []
+    for stage in metrics['stages']:
+        args = {key: value for key, value in stage.items()
+                if key not in ('name', 'start_ms', 'wall_ms')}
+        events.append({
+            'name': stage['name'],
+            'ph': 'X',  # Complete event
+            'ts': stage['start_ms'] * 1000,
+            'dur': stage['wall_ms'] * 1000,
+            'pid': pid,
+            'tid': 0,
+            'args': args,
+        })
+    path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+    return path
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Parallel - Order-preserving parallel map over frames.
+
+Pillow's resize and LZW encoder release the GIL, so those stages run well on a
+thread pool. Stages that hold the GIL (the pure-Python LZW coder used for
+small and lossy frames) can use a process pool instead. map_frames() moves
+frames to the workers through shared memory rather than pickling them;
+parallel_map() pickles its items and results, for outputs of varying size
+such as encoded frames.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Sequence
+import os
+
+import numpy as np
+
+
+EXECUTORS = ('thread', 'process')
+
+
+def resolve_workers(workers: int | None) -> int:
+    """Return the worker count to use (0 or None = one per CPU)."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _chunk_ranges(count: int, workers: int, chunk_size: int | None) -> list[tuple[int, int]]:
+    """Split range(count) into contiguous (start, stop) chunks, a few per worker."""
+    if chunk_size is None:
+        chunk_size = max(1, -(-count // (workers * 4)))
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+
+def _map_chunk(func: Callable[[Any], Any], items: Sequence) -> list:
+    """Worker: apply func to a chunk of items."""
+    return [func(item) for item in items]
+
+
+def parallel_map(func: Callable[[Any], Any], items: Sequence, workers: int = 1,
+                 chunk_size: int | None = None, executor: str = 'thread') -> list:
+    """
+    Apply func to every item in parallel, keeping input order.
+
+    Threads suit work that releases the GIL (Pillow resize/encode, large
+    NumPy ops). With executor='process', chunks of items are pickled to a
+    process pool, so func and the items must be picklable (a module-level
+    function or a functools.partial of one).
+
+    Args:
+        func: Function of one item
+        items: Items to process
+        workers: Number of workers (1 = run inline, 0 = one per CPU)
+        chunk_size: Items per task (None = about four tasks per worker)
+        executor: 'thread' or 'process'
+
+    Returns:
+        List of results in the same order as items
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor!r} (use 'thread' or 'process')")
+
+    items = list(items)
+    workers = resolve_workers(workers)
+    if workers == 1 or len(items) < 2:
+        return [func(item) for item in items]
+
+    chunks = [items[start:stop] for start, stop in _chunk_ranges(len(items), workers, chunk_size)]
+    pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        results = pool.map(_map_chunk, [func] * len(chunks), chunks)
+        return [result for chunk in results for result in chunk]
+
+
+def _process_chunk(func: Callable[[np.ndarray], np.ndarray],
+                   source: tuple[str, tuple, str], target: tuple[str, tuple, str],
+                   start: int, stop: int):
+    """Worker: run func over frames[start:stop], reading and writing shared memory."""
+    source_block = shared_memory.SharedMemory(name=source[0])
+    target_block = shared_memory.SharedMemory(name=target[0])
+    try:
+        frames = np.ndarray(source[1], dtype=source[2], buffer=source_block.buf)
+        results = np.ndarray(target[1], dtype=target[2], buffer=target_block.buf)
+        for i in range(start, stop):
+            results[i] = func(frames[i])
+        del frames, results
+    finally:
+        source_block.close()
+        target_block.close()
+
+
+def map_frames(func: Callable[[np.ndarray], np.ndarray],
+               frames: np.ndarray | Sequence[np.ndarray], workers: int = 1,
+               executor: str = 'thread', chunk_size: int | None = None) -> np.ndarray:
+    """
+    Apply func to every frame in parallel and stack the results in order.
+
+    With executor='process', input frames are copied once into a shared
+    memory block and workers write their results into a second one, so
+    frames are never pickled. func must then be picklable (a module-level
+    function or a functools.partial of one). Every result must have the same
+    shape and dtype.
+
+    Args:
+        func: Function mapping one frame to one array
+        frames: Same-size frames, as a list or a (T, ...) array
+        workers: Number of workers (1 = run inline, 0 = one per CPU)
+        executor: 'thread' or 'process'
+        chunk_size: Frames per task (None = about four tasks per worker)
+
+    Returns:
+        (T, ...) array of results
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor!r} (use 'thread' or 'process')")
+
+    workers = resolve_workers(workers)
+    if executor == 'thread' or workers == 1 or len(frames) < 2:
+        return np.stack(parallel_map(func, frames, workers, chunk_size))
+
+    # The first frame runs here to learn the output shape and dtype
+    first = np.asarray(func(frames[0]))
+    count = len(frames)
+    source_dtype = np.asarray(frames[0]).dtype
+    source_shape = (count,) + np.shape(frames[0])
+    target_shape = (count,) + first.shape
+
+    source_block = shared_memory.SharedMemory(
+        create=True, size=max(1, int(np.prod(source_shape)) * source_dtype.itemsize))
+    target_block = shared_memory.SharedMemory(
+        create=True, size=max(1, int(np.prod(target_shape)) * first.dtype.itemsize))
+    try:
+        source = np.ndarray(source_shape, dtype=source_dtype, buffer=source_block.buf)
+        for i, frame in enumerate(frames):
+            source[i] = frame
+        results = np.ndarray(target_shape, dtype=first.dtype, buffer=target_block.buf)
+        results[0] = first
+
+        source_spec = (source_block.name, source_shape, source_dtype.str)
+        target_spec = (target_block.name, target_shape, first.dtype.str)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Frame 0 is already done, so chunk the remaining frames
+            futures = [
+                pool.submit(_process_chunk, func, source_spec, target_spec, start + 1, stop + 1)
+                for start, stop in _chunk_ranges(count - 1, workers, chunk_size)
+            ]
+            for future in futures:
+                future.result()
+
+        output = results.copy()
+        del source, results
+        return output
+    finally:
+        source_block.close()
+        source_block.unlink()
+        target_block.close()
+        target_block.unlink()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Quantizer - Palette generation and vectorized palette mapping for GIF frames.
+
+Builds one palette from the whole frame sequence (weighted towards pixels that
+move) and maps RGB frames to palette indices with a precomputed RGB -> index
+lookup table, so whole frame stacks are quantized in a single NumPy operation
+and handed to the GIF writer without an RGB round-trip.
+"""
+
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+from core.color_palettes import PALETTES, EMOJI_PALETTES
+
+
+# Number of cached lookup tables (one per palette/resolution pair)
+LUT_CACHE_SIZE = 16
+
+# Frames mapped per vectorized batch in map_to_palette()
+MAP_BATCH_FRAMES = 16
+
+# Number of cached palettes (keyed by frame content or palette name)
+PALETTE_CACHE_SIZE = 32
+
+# Pixels sampled across the whole sequence when building a palette
+PALETTE_SAMPLE_PIXELS = 250_000
+
+# Bounds on the ordered-dither step (RGB units) derived from palette spacing
+DITHER_STEP_MIN = 4.0
+DITHER_STEP_MAX = 255.0
+
+_lut_cache: OrderedDict[tuple[bytes, int], 'PaletteLUT'] = OrderedDict()
+_palette_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+
+def bayer_matrix(order: int = 4) -> np.ndarray:
+    """
+    Build a normalized Bayer threshold matrix.
+
+    Args:
+        order: Matrix size, a power of two (2, 4, 8)
+
+    Returns:
+        (order, order) float32 array of thresholds in [0, 1)
+    """
+    matrix = np.zeros((1, 1), dtype=np.int32)
+    while matrix.shape[0] < order:
+        matrix = np.block([
+            [4 * matrix, 4 * matrix + 2],
+            [4 * matrix + 3, 4 * matrix + 1],
+        ])
+    return ((matrix + 0.5) / matrix.size).astype(np.float32)
+
+
+def palette_spacing(palette: np.ndarray) -> float:
+    """
+    Typical distance between neighbouring palette colors.
+
+    Used as the ordered-dither step: adaptive palettes cluster their entries
+    where the frames' colors are, so the spacing of an evenly divided RGB
+    cube (255 / (cube_root(N) - 1)) badly overstates it.
+
+    Args:
+        palette: (N, 3) uint8 RGB palette
+
+    Returns:
+        Mean distance from each color to its nearest distinct neighbour,
+        clamped to [DITHER_STEP_MIN, DITHER_STEP_MAX]
+    """
+    colors = np.unique(np.asarray(palette, dtype=np.uint8).reshape(-1, 3), axis=0)
+    if len(colors) < 2:
+        return DITHER_STEP_MIN
+
+    colors = colors.astype(np.float32)
+    distances = ((colors[:, None, :] - colors[None, :, :]) ** 2).sum(axis=2)
+    np.fill_diagonal(distances, np.inf)
+    spacing = float(np.sqrt(distances.min(axis=1)).mean())
+    return min(max(spacing, DITHER_STEP_MIN), DITHER_STEP_MAX)
+
+
+class PaletteLUT:
+    """RGB -> palette index lookup table for one palette."""
+
+    def __init__(self, palette: np.ndarray | list[tuple[int, int, int]], bits: int = 6):
+        """
+        Precompute the nearest palette entry for every cell of an RGB grid.
+
+        Args:
+            palette: (N, 3) RGB palette
+            bits: Grid resolution per channel (5 = 32x32x32, 6 = 64x64x64)
+        """
+        self.palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+        self.bits = bits
+        self.shift = 8 - bits
+
+        # Cell centers of the RGB grid, as (cells, 3)
+        levels = (np.arange(1 << bits, dtype=np.float32) + 0.5) * (1 << self.shift)
+        r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+        centers = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+
+        colors = self.palette.astype(np.float32)
+        color_norms = (colors ** 2).sum(axis=1)
+
+        # Nearest color by squared distance, in chunks to bound memory
+        self.table = np.empty(len(centers), dtype=np.uint8)
+        chunk = 8192
+        for start in range(0, len(centers), chunk):
+            block = centers[start:start + chunk]
+            distances = color_norms[None, :] - 2.0 * block @ colors.T
+            self.table[start:start + chunk] = distances.argmin(axis=1)
+
+        self.dither_step = palette_spacing(self.palette)
+
+    def map(self, frames: np.ndarray, dither: str | None = None,
+            dither_strength: float = 1.0) -> np.ndarray:
+        """
+        Map RGB pixels to palette indices.
+
+        Args:
+            frames: (..., H, W, 3) uint8 array - a single frame or a stack
+            dither: None for nearest color, or 'bayer' for ordered dithering
+            dither_strength: Scale of the ordered dither offset (0.0-1.0+)
+
+        Returns:
+            (..., H, W) uint8 array of palette indices
+        """
+        frames = np.asarray(frames)
+
+        if dither == 'bayer':
+            height, width = frames.shape[-3:-1]
+            threshold = bayer_matrix(4)
+            tiled = np.tile(threshold, (height // 4 + 1, width // 4 + 1))[:height, :width]
+
+            # Offset by roughly one palette step, centered on zero
+            offset = (tiled - 0.5) * self.dither_step * dither_strength
+            frames = np.clip(frames + offset[..., None], 0, 255).astype(np.uint8)
+        elif dither is not None:
+            raise ValueError(f"Unknown dither mode: {dither!r} (use None or 'bayer')")
+
+        cells = frames >> self.shift
+        index = (cells[..., 0].astype(np.int32) << (2 * self.bits)) \
+            | (cells[..., 1].astype(np.int32) << self.bits) \
+            | cells[..., 2]
+        return self.table[index]
+
+
+def get_lut(palette: np.ndarray | list[tuple[int, int, int]], bits: int = 6) -> PaletteLUT:
+    """
+    Get a (cached) lookup table for a palette.
+
+    Args:
+        palette: (N, 3) RGB palette
+        bits: Grid resolution per channel
+
+    Returns:
+        PaletteLUT for the palette
+    """
+    palette = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+    key = (palette.tobytes(), bits)
+
+    lut = _lut_cache.get(key)
+    if lut is not None:
+        _lut_cache.move_to_end(key)
+        return lut
+
+    lut = PaletteLUT(palette, bits)
+    _lut_cache[key] = lut
+    if len(_lut_cache) > LUT_CACHE_SIZE:
+        _lut_cache.popitem(last=False)
+    return lut
+
+
+def map_to_palette(frames: np.ndarray | list[np.ndarray],
+                   palette: np.ndarray | list[tuple[int, int, int]],
+                   dither: str | None = None, bits: int = 6) -> np.ndarray:
+    """
+    Map RGB frames to indices of a palette in one vectorized pass.
+
+    Args:
+        frames: (H, W, 3) frame, (T, H, W, 3) stack, or list of same-size frames
+        palette: (N, 3) RGB palette
+        dither: None or 'bayer'
+        bits: Lookup table resolution per channel
+
+    Returns:
+        uint8 index array with the frames' leading shape
+    """
+    lut = get_lut(palette, bits)
+    if not isinstance(frames, list) and np.ndim(frames) == 3:
+        return lut.map(frames, dither=dither)
+
+    # Map stacks in batches so the int32 cell-index temporaries stay bounded
+    count = len(frames)
+    height, width = frames[0].shape[:2]
+    indices = np.empty((count, height, width), dtype=np.uint8)
+    for start in range(0, count, MAP_BATCH_FRAMES):
+        batch = frames[start:start + MAP_BATCH_FRAMES]
+        if isinstance(batch, list):
+            batch = np.stack(batch)
+        indices[start:start + len(batch)] = lut.map(batch, dither=dither)
+    return indices
+
+
+def _cache_get(key: tuple) -> np.ndarray | None:
+    palette = _palette_cache.get(key)
+    if palette is not None:
+        _palette_cache.move_to_end(key)
+    return palette
+
+
+def _cache_put(key: tuple, palette: np.ndarray):
+    _palette_cache[key] = palette
+    if len(_palette_cache) > PALETTE_CACHE_SIZE:
+        _palette_cache.popitem(last=False)
+
+
+def frames_digest(frames: np.ndarray | list[np.ndarray]) -> bytes:
+    """Hash the content of a frame sequence (used as the palette cache key)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        frame = np.ascontiguousarray(frame)
+        digest.update(str(frame.shape).encode())
+        digest.update(frame.data)
+    return digest.digest()
+
+
+def _weighted_histogram(frames: np.ndarray | list[np.ndarray], max_samples: int,
+                        motion_weight: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample every frame on a strided grid and bin the pixels by color.
+
+    Pixels that change between consecutive frames get extra weight, so colors
+    of moving objects and short flashes are not drowned out by the background.
+
+    Returns:
+        (colors, weights) - weighted mean RGB of each occupied 15-bit color
+        bin as float64 (M, 3), and the total weight of each bin (M,)
+    """
+    count = len(frames)
+    height, width = frames[0].shape[:2]
+    stride = max(1, int(np.ceil(np.sqrt(count * height * width / max_samples))))
+
+    if isinstance(frames, np.ndarray):
+        sampled = frames[:, ::stride, ::stride]
+    else:
+        sampled = np.stack([f[::stride, ::stride] for f in frames])
+
+    weights = np.ones(sampled.shape[:3], dtype=np.float64)
+    if motion_weight and count > 1:
+        # Per-pixel change to/from the neighbouring frames, 0-1
+        change = np.abs(sampled[1:].astype(np.int16) - sampled[:-1]).sum(axis=-1) / 765.0
+        motion = np.zeros(sampled.shape[:3])
+        motion[1:] = change
+        motion[:-1] = np.maximum(motion[:-1], change)
+        weights += motion_weight * motion
+
+    pixels = sampled.reshape(-1, 3)
+    weights = weights.ravel()
+    bins = ((pixels[:, 0].astype(np.int32) >> 3) << 10) \
+        | ((pixels[:, 1].astype(np.int32) >> 3) << 5) \
+        | (pixels[:, 2] >> 3)
+
+    totals = np.bincount(bins, weights=weights, minlength=1 << 15)
+    sums = np.stack([
+        np.bincount(bins, weights=weights * pixels[:, c], minlength=1 << 15)
+        for c in range(3)
+    ], axis=1)
+
+    occupied = totals > 0
+    return sums[occupied] / totals[occupied, None], totals[occupied]
+
+
+def _median_cut(colors: np.ndarray, weights: np.ndarray, num_colors: int) -> np.ndarray:
+    """
+    Weighted median cut over binned colors.
+
+    Repeatedly splits the box with the largest (weight x extent) at the
+    weighted median of its longest channel.
+
+    Returns:
+        (N, 3) float64 palette, N <= num_colors
+    """
+    if len(colors) <= num_colors:
+        return colors
+
+    def score(box):
+        if len(box) < 2:
+            return -1.0
+        extent = np.ptp(colors[box], axis=0).max()
+        return weights[box].sum() * extent
+
+    boxes = [np.arange(len(colors))]
+    scores = [score(boxes[0])]
+    while len(boxes) < num_colors:
+        target = int(np.argmax(scores))
+        if scores[target] <= 0:
+            break
+
+        box = boxes[target]
+        channel = int(np.ptp(colors[box], axis=0).argmax())
+        box = box[np.argsort(colors[box, channel], kind='stable')]
+        cumulative = np.cumsum(weights[box])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        cut = min(max(cut, 1), len(box) - 1)
+
+        boxes[target], scores[target] = box[:cut], score(box[:cut])
+        boxes.append(box[cut:])
+        scores.append(score(box[cut:]))
+
+    return np.stack([
+        (colors[box] * weights[box, None]).sum(axis=0) / weights[box].sum()
+        for box in boxes
+    ])
+
+
+def _kmeans_refine(colors: np.ndarray, weights: np.ndarray, palette: np.ndarray,
+                   iterations: int = 4) -> np.ndarray:
+    """Refine a palette with a few weighted Lloyd iterations."""
+    palette = palette.copy()
+    color_norms = (colors ** 2).sum(axis=1)
+    for _ in range(iterations):
+        distances = color_norms[:, None] - 2.0 * colors @ palette.T + (palette ** 2).sum(axis=1)
+        nearest = distances.argmin(axis=1)
+
+        totals = np.bincount(nearest, weights=weights, minlength=len(palette))
+        used = totals > 0
+        for c in range(3):
+            sums = np.bincount(nearest, weights=weights * colors[:, c], minlength=len(palette))
+            palette[used, c] = sums[used] / totals[used]
+    return palette
+
+
+def build_palette(frames: np.ndarray | list[np.ndarray], num_colors: int = 128,
+                  method: str = 'median_cut', motion_weight: float = 2.0,
+                  max_samples: int = PALETTE_SAMPLE_PIXELS) -> np.ndarray:
+    """
+    Build one palette for a whole frame sequence.
+
+    Every frame is sampled (on a strided grid sized to max_samples), so a
+    flash that lasts a single frame still gets its colors. Results are cached
+    by frame content, so re-rendering the same animation skips this step.
+
+    Args:
+        frames: (T, H, W, 3) stack or list of same-size RGB frames
+        num_colors: Maximum number of palette entries (1-256)
+        method: 'median_cut', or 'kmeans' to refine the median cut with a
+            few k-means iterations (slower, slightly better fit)
+        motion_weight: Extra weight for pixels that change between frames
+            (0 = plain color frequency)
+        max_samples: Approximate number of pixels sampled across all frames
+
+    Returns:
+        (N, 3) uint8 palette, N <= num_colors
+    """
+    if method not in ('median_cut', 'kmeans'):
+        raise ValueError(f"Unknown palette method: {method!r} (use 'median_cut' or 'kmeans')")
+
+    key = (frames_digest(frames), num_colors, method, motion_weight, max_samples)
+    palette = _cache_get(key)
+    if palette is not None:
+        return palette
+
+    colors, weights = _weighted_histogram(frames, max_samples, motion_weight)
+    centers = _median_cut(colors, weights, num_colors)
+    if method == 'kmeans':
+        centers = _kmeans_refine(colors, weights, centers)
+
+    palette = np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+    _cache_put(key, palette)
+    return palette
+
+
+def named_palette(name: str) -> np.ndarray:
+    """
+    Get a palette from core.color_palettes as an (N, 3) array.
+
+    Args:
+        name: An EMOJI_PALETTES name (simple, vibrant_emoji) or a PALETTES
+            name (vibrant, pastel, dark, ...)
+
+    Returns:
+        (N, 3) uint8 palette with duplicate colors removed
+    """
+    key = ('named', name)
+    palette = _cache_get(key)
+    if palette is not None:
+        return palette
+
+    if name in EMOJI_PALETTES:
+        colors = EMOJI_PALETTES[name]
+    elif name.lower() in PALETTES:
+        colors = PALETTES[name.lower()].values()
+    else:
+        names = ', '.join(list(EMOJI_PALETTES) + list(PALETTES))
+        raise ValueError(f"Unknown palette: {name!r} (available: {names})")
+
+    palette = np.array(list(dict.fromkeys(colors)), dtype=np.uint8).reshape(-1, 3)
+    _cache_put(key, palette)
+    return palette
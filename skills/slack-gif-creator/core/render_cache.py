@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Render Cache - Reuse finished GIFs for repeated template calls.
+
+A render is identified by the template, its arguments (defaults filled in),
+the source code of the template and core modules, and the GIFBuilder and
+save() settings. Those are hashed into a key; the first render saves the GIF
+as usual and stores it on disk, and every later render with the same key
+copies the stored file instead of rendering and encoding again.
+
+Files are stored by the hash of their content (identical GIFs from different
+keys share one file) and evicted least-recently-used once the cache exceeds
+its size bound. The cache is a plain directory, so several processes can
+share it.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+import enum
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from core.gif_builder import GIFBuilder
+
+
+RENDER_CACHE_DIR = Path(os.environ.get('SLACK_GIF_CACHE_DIR',
+                                       Path.home() / '.cache' / 'slack-gif-creator'))
+RENDER_CACHE_BYTES = 512 * 1024 * 1024  # Stored GIFs kept before evicting
+CACHE_FORMAT = 1                        # Bump to invalidate every stored key
+
+_CORE_DIR = Path(__file__).parent
+
+
+class RenderCache:
+    """Content-addressed on-disk cache of rendered GIFs with LRU eviction."""
+
+    def __init__(self, directory: str | Path = RENDER_CACHE_DIR,
+                 max_bytes: int = RENDER_CACHE_BYTES):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size of stored GIFs to keep before evicting
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._objects = self.directory / 'objects'
+        self._keys = self.directory / 'keys'
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._keys.mkdir(parents=True, exist_ok=True)
+
+    def key(self, template: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+            builder: Optional[dict] = None, save: Optional[dict] = None,
+            budget: Optional[dict] = None) -> str:
+        """
+        Compute the cache key of a render.
+
+        Arguments are bound to the template's signature with defaults applied,
+        so passing a default explicitly gives the same key as omitting it.
+
+        Args:
+            template: Frame function, e.g. create_bounce_animation
+            args: Positional arguments for the template
+            kwargs: Keyword arguments for the template
+            builder: GIFBuilder() arguments (width, height, fps, ...)
+            save: GIFBuilder.save() arguments (num_colors, ...)
+            budget: GIFBuilder.save_within_budget() arguments, if saved that way
+
+        Returns:
+            Hex digest identifying the render
+
+        Raises:
+            TypeError: If an argument cannot be hashed stably (e.g. a function)
+        """
+        bound = inspect.signature(template).bind(*args, **(kwargs or {}))
+        bound.apply_defaults()
+        description = {
+            'format': CACHE_FORMAT,
+            'template': f'{template.__module__}.{template.__qualname__}',
+            'code': _code_version(inspect.getsourcefile(inspect.unwrap(template))),
+            'params': bound.arguments,
+            'builder': builder or {},
+            'save': save or {},
+            'budget': budget,
+        }
+        text = json.dumps(description, sort_keys=True, default=_canonical, ensure_ascii=False)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[tuple[Path, dict]]:
+        """
+        Look up a render, marking it as recently used.
+
+        Args:
+            key: Key from key()
+
+        Returns:
+            Tuple of (path of the stored GIF, info dict from its save()), or
+            None on a miss. Do not modify the stored file.
+        """
+        entry_path = self._keys / f'{key}.json'
+        try:
+            entry = json.loads(entry_path.read_text())
+            path = self._object_path(entry['digest'])
+            os.utime(path)  # Recency for LRU eviction
+        except (OSError, ValueError, KeyError):
+            # Missing, or its GIF was evicted
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        os.utime(entry_path)
+        self.hits += 1
+        return path, entry['info']
+
+    def put(self, key: str, gif_path: str | Path, info: dict) -> Path:
+        """
+        Store a rendered GIF under a key.
+
+        Args:
+            key: Key from key()
+            gif_path: The GIF to store (copied; the original is left alone)
+            info: Info dict from save(), returned again by get()
+
+        Returns:
+            Path of the stored GIF
+        """
+        digest = _file_digest(gif_path)
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            # Copy then rename, so other processes never see a partial file
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as tmp:
+                with open(gif_path, 'rb') as source:
+                    shutil.copyfileobj(source, tmp)
+            os.replace(tmp.name, path)
+        else:
+            os.utime(path)
+
+        _write_atomic(self._keys / f'{key}.json',
+                      json.dumps({'digest': digest, 'info': info}, default=_canonical))
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """
+        Delete least-recently-used GIFs until the cache fits max_bytes.
+
+        Returns:
+            Number of GIFs deleted
+        """
+        objects = []
+        total = 0
+        for path in self._objects.glob('*/*.gif'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Evicted by another process meanwhile
+            objects.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = set()
+        for _, size, path in sorted(objects):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            evicted.add(path.stem)
+            total -= size
+
+        # Drop the keys of deleted GIFs
+        for entry_path in self._keys.glob('*.json'):
+            try:
+                if json.loads(entry_path.read_text())['digest'] in evicted:
+                    entry_path.unlink(missing_ok=True)
+            except (OSError, ValueError, KeyError):
+                continue
+
+        self.evictions += len(evicted)
+        return len(evicted)
+
+    def render(self, output_path: str | Path | None, template: Callable,
+               args: tuple = (), kwargs: Optional[dict] = None,
+               builder: Optional[dict] = None, save: Optional[dict] = None,
+               budget: Optional[dict] = None) -> dict:
+        """
+        Render a template to a GIF, or copy the stored GIF from an earlier render.
+
+        Args:
+            output_path: Where to write the GIF (None = return the stored
+                file's path without copying)
+            template: Frame function (create_* or iter_*)
+            args: Positional arguments for the template
+            kwargs: Keyword arguments for the template
+            builder: GIFBuilder() arguments (default: width/height 480, fps 15)
+            save: GIFBuilder.save() arguments
+            budget: If given, save with GIFBuilder.save_within_budget() and
+                these arguments (e.g. {'is_emoji': True}) instead of save()
+
+        Returns:
+            save()'s info dict with 'path' set to the output, plus 'cached'
+            (True on a hit), 'cache_key' and 'cache_path'
+        """
+        start = time.perf_counter()
+        key = self.key(template, args, kwargs, builder, save, budget)
+
+        cached = self.get(key)
+        if cached is None:
+            gif_builder = GIFBuilder(**(builder or {}))
+            gif_builder.add_frames(template(*args, **(kwargs or {})))
+            with tempfile.TemporaryDirectory(dir=self.directory) as tmp:
+                rendered = Path(tmp) / 'render.gif'
+                if budget is None:
+                    info = gif_builder.save(rendered, **(save or {}))
+                else:
+                    info = gif_builder.save_within_budget(rendered, **budget)
+                info.pop('metrics', None)  # Not reusable (and not JSON)
+                stored = self.put(key, rendered, info)
+        else:
+            stored, info = cached
+
+        if output_path is None:
+            output_path = stored
+        else:
+            output_path = Path(output_path)
+            shutil.copyfile(stored, output_path)
+
+        info = {**info, 'path': str(output_path), 'cached': cached is not None,
+                'cache_key': key, 'cache_path': str(stored)}
+        if cached is not None:
+            print(f"✓ Cached GIF ({(time.perf_counter() - start) * 1000:.1f} ms): {output_path}")
+        return info
+
+    def stats(self) -> dict:
+        """
+        Current counters and disk usage.
+
+        Returns:
+            Dict with 'hits', 'misses', 'hit_rate', 'evictions', 'entries'
+            (stored GIFs), 'bytes' and 'max_bytes'
+        """
+        sizes = [path.stat().st_size for path in self._objects.glob('*/*.gif')]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(sizes),
+            'bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+        }
+
+    def clear(self):
+        """Delete every stored GIF and key and reset the counters."""
+        shutil.rmtree(self._objects, ignore_errors=True)
+        shutil.rmtree(self._keys, ignore_errors=True)
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._keys.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _object_path(self, digest: str) -> Path:
+        """Where the GIF with this content hash is stored."""
+        return self._objects / digest[:2] / f'{digest}.gif'
+
+
+def _canonical(value: Any) -> Any:
+    """JSON form of argument values json.dumps() does not handle itself."""
+    if isinstance(value, np.ndarray):
+        return {'array': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return f'{type(value).__qualname__}.{value.name}'
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__} argument {value!r}")
+
+
+_code_versions: dict[str, str] = {}
+
+
+def _code_version(source_file: Optional[str]) -> str:
+    """Hash of a template's source file and every core module (computed once per process)."""
+    if source_file not in _code_versions:
+        digest = hashlib.sha256()
+        files = sorted(_CORE_DIR.glob('*.py'))
+        if source_file is not None:
+            files.append(Path(source_file))
+        for path in files:
+            digest.update(path.name.encode('utf-8'))
+            digest.update(path.read_bytes())
+        _code_versions[source_file] = digest.hexdigest()
+    return _code_versions[source_file]
+
+
+def _file_digest(path: str | Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, text: str):
+    """Write a small file via rename, so readers never see it half-written."""
+    with tempfile.NamedTemporaryFile('w', dir=path.parent, suffix='.tmp', delete=False) as tmp:
+        tmp.write(text)
+    os.replace(tmp.name, path)
+
+
+_default_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Return the shared render cache (in RENDER_CACHE_DIR)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache()
+    return _default_cache
+
+
+def cached_render(output_path: str | Path | None, template: Callable, *args,
+                  builder: Optional[dict] = None, save: Optional[dict] = None,
+                  budget: Optional[dict] = None, **kwargs) -> dict:
+    """
+    Render a template to a GIF through the shared cache.
+
+        cached_render('bounce.gif', create_bounce_animation, num_frames=40,
+                      builder={'width': 480, 'height': 480, 'fps': 20},
+                      save={'num_colors': 64})
+
+    Args:
+        output_path: Where to write the GIF (None = use the stored file)
+        template: Frame function (create_* or iter_*)
+        *args: Positional arguments for the template
+        builder: GIFBuilder() arguments
+        save: GIFBuilder.save() arguments
+        budget: GIFBuilder.save_within_budget() arguments (instead of save)
+        **kwargs: Keyword arguments for the template
+
+    Returns:
+        Info dict, as for RenderCache.render()
+    """
+    return get_render_cache().render(output_path, template, args, kwargs, builder, save, budget)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Scene - Layered compositor that redraws only what moves.
+
+A scene is a background, static layers rasterized into it once, and sprites
+on top. Each render() repaints just the dirty rectangles - where a sprite was
+and where it is now - from the cached background, and keeps the rest of the
+previous frame. The union of those rectangles is exposed as dirty_rect, so
+GIFBuilder.add_frame() can delta-encode the frame without diffing it.
+
+    scene = Scene(480, 480)
+    scene.add_static(lambda frame: draw_rectangle(frame, (0, 400), (480, 480), (90, 60, 30)))
+    ball = scene.add_sprite(*render_sprite(
+        lambda frame, center: draw_circle(frame, center, 30, (255, 100, 100)), 32))
+    for y in heights:
+        ball.position = (240, y)
+        builder.add_frame(scene.render(), dirty_rect=scene.dirty_rect)
+"""
+
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from PIL import Image
+
+from core.gif_writer import union_rects
+
+
+LAYER_CACHE_SIZE = 32     # Transformed variants kept per sprite
+FULL_REDRAW_RATIO = 0.5   # Repaint everything once rectangles cover this much
+
+
+class Sprite:
+    """An RGBA image placed on a scene, with a position and transform."""
+
+    def __init__(self, image: Image.Image, offset: Optional[tuple[int, int]] = None,
+                 position: tuple[float, float] = (0, 0)):
+        """
+        Args:
+            image: RGBA sprite image (do not modify it in place; assign a new one)
+            offset: (x, y) of the image's top-left corner relative to the
+                sprite's position (None = centered on it)
+            position: (x, y) of the sprite on the canvas
+        """
+        self.image = image
+        self.offset = offset if offset is not None else (-(image.width // 2), -(image.height // 2))
+        self.position = position
+        self.scale: float | tuple[float, float] = 1.0
+        self.angle = 0.0    # Degrees, counterclockwise, about the position
+        self.opacity = 1.0
+        self.visible = True
+        self._variants: OrderedDict = OrderedDict()
+
+    def placement(self) -> tuple[Image.Image, tuple[int, int, int, int]]:
+        """
+        Return the transformed image and its (x0, y0, x1, y1) box on the canvas.
+
+        Transformed variants are cached, so a sprite that only moves, or
+        cycles through a few poses, is transformed once per pose.
+        """
+        scale = self.scale if isinstance(self.scale, tuple) else (self.scale, self.scale)
+        key = (id(self.image), self.offset, scale, self.angle % 360, self.opacity)
+        cached = self._variants.get(key)
+        if cached is None or cached[0] is not self.image:
+            cached = (self.image,) + _transform(self.image, self.offset, scale,
+                                                self.angle % 360, self.opacity)
+            self._variants[key] = cached
+            if len(self._variants) > LAYER_CACHE_SIZE:
+                self._variants.popitem(last=False)
+        else:
+            self._variants.move_to_end(key)
+
+        _, image, (offset_x, offset_y) = cached
+        x0 = int(self.position[0]) + offset_x
+        y0 = int(self.position[1]) + offset_y
+        return image, (x0, y0, x0 + image.width, y0 + image.height)
+
+
+class Scene:
+    """Composites a cached background and moving sprites into frames."""
+
+    def __init__(self, width: int, height: int,
+                 background: tuple[int, int, int] | Image.Image = (255, 255, 255)):
+        """
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            background: RGB color or an image (e.g. a gradient) to start from
+        """
+        self.width = width
+        self.height = height
+        self.background = background
+        self.sprites: list[Sprite] = []
+        self.dirty_rects: list[tuple[int, int, int, int]] = []
+        self._static: list[tuple[Image.Image | Callable, tuple[int, int]]] = []
+        self._base: Optional[Image.Image] = None
+        self._canvas: Optional[Image.Image] = None
+        self._placed: dict[int, tuple[Image.Image, tuple[int, int, int, int]]] = {}
+
+    def add_static(self, layer: Image.Image | Callable[[Image.Image], object],
+                   position: tuple[int, int] = (0, 0)):
+        """
+        Add a layer that never moves; it is rasterized into the background once.
+
+        Args:
+            layer: Image to paste (RGBA pastes through its alpha), or a
+                callable that draws on the background, e.g.
+                lambda frame: draw_star(frame, (60, 60), 20, (255, 220, 0))
+            position: (x, y) top-left corner for an image layer
+        """
+        self._static.append((layer, position))
+        self.invalidate()
+
+    def add_sprite(self, image: Image.Image, offset: Optional[tuple[int, int]] = None,
+                   position: tuple[float, float] = (0, 0)) -> Sprite:
+        """
+        Add a sprite above the existing ones.
+
+        Args:
+            image: RGBA sprite image
+            offset: Top-left corner relative to position (None = centered)
+            position: (x, y) of the sprite on the canvas
+
+        Returns:
+            The Sprite; move it by setting its position, scale, angle,
+            opacity, visible or image attributes between renders
+        """
+        sprite = Sprite(image, offset, position)
+        self.sprites.append(sprite)
+        return sprite
+
+    def remove(self, sprite: Sprite):
+        """Take a sprite off the scene (its area is repainted on the next render)."""
+        self.sprites.remove(sprite)
+
+    def invalidate(self):
+        """Rebuild the background and repaint the whole canvas on the next render."""
+        self._base = None
+        self._canvas = None
+
+    @property
+    def dirty_rect(self) -> tuple[int, int, int, int]:
+        """Box around everything the last render() changed (EMPTY_RECT if nothing)."""
+        return union_rects(self.dirty_rects)
+
+    def render(self) -> Image.Image:
+        """
+        Composite the next frame.
+
+        Returns:
+            RGB frame (a copy - drawing on it does not affect the scene)
+        """
+        placements = {id(sprite): sprite.placement()
+                      for sprite in self.sprites if sprite.visible}
+
+        if self._canvas is None:
+            rects = [(0, 0, self.width, self.height)]
+        else:
+            rects = []
+            for sprite_id, (image, box) in placements.items():
+                previous = self._placed.get(sprite_id)
+                if previous is None or previous[0] is not image or previous[1] != box:
+                    rects.append(box)
+                    if previous is not None:
+                        rects.append(previous[1])
+            # Sprites hidden or removed since the last render
+            for sprite_id in self._placed.keys() - placements.keys():
+                rects.append(self._placed[sprite_id][1])
+            rects = self._merge(rects)
+
+        if self._canvas is None or (sum(_area(rect) for rect in rects)
+                                    >= FULL_REDRAW_RATIO * self.width * self.height):
+            self._canvas = self._background().copy()
+            rects = [(0, 0, self.width, self.height)]
+            self._paste_sprites(self._canvas, placements, rects[0])
+        else:
+            for rect in rects:
+                region = self._background().crop(rect)
+                self._paste_sprites(region, placements, rect)
+                self._canvas.paste(region, rect[:2])
+
+        self._placed = placements
+        self.dirty_rects = rects
+        return self._canvas.copy()
+
+    def _background(self) -> Image.Image:
+        """The background with every static layer rasterized into it, built once."""
+        if self._base is None:
+            if isinstance(self.background, Image.Image):
+                base = self.background.convert('RGB').resize((self.width, self.height))
+            else:
+                base = Image.new('RGB', (self.width, self.height), self.background)
+            for layer, position in self._static:
+                if callable(layer):
+                    layer(base)
+                elif layer.mode == 'RGBA':
+                    base.paste(layer, position, layer)
+                else:
+                    base.paste(layer.convert('RGB'), position)
+            self._base = base
+        return self._base
+
+    def _paste_sprites(self, target: Image.Image, placements: dict, rect: tuple[int, int, int, int]):
+        """Paste, in z-order, every sprite overlapping rect onto target (rect's area)."""
+        for sprite in self.sprites:
+            placed = placements.get(id(sprite))
+            if placed is None:
+                continue
+            image, box = placed
+            if _intersects(box, rect):
+                target.paste(image, (box[0] - rect[0], box[1] - rect[1]), image)
+
+    def _merge(self, rects: list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+        """Clip rectangles to the canvas and merge overlapping ones."""
+        merged = []
+        for rect in rects:
+            rect = (max(0, rect[0]), max(0, rect[1]),
+                    min(self.width, rect[2]), min(self.height, rect[3]))
+            if _area(rect) == 0:
+                continue
+            # Absorb every rectangle this one overlaps, until none is left
+            overlapping = True
+            while overlapping:
+                overlapping = [other for other in merged if _intersects(other, rect)]
+                for other in overlapping:
+                    merged.remove(other)
+                    rect = union_rects([rect, other])
+            merged.append(rect)
+        return merged
+
+
+def render_sprite(draw: Callable[[Image.Image, tuple[int, int]], object],
+                  extent: int) -> tuple[Image.Image, tuple[int, int]]:
+    """
+    Rasterize a drawing helper once into a sprite for Scene.add_sprite().
+
+    Args:
+        draw: Callable drawing the object centered on the point it is given,
+            e.g. lambda frame, center: draw_circle(frame, center, 30, (255, 0, 0))
+        extent: Farthest the drawing reaches from its center, in pixels
+
+    Returns:
+        Tuple of (RGBA sprite cropped to its content, (x, y) offset of its
+        top-left corner from the center)
+    """
+    canvas = Image.new('RGBA', (2 * extent + 1, 2 * extent + 1), (0, 0, 0, 0))
+    draw(canvas, (extent, extent))
+    bbox = canvas.getchannel('A').getbbox()
+    if bbox is None:
+        return Image.new('RGBA', (1, 1), (0, 0, 0, 0)), (0, 0)
+    return canvas.crop(bbox), (bbox[0] - extent, bbox[1] - extent)
+
+
+def _transform(image: Image.Image, offset: tuple[int, int], scale: tuple[float, float],
+               angle: float, opacity: float) -> tuple[Image.Image, tuple[int, int]]:
+    """Scale, rotate (about the sprite's position) and fade an RGBA image."""
+    offset_x, offset_y = offset
+    if scale != (1.0, 1.0):
+        size = (max(1, round(image.width * scale[0])), max(1, round(image.height * scale[1])))
+        image = image.resize(size, Image.LANCZOS)
+        offset_x, offset_y = round(offset_x * scale[0]), round(offset_y * scale[1])
+
+    if angle:
+        # Put the pivot at the canvas center so rotation turns about it
+        half_width = max(-offset_x, image.width + offset_x, 1)
+        half_height = max(-offset_y, image.height + offset_y, 1)
+        canvas = Image.new('RGBA', (half_width * 2, half_height * 2), (0, 0, 0, 0))
+        canvas.paste(image, (half_width + offset_x, half_height + offset_y))
+        image = canvas.rotate(angle, resample=Image.BICUBIC, expand=True)
+        offset_x, offset_y = -(image.width // 2), -(image.height // 2)
+
+    if opacity < 1.0:
+        image = image.copy()
+        image.putalpha(image.getchannel('A').point(lambda a: int(a * max(0.0, opacity))))
+
+    return image, (offset_x, offset_y)
+
+
+def _area(rect: tuple[int, int, int, int]) -> int:
+    """Pixels in an (x0, y0, x1, y1) rectangle (0 if empty)."""
+    return max(0, rect[2] - rect[0]) * max(0, rect[3] - rect[1])
+
+
+def _intersects(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> bool:
+    """True if two (x0, y0, x1, y1) rectangles overlap."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Temporal Effects - Trails, ghosting and motion blur with running accumulators.
+
+Effects that blend a frame with the frames before it keep their state in
+buffers allocated on the first frame and updated in place, so each new
+frame costs a fixed number of whole-frame operations however long the
+trail is:
+
+- DecayAccumulator: exponential moving average (ghosting that never fully
+  ends, one float32 buffer)
+- RingTrail: exactly the last N frames, evenly or geometrically weighted,
+  from a ring buffer of frames plus a running sum (uint16 or float32), or
+  composited oldest-last as templates/move.py's trail effect always has
+- MotionBlur: each frame blended with the previous one
+
+All of them take PIL Images or RGB arrays of a fixed size and return new
+PIL Images; the iter_* functions wrap them as streaming stages for frame
+generators (see core.frame_source).
+"""
+
+from typing import Iterable, Iterator
+
+from PIL import Image
+import numpy as np
+
+
+TRAIL_WEIGHTS = ('normalized', 'chained')
+
+
+class DecayAccumulator:
+    """Exponentially decaying average of every frame so far."""
+
+    def __init__(self, decay: float = 0.5):
+        """
+        Args:
+            decay: Weight kept by the history on each frame (0 = no trail,
+                closer to 1 = longer trail)
+        """
+        self.decay = decay
+        self._average = None
+
+    def push(self, frame: Image.Image | np.ndarray) -> Image.Image:
+        """
+        Add a frame and return the blended result.
+
+        Args:
+            frame: Next frame (same size and mode as the previous ones)
+
+        Returns:
+            decay * history + (1 - decay) * frame
+        """
+        pixels = np.asarray(frame)
+        if self._average is None:
+            self._average = pixels.astype(np.float32)
+        else:
+            self._average *= self.decay
+            self._average += (1 - self.decay) * pixels
+        return _to_image(self._average)
+
+    def reset(self):
+        """Forget the history."""
+        self._average = None
+
+
+class RingTrail:
+    """Blend of exactly the current frame and the length frames before it."""
+
+    def __init__(self, length: int = 5, decay: float = 1.0, weights: str = 'normalized'):
+        """
+        Args:
+            length: Previous frames included in the trail
+            decay: Weight of each frame relative to the next newer one (1.0 =
+                all equal, 0.3 = each older frame at 30% of the one after it)
+            weights: 'normalized' - frame j steps back weighted decay ** j,
+                divided by the total, from a running sum whose cost does not
+                depend on length. 'chained' - the frame j steps back is
+                blended over the result so far at opacity decay ** j, newest
+                first, truncating to whole levels after each blend; this is
+                iter_trail_effect()'s look and costs one blend per trail frame.
+
+        Raises:
+            ValueError: If weights is not one of TRAIL_WEIGHTS
+        """
+        if weights not in TRAIL_WEIGHTS:
+            raise ValueError(f"Unknown weights: {weights!r} (use 'normalized' or 'chained')")
+        self.length = max(0, length)
+        self.decay = decay
+        self.weights = weights
+        self._ring = None      # Last length + 1 frames, uint8
+        self._sum = None       # Weighted sum of the frames in the ring ('chained': the result)
+        self._blend = None     # 'chained' scratch buffer
+        self._count = 0
+
+    def push(self, frame: Image.Image | np.ndarray) -> Image.Image:
+        """
+        Add a frame and return the weighted average of the trail.
+
+        The frame leaving the window is subtracted from the running sum, so
+        the cost does not depend on length.
+
+        Args:
+            frame: Next frame (same size and mode as the previous ones)
+
+        Returns:
+            Sum of decay**j * frame[-j] over the window, divided by the
+            weights (see weights for 'chained')
+        """
+        pixels = np.asarray(frame)
+        slots = self.length + 1
+        if self.weights == 'chained':
+            return self._push_chained(pixels, slots)
+        if self._ring is None:
+            self._ring = np.empty((slots,) + pixels.shape, dtype=np.uint8)
+            # Whole sums fit in uint16 for up to 257 frames of uint8
+            exact = self.decay == 1.0 and slots <= 257
+            self._sum = np.zeros(pixels.shape, dtype=np.uint16 if exact else np.float32)
+
+        slot = self._count % slots
+        if self._sum.dtype == np.uint16:
+            if self._count >= slots:
+                self._sum -= self._ring[slot]
+            self._sum += pixels
+        else:
+            self._sum *= self.decay
+            if self._count >= slots:
+                self._sum -= np.float32(self.decay ** slots) * self._ring[slot]
+            self._sum += pixels
+        self._ring[slot] = pixels
+        self._count += 1
+
+        frames = min(self._count, slots)
+        if self.decay == 1.0:
+            weight = frames
+        else:
+            weight = (1 - self.decay ** frames) / (1 - self.decay)
+        return _to_image(self._sum / np.float32(weight))
+
+    def _push_chained(self, pixels: np.ndarray, slots: int) -> Image.Image:
+        """Blend the frame with its predecessors one at a time, newest first."""
+        if self._ring is None:
+            self._ring = np.empty((slots,) + pixels.shape, dtype=np.uint8)
+            self._sum = np.empty(pixels.shape, dtype=np.float32)
+            self._blend = np.empty(pixels.shape, dtype=np.float32)
+
+        slot = self._count % slots
+        result = self._sum
+        result[...] = pixels
+        for j in range(1, min(self._count, self.length) + 1):
+            # Same float32 arithmetic and truncation as blending PIL images
+            alpha = self.decay ** j
+            result *= np.float32(1 - alpha)
+            np.multiply(self._ring[(slot - j) % slots], np.float32(alpha), out=self._blend)
+            result += self._blend
+            np.floor(result, out=result)
+        self._ring[slot] = pixels
+        self._count += 1
+        return Image.fromarray(result.astype(np.uint8))
+
+    def reset(self):
+        """Forget the history (the buffers are kept)."""
+        self._count = 0
+        if self._sum is not None:
+            self._sum[...] = 0
+
+
+class MotionBlur:
+    """Blend each frame with the one before it, as add_motion_blur() does."""
+
+    def __init__(self, blur_amount: float = 0.5):
+        """
+        Args:
+            blur_amount: Weight of the previous frame (0.0-1.0)
+        """
+        self.blur_amount = blur_amount
+        self._previous = None
+        self._blend = None
+
+    def push(self, frame: Image.Image | np.ndarray) -> Image.Image:
+        """
+        Add a frame and return it blurred with the previous one.
+
+        Args:
+            frame: Next frame (same size and mode as the previous ones)
+
+        Returns:
+            frame * (1 - blur_amount) + previous * blur_amount (the frame
+            itself for the first one)
+        """
+        pixels = np.asarray(frame)
+        if self._previous is None:
+            self._previous = pixels.astype(np.float32)
+            self._blend = np.empty_like(self._previous)
+            return frame if isinstance(frame, Image.Image) else Image.fromarray(pixels)
+
+        # Same float32 arithmetic as add_motion_blur(), in reused buffers
+        self._previous *= self.blur_amount
+        self._blend[...] = pixels
+        self._blend *= 1 - self.blur_amount
+        self._blend += self._previous
+        result = Image.fromarray(np.clip(self._blend, 0, 255).astype(np.uint8))
+        self._previous[...] = pixels
+        return result
+
+    def reset(self):
+        """Forget the previous frame."""
+        self._previous = None
+
+
+def iter_decay_trail(frames: Iterable[Image.Image | np.ndarray],
+                     decay: float = 0.5) -> Iterator[Image.Image]:
+    """
+    Stream frames through a DecayAccumulator.
+
+    Args:
+        frames: Frames (any iterable)
+        decay: History weight per frame (see DecayAccumulator)
+
+    Yields:
+        Frames with a fading trail
+    """
+    accumulator = DecayAccumulator(decay)
+    for frame in frames:
+        yield accumulator.push(frame)
+
+
+def iter_ring_trail(frames: Iterable[Image.Image | np.ndarray], length: int = 5,
+                    decay: float = 1.0, weights: str = 'normalized') -> Iterator[Image.Image]:
+    """
+    Stream frames through a RingTrail.
+
+    Args:
+        frames: Frames (any iterable)
+        length: Previous frames in the trail
+        decay: Relative weight of each older frame (see RingTrail)
+        weights: 'normalized' or 'chained' (see RingTrail)
+
+    Yields:
+        Frames blended with their trail
+    """
+    trail = RingTrail(length, decay, weights)
+    for frame in frames:
+        yield trail.push(frame)
+
+
+def iter_motion_blur(frames: Iterable[Image.Image | np.ndarray],
+                     blur_amount: float = 0.5) -> Iterator[Image.Image]:
+    """
+    Stream frames through a MotionBlur.
+
+    Args:
+        frames: Frames (any iterable)
+        blur_amount: Weight of the previous frame (0.0-1.0)
+
+    Yields:
+        Motion-blurred frames
+    """
+    blur = MotionBlur(blur_amount)
+    for frame in frames:
+        yield blur.push(frame)
+
+
+def _to_image(values: np.ndarray) -> Image.Image:
+    """Round a float accumulator to a uint8 image."""
+    return Image.fromarray(np.clip(values + 0.5, 0, 255).astype(np.uint8))
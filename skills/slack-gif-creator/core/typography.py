@@ -6,9 +6,12 @@ This module provides high-quality text rendering that looks crisp and profession
 in GIFs, with outlines for readability and effects for visual impact.
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 from typing import Optional
 
+from core import fonts
+
 
 # Typography scale - proportional sizing system
 TYPOGRAPHY_SCALE = {
@@ -21,11 +24,17 @@ TYPOGRAPHY_SCALE = {
     'tiny': 16,    # Tiny text
 }
 
+TEXT_EFFECTS = ('plain', 'outline', 'shadow', 'glow')
+TEXT_SPRITE_CACHE_SIZE = 64  # Rendered captions kept for reuse across frames
+
 
 def get_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     """
     Get a font with fallback support.
 
+    Fonts come from the shared registry in core.fonts, which scans the system
+    font directories once and memoizes each loaded font.
+
     Args:
         size: Font size in pixels
         bold: Use bold variant if available
@@ -33,26 +42,108 @@ def get_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     Returns:
         ImageFont object
     """
-    # Try multiple font paths for cross-platform support
-    font_paths = [
-        # macOS fonts
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/System/Library/Fonts/SF-Pro.ttf",
-        "/Library/Fonts/Arial Bold.ttf" if bold else "/Library/Fonts/Arial.ttf",
-        # Linux fonts
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf" if bold else "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        # Windows fonts
-        "C:\\Windows\\Fonts\\arialbd.ttf" if bold else "C:\\Windows\\Fonts\\arial.ttf",
-    ]
+    return fonts.get_font(size, bold=bold)
+
+
+@lru_cache(maxsize=TEXT_SPRITE_CACHE_SIZE)
+def render_text_sprite(
+    text: str,
+    font_size: int = 40,
+    text_color: tuple[int, int, int] = (255, 255, 255),
+    effect: str = 'plain',
+    effect_color: tuple[int, int, int] = (0, 0, 0),
+    effect_size: int | tuple[int, int] = 3,
+    bold: bool = True
+) -> tuple[Image.Image, tuple[int, int], tuple[int, int]]:
+    """
+    Render text and its effect once as an RGBA sprite.
+
+    The glyphs are rasterized to an alpha mask once; outlines dilate it with
+    a max filter, glows dilate and blur it, shadows offset it. Sprites are
+    kept in an LRU cache keyed by all arguments, so drawing the same caption
+    on every frame is a single paste. Do not modify the returned image.
+
+    Args:
+        text: Text to render
+        font_size: Font size in pixels
+        text_color: RGB color for text fill
+        effect: 'plain', 'outline', 'shadow' or 'glow'
+        effect_color: RGB color for the outline, shadow or glow
+        effect_size: Outline width or glow radius in pixels, or the (x, y)
+            shadow offset
+        bold: Use bold font variant
+
+    Returns:
+        Tuple of (sprite, offset of the sprite from the text position,
+        (width, height) of the text itself for centering)
+    """
+    if effect not in TEXT_EFFECTS:
+        raise ValueError(f"Unknown text effect: {effect!r} (use one of {', '.join(TEXT_EFFECTS)})")
+
+    font = get_font(font_size, bold=bold)
+    left, top, right, bottom = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+
+    # Room for the effect on every side
+    if effect == 'shadow':
+        pad = max(abs(effect_size[0]), abs(effect_size[1]))
+    elif effect == 'glow':
+        pad = effect_size * 2
+    elif effect == 'outline':
+        pad = effect_size
+    else:
+        pad = 0
+
+    size = (right - left + 2 * pad, bottom - top + 2 * pad)
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).text((pad - left, pad - top), text, fill=255, font=font)
+
+    if effect == 'outline' and effect_size > 0:
+        # Same coverage as drawing the text at every offset within the width
+        effect_mask = mask.filter(ImageFilter.MaxFilter(2 * effect_size + 1))
+    elif effect == 'shadow':
+        effect_mask = Image.new('L', size, 0)
+        effect_mask.paste(mask, tuple(effect_size))
+    elif effect == 'glow' and effect_size > 0:
+        # A soft-edged version of the outline
+        effect_mask = mask.filter(ImageFilter.MaxFilter(2 * effect_size + 1))
+        effect_mask = effect_mask.filter(ImageFilter.GaussianBlur(effect_size / 2))
+    else:
+        effect_mask = Image.new('L', size, 0)
+
+    sprite = Image.alpha_composite(_layer(effect_color, effect_mask), _layer(text_color, mask))
+
+    return sprite, (left - pad, top - pad), (right - left, bottom - top)
 
-    for font_path in font_paths:
-        try:
-            return ImageFont.truetype(font_path, size)
-        except:
-            continue
 
-    # Ultimate fallback
-    return ImageFont.load_default()
+def _layer(color: tuple[int, int, int], alpha: Image.Image) -> Image.Image:
+    """An RGBA image of one color with the given alpha mask."""
+    layer = Image.new('RGBA', alpha.size, tuple(color[:3]) + (0,))
+    layer.putalpha(alpha)
+    return layer
+
+
+def paste_text_sprite(frame: Image.Image,
+                      sprite: tuple[Image.Image, tuple[int, int], tuple[int, int]],
+                      position: tuple[int, int], centered: bool = False) -> Image.Image:
+    """
+    Paste a sprite from render_text_sprite() onto a frame.
+
+    Args:
+        frame: PIL Image to draw on
+        sprite: Result of render_text_sprite()
+        position: (x, y) position of the text, as for ImageDraw.text()
+        centered: If True, center the text (without its effect) at position
+
+    Returns:
+        Modified frame
+    """
+    image, (offset_x, offset_y), (text_width, text_height) = sprite
+    x, y = position
+    if centered:
+        x -= text_width // 2
+        y -= text_height // 2
+    frame.paste(image, (int(x) + offset_x, int(y) + offset_y), image)
+    return frame
 
 
 def draw_text_with_outline(
@@ -86,29 +177,9 @@ def draw_text_with_outline(
     Returns:
         Modified frame
     """
-    draw = ImageDraw.Draw(frame)
-    font = get_font(font_size, bold=bold)
-
-    # Calculate position for centering
-    if centered:
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        x = position[0] - text_width // 2
-        y = position[1] - text_height // 2
-        position = (x, y)
-
-    # Draw outline by drawing text multiple times offset in all directions
-    x, y = position
-    for offset_x in range(-outline_width, outline_width + 1):
-        for offset_y in range(-outline_width, outline_width + 1):
-            if offset_x != 0 or offset_y != 0:
-                draw.text((x + offset_x, y + offset_y), text, fill=outline_color, font=font)
-
-    # Draw main text on top
-    draw.text(position, text, fill=text_color, font=font)
-
-    return frame
+    sprite = render_text_sprite(text, font_size, tuple(text_color), 'outline',
+                                tuple(outline_color), outline_width, bold)
+    return paste_text_sprite(frame, sprite, position, centered)
 
 
 def draw_text_with_shadow(
@@ -139,26 +210,9 @@ def draw_text_with_shadow(
     Returns:
         Modified frame
     """
-    draw = ImageDraw.Draw(frame)
-    font = get_font(font_size, bold=bold)
-
-    # Calculate position for centering
-    if centered:
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        x = position[0] - text_width // 2
-        y = position[1] - text_height // 2
-        position = (x, y)
-
-    # Draw shadow
-    shadow_pos = (position[0] + shadow_offset[0], position[1] + shadow_offset[1])
-    draw.text(shadow_pos, text, fill=shadow_color, font=font)
-
-    # Draw main text
-    draw.text(position, text, fill=text_color, font=font)
-
-    return frame
+    sprite = render_text_sprite(text, font_size, tuple(text_color), 'shadow',
+                                tuple(shadow_color), tuple(shadow_offset), bold)
+    return paste_text_sprite(frame, sprite, position, centered)
 
 
 def draw_text_with_glow(
@@ -189,30 +243,9 @@ def draw_text_with_glow(
     Returns:
         Modified frame
     """
-    draw = ImageDraw.Draw(frame)
-    font = get_font(font_size, bold=bold)
-
-    # Calculate position for centering
-    if centered:
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        x = position[0] - text_width // 2
-        y = position[1] - text_height // 2
-        position = (x, y)
-
-    # Draw glow layers with decreasing opacity (simulated with same color at different offsets)
-    x, y = position
-    for radius in range(glow_radius, 0, -1):
-        for offset_x in range(-radius, radius + 1):
-            for offset_y in range(-radius, radius + 1):
-                if offset_x != 0 or offset_y != 0:
-                    draw.text((x + offset_x, y + offset_y), text, fill=glow_color, font=font)
-
-    # Draw main text
-    draw.text(position, text, fill=text_color, font=font)
-
-    return frame
+    sprite = render_text_sprite(text, font_size, tuple(text_color), 'glow',
+                                tuple(glow_color), glow_radius, bold)
+    return paste_text_sprite(frame, sprite, position, centered)
 
 
 def draw_text_in_box(
@@ -285,10 +318,8 @@ def draw_text_in_box(
     frame = frame_rgba.convert('RGB')
 
     # Draw text on top
-    draw = ImageDraw.Draw(frame)
-    draw.text((text_x, text_y), text, fill=text_color, font=font)
-
-    return frame
+    sprite = render_text_sprite(text, font_size, tuple(text_color), bold=bold)
+    return paste_text_sprite(frame, sprite, (text_x, text_y))
 
 
 def get_text_size(text: str, font_size: int, bold: bool = True) -> tuple[int, int]:
@@ -304,10 +335,7 @@ def get_text_size(text: str, font_size: int, bold: bool = True) -> tuple[int, in
         (width, height) tuple
     """
     font = get_font(font_size, bold=bold)
-    # Create temporary image to measure
-    temp_img = Image.new('RGB', (1, 1))
-    draw = ImageDraw.Draw(temp_img)
-    bbox = draw.textbbox((0, 0), text, font=font)
+    bbox = font.getbbox(text)
     width = bbox[2] - bbox[0]
     height = bbox[3] - bbox[1]
     return (width, height)
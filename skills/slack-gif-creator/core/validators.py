@@ -5,16 +5,48 @@ Validators - Check if GIFs meet Slack's requirements.
 These validators help ensure your GIFs meet Slack's size and dimension constraints.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import IO, Iterable
+import glob
+import json
+import struct
+import sys
+import time
 
+from core.parallel import resolve_workers
 
-def check_slack_size(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool, dict]:
+
+# Slack upload size limits in KB
+SLACK_SIZE_LIMITS_KB = {
+    'emoji': 64,
+    'message': 2048,
+}
+
+
+def get_size_limit_bytes(is_emoji: bool = True) -> int:
+    """
+    Get the Slack size limit in bytes.
+
+    Args:
+        is_emoji: True for emoji GIF limit, False for message GIF limit
+
+    Returns:
+        Maximum file size in bytes
+    """
+    return SLACK_SIZE_LIMITS_KB['emoji' if is_emoji else 'message'] * 1024
+
+
+def check_slack_size(gif_path: str | Path, is_emoji: bool = True,
+                     verbose: bool = True) -> tuple[bool, dict]:
     """
     Check if GIF meets Slack size limits.
 
     Args:
         gif_path: Path to GIF file
         is_emoji: True for emoji GIF (64KB limit), False for message GIF (2MB limit)
+        verbose: Print feedback
 
     Returns:
         Tuple of (passes: bool, info: dict with details)
@@ -28,7 +60,7 @@ def check_slack_size(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool,
     size_kb = size_bytes / 1024
     size_mb = size_kb / 1024
 
-    limit_kb = 64 if is_emoji else 2048
+    limit_kb = SLACK_SIZE_LIMITS_KB['emoji' if is_emoji else 'message']
     limit_mb = limit_kb / 1024
 
     passes = size_kb <= limit_kb
@@ -44,19 +76,21 @@ def check_slack_size(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool,
     }
 
     # Print feedback
-    if passes:
-        print(f"✓ {size_kb:.1f} KB - within {limit_kb} KB limit")
-    else:
-        print(f"✗ {size_kb:.1f} KB - exceeds {limit_kb} KB limit")
-        overage_kb = size_kb - limit_kb
-        overage_percent = (overage_kb / limit_kb) * 100
-        print(f"  Over by: {overage_kb:.1f} KB ({overage_percent:.1f}%)")
-        print(f"  Try: fewer frames, fewer colors, or simpler design")
+    if verbose:
+        if passes:
+            print(f"✓ {size_kb:.1f} KB - within {limit_kb} KB limit")
+        else:
+            print(f"✗ {size_kb:.1f} KB - exceeds {limit_kb} KB limit")
+            overage_kb = size_kb - limit_kb
+            overage_percent = (overage_kb / limit_kb) * 100
+            print(f"  Over by: {overage_kb:.1f} KB ({overage_percent:.1f}%)")
+            print(f"  Try: fewer frames, fewer colors, or simpler design")
 
     return passes, info
 
 
-def validate_dimensions(width: int, height: int, is_emoji: bool = True) -> tuple[bool, dict]:
+def validate_dimensions(width: int, height: int, is_emoji: bool = True,
+                        verbose: bool = True) -> tuple[bool, dict]:
     """
     Check if dimensions are suitable for Slack.
 
@@ -64,6 +98,7 @@ def validate_dimensions(width: int, height: int, is_emoji: bool = True) -> tuple
         width: Frame width in pixels
         height: Frame height in pixels
         is_emoji: True for emoji GIF, False for message GIF
+        verbose: Print feedback
 
     Returns:
         Tuple of (passes: bool, info: dict with details)
@@ -84,13 +119,13 @@ def validate_dimensions(width: int, height: int, is_emoji: bool = True) -> tuple
         info['acceptable'] = acceptable
 
         if optimal:
-            print(f"✓ {width}x{height} - optimal for emoji")
+            message = f"✓ {width}x{height} - optimal for emoji"
             passes = True
         elif acceptable:
-            print(f"⚠ {width}x{height} - acceptable but 128x128 is optimal")
+            message = f"⚠ {width}x{height} - acceptable but 128x128 is optimal"
             passes = True
         else:
-            print(f"✗ {width}x{height} - emoji should be square, 128x128 recommended")
+            message = f"✗ {width}x{height} - emoji should be square, 128x128 recommended"
             passes = False
     else:
         # Message GIFs should be square-ish and reasonable size
@@ -104,76 +139,192 @@ def validate_dimensions(width: int, height: int, is_emoji: bool = True) -> tuple
         is_square_ish = aspect_ratio <= 2.0
 
         if is_square_ish and reasonable_size:
-            print(f"✓ {width}x{height} - good for message GIF")
+            message = f"✓ {width}x{height} - good for message GIF"
             passes = True
         elif is_square_ish:
-            print(f"⚠ {width}x{height} - square-ish but unusual size")
+            message = f"⚠ {width}x{height} - square-ish but unusual size"
             passes = True
         elif reasonable_size:
-            print(f"⚠ {width}x{height} - good size but not square-ish")
+            message = f"⚠ {width}x{height} - good size but not square-ish"
             passes = True
         else:
-            print(f"✗ {width}x{height} - unusual dimensions for Slack")
+            message = f"✗ {width}x{height} - unusual dimensions for Slack"
             passes = False
 
+    if verbose:
+        print(message)
+
     return passes, info
 
 
-def validate_gif(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool, dict]:
+# GIF block introducers and extension labels
+_EXTENSION = 0x21
+_IMAGE = 0x2C
+_TRAILER = 0x3B
+_GRAPHIC_CONTROL = 0xF9
+_APPLICATION = 0xFF
+_LOOP_APPLICATIONS = (b'NETSCAPE2.0', b'ANIMEXTS1.0')
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Return the position just past a chain of data sub-blocks."""
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return pos
+        pos += size
+
+
+def inspect_gif(gif_path: str | Path) -> dict:
+    """
+    Read a GIF's structure from its blocks without decoding any pixels.
+
+    Walks the logical screen descriptor, extensions and image descriptors,
+    skipping the LZW data, so frame counts and timing come out in about the
+    time it takes to read the file, even for multi-MB GIFs.
+
+    Args:
+        gif_path: Path to GIF file
+
+    Returns:
+        Dict with 'version', 'width', 'height', 'global_palette_size' (0 if
+        none), 'background_index', 'loop_count' (0 = forever, None = no loop
+        extension, i.e. play once), 'frame_count', 'delays_ms',
+        'total_duration_ms', 'truncated' (no trailer found) and 'frames', one
+        dict per frame with 'rect' (left, top, right, bottom), 'delay_ms',
+        'disposal', 'transparent_index', 'palette_size' (local table size,
+        0 if the frame uses the global one) and 'interlaced'
+
+    Raises:
+        ValueError: If the file is not a GIF
+    """
+    data = Path(gif_path).read_bytes()
+    if len(data) < 13 or data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError(f"Not a GIF file: {gif_path}")
+
+    width, height, packed, background_index, _ = struct.unpack_from('<HHBBB', data, 6)
+    global_palette_size = 2 << (packed & 0x07) if packed & 0x80 else 0
+    pos = 13 + 3 * global_palette_size
+
+    loop_count = None
+    frames = []
+    control = None  # Graphic control extension for the next image
+    truncated = True
+
+    try:
+        while pos < len(data):
+            introducer = data[pos]
+            pos += 1
+
+            if introducer == _TRAILER:
+                truncated = False
+                break
+
+            if introducer == _EXTENSION:
+                label = data[pos]
+                pos += 1
+                if label == _GRAPHIC_CONTROL and data[pos] >= 4:
+                    flags, delay, transparent = struct.unpack_from('<BHB', data, pos + 1)
+                    control = {
+                        'delay_ms': delay * 10,
+                        'disposal': (flags >> 2) & 0x07,
+                        'transparent_index': transparent if flags & 0x01 else None,
+                    }
+                elif label == _APPLICATION and data[pos + 1:pos + 12] in _LOOP_APPLICATIONS:
+                    loop_block = data[pos + 12:pos + 16]
+                    if len(loop_block) == 4 and loop_block[:2] == b'\x03\x01':
+                        loop_count = struct.unpack('<H', loop_block[2:])[0]
+                pos = _skip_sub_blocks(data, pos)
+
+            elif introducer == _IMAGE:
+                left, top, frame_width, frame_height, flags = struct.unpack_from('<HHHHB', data, pos)
+                pos += 9
+                palette_size = 2 << (flags & 0x07) if flags & 0x80 else 0
+                pos += 3 * palette_size + 1  # Local color table, LZW minimum code size
+                pos = _skip_sub_blocks(data, pos)
+
+                control = control or {'delay_ms': 0, 'disposal': 0, 'transparent_index': None}
+                frames.append({
+                    'rect': (left, top, left + frame_width, top + frame_height),
+                    **control,
+                    'palette_size': palette_size,
+                    'interlaced': bool(flags & 0x40),
+                })
+                control = None
+
+            else:
+                # Not a block introducer: the rest of the file is garbage
+                break
+    except (IndexError, struct.error):
+        pass  # Data ends mid-block
+
+    delays_ms = [frame['delay_ms'] for frame in frames]
+
+    return {
+        'version': data[3:6].decode('ascii'),
+        'width': width,
+        'height': height,
+        'global_palette_size': global_palette_size,
+        'background_index': background_index,
+        'loop_count': loop_count,
+        'frame_count': len(frames),
+        'delays_ms': delays_ms,
+        'total_duration_ms': sum(delays_ms),
+        'truncated': truncated,
+        'frames': frames,
+    }
+
+
+def validate_gif(gif_path: str | Path, is_emoji: bool = True,
+                 verbose: bool = True) -> tuple[bool, dict]:
     """
     Run all validations on a GIF file.
 
     Args:
         gif_path: Path to GIF file
         is_emoji: True for emoji GIF, False for message GIF
+        verbose: Print a report
 
     Returns:
         Tuple of (all_pass: bool, results: dict)
     """
-    from PIL import Image
-
     gif_path = Path(gif_path)
 
     if not gif_path.exists():
         return False, {'error': f'File not found: {gif_path}'}
 
-    print(f"\nValidating {gif_path.name} as {'emoji' if is_emoji else 'message'} GIF:")
-    print("=" * 60)
+    if verbose:
+        print(f"\nValidating {gif_path.name} as {'emoji' if is_emoji else 'message'} GIF:")
+        print("=" * 60)
 
     # Check file size
-    size_pass, size_info = check_slack_size(gif_path, is_emoji)
+    size_pass, size_info = check_slack_size(gif_path, is_emoji, verbose)
 
-    # Check dimensions
+    # Read the structure from the block headers (no frame decoding)
     try:
-        with Image.open(gif_path) as img:
-            width, height = img.size
-            dim_pass, dim_info = validate_dimensions(width, height, is_emoji)
-
-            # Count frames
-            frame_count = 0
-            try:
-                while True:
-                    img.seek(frame_count)
-                    frame_count += 1
-            except EOFError:
-                pass
-
-            # Get duration if available
-            try:
-                duration_ms = img.info.get('duration', 100)
-                total_duration = (duration_ms * frame_count) / 1000
-                fps = frame_count / total_duration if total_duration > 0 else 0
-            except:
-                duration_ms = None
-                total_duration = None
-                fps = None
-
+        gif_info = inspect_gif(gif_path)
     except Exception as e:
         return False, {'error': f'Failed to read GIF: {e}'}
 
-    print(f"\nFrames: {frame_count}")
-    if total_duration:
-        print(f"Duration: {total_duration:.1f}s @ {fps:.1f} fps")
+    # Check dimensions
+    dim_pass, dim_info = validate_dimensions(gif_info['width'], gif_info['height'],
+                                             is_emoji, verbose)
+
+    # Timing from every frame's delay, so variable-delay GIFs are right too
+    frame_count = gif_info['frame_count']
+    delays_ms = gif_info['delays_ms']
+    total_duration = gif_info['total_duration_ms'] / 1000
+    fps = frame_count / total_duration if total_duration > 0 else 0
+
+    if verbose:
+        print(f"\nFrames: {frame_count}")
+        if total_duration:
+            print(f"Duration: {total_duration:.1f}s @ {fps:.1f} fps")
+            if min(delays_ms) != max(delays_ms):
+                print(f"  Variable delays: {min(delays_ms)}-{max(delays_ms)} ms per frame")
+        if gif_info['truncated']:
+            print("⚠ File is truncated (no GIF trailer)")
 
     all_pass = size_pass and dim_pass
 
@@ -184,15 +335,18 @@ def validate_gif(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool, dic
         'dimensions': dim_info,
         'frame_count': frame_count,
         'duration_seconds': total_duration,
-        'fps': fps
+        'fps': fps,
+        'delays_ms': delays_ms,
+        'loop_count': gif_info['loop_count']
     }
 
-    print("=" * 60)
-    if all_pass:
-        print("✓ All validations passed!")
-    else:
-        print("✗ Some validations failed")
-    print()
+    if verbose:
+        print("=" * 60)
+        if all_pass:
+            print("✓ All validations passed!")
+        else:
+            print("✗ Some validations failed")
+        print()
 
     return all_pass, results
 
@@ -260,5 +414,155 @@ def is_slack_ready(gif_path: str | Path, is_emoji: bool = True, verbose: bool =
                     print(suggestion)
         return passes
     else:
-        size_pass, _ = check_slack_size(gif_path, is_emoji)
+        size_pass, _ = check_slack_size(gif_path, is_emoji, verbose=False)
         return size_pass
+
+
+def _gif_paths(sources: str | Path | Iterable[str | Path]) -> list[Path]:
+    """Expand directories (their *.gif files) and glob patterns, keeping order."""
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+
+    paths = {}
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            matches = sorted(source.glob('*.gif'))
+        elif glob.has_magic(str(source)):
+            matches = sorted(Path(match) for match in glob.glob(str(source), recursive=True))
+        else:
+            matches = [source]
+        paths.update(dict.fromkeys(matches))
+    return list(paths)
+
+
+def _batch_record(gif_path: Path, is_emoji: bool) -> dict:
+    """Worker: validate one GIF quietly and flatten the results to one JSON record."""
+    passes, results = validate_gif(gif_path, is_emoji, verbose=False)
+    if 'error' in results:
+        return {'file': str(gif_path), 'passes': False, 'error': results['error']}
+
+    return {
+        'file': results['file'],
+        'passes': passes,
+        'size_kb': round(results['size']['size_kb'], 2),
+        'limit_kb': results['size']['limit_kb'],
+        'width': results['dimensions']['width'],
+        'height': results['dimensions']['height'],
+        'frame_count': results['frame_count'],
+        'duration_seconds': results['duration_seconds'],
+        'fps': round(results['fps'], 2),
+        'loop_count': results['loop_count'],
+        'suggestions': get_optimization_suggestions(results),
+    }
+
+
+def validate_batch(sources: str | Path | Iterable[str | Path], is_emoji: bool = True,
+                   workers: int = 0, jsonl: str | Path | IO[str] | None = None,
+                   quiet: bool = False) -> dict:
+    """
+    Validate many GIFs on a process pool and summarize the results.
+
+    Each file is read once (block headers only, see inspect_gif()). Records
+    come back in input order and are written as they arrive, one JSON object
+    per line, followed by a final {"summary": {...}} line.
+
+    Args:
+        sources: Directory (its *.gif files), glob pattern (e.g. 'out/**/*.gif')
+            or file path, or a list of them
+        is_emoji: True for emoji GIFs, False for message GIFs
+        workers: Number of processes (1 = run inline, 0 = one per CPU)
+        jsonl: Path or text stream (e.g. sys.stdout) for the JSONL records
+        quiet: Skip the one-line-per-file report (the summary is still printed,
+            to stderr if the records go to stdout)
+
+    Returns:
+        Summary dict with 'files', 'passed', 'failed', 'errors',
+        'total_size_kb', 'largest' (file and size_kb) and 'seconds'
+    """
+    start = time.perf_counter()
+    paths = _gif_paths(sources)
+    workers = min(resolve_workers(workers), max(1, len(paths)))
+    validate = partial(_batch_record, is_emoji=is_emoji)
+
+    if isinstance(jsonl, (str, Path)):
+        out = open(jsonl, 'w')
+    else:
+        out = jsonl
+    # Keep the report out of JSONL written to stdout
+    report = sys.stderr if out is sys.stdout else sys.stdout
+
+    summary = {'files': 0, 'passed': 0, 'failed': 0, 'errors': 0,
+               'total_size_kb': 0.0, 'largest': None}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is None:
+            records = map(validate, paths)
+        else:
+            records = pool.map(validate, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
+        for record in records:
+            summary['files'] += 1
+            if record['passes']:
+                summary['passed'] += 1
+            else:
+                summary['failed'] += 1
+            if 'error' in record:
+                summary['errors'] += 1
+            else:
+                summary['total_size_kb'] += record['size_kb']
+                if summary['largest'] is None or record['size_kb'] > summary['largest']['size_kb']:
+                    summary['largest'] = {'file': record['file'], 'size_kb': record['size_kb']}
+
+            if out is not None:
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if not quiet:
+                _print_record(record, report)
+
+        summary['total_size_kb'] = round(summary['total_size_kb'], 2)
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        if out is not None:
+            out.write(json.dumps({'summary': summary}, ensure_ascii=False) + '\n')
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if out is not None and out is not jsonl:
+            out.close()
+
+    print(f"{summary['files']} GIFs validated in {summary['seconds']:.1f}s: "
+          f"{summary['passed']} passed, {summary['failed']} failed"
+          + (f" ({summary['errors']} unreadable)" if summary['errors'] else ""),
+          file=report)
+    return summary
+
+
+def _print_record(record: dict, report: IO[str]):
+    """One line per file for validate_batch(), plus any suggestions."""
+    name = Path(record['file']).name
+    if 'error' in record:
+        print(f"✗ {name}: {record['error']}", file=report)
+        return
+
+    mark = '✓' if record['passes'] else '✗'
+    print(f"{mark} {name}: {record['size_kb']:.1f} KB, {record['width']}x{record['height']}, "
+          f"{record['frame_count']} frames @ {record['fps']:.1f} fps", file=report)
+    for suggestion in record['suggestions']:
+        print(f"    {suggestion}", file=report)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Validate GIFs for Slack in parallel (run as: python -m core.validators).')
+    parser.add_argument('sources', nargs='+', help='GIF files, directories or glob patterns')
+    parser.add_argument('--message', action='store_true', help='Check as message GIFs (default: emoji)')
+    parser.add_argument('--workers', type=int, default=0, help='Processes (0 = one per CPU)')
+    parser.add_argument('--jsonl', help="Write JSONL records to this file ('-' for stdout)")
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    summary = validate_batch(args.sources, is_emoji=not args.message, workers=args.workers,
+                             jsonl=sys.stdout if args.jsonl == '-' else args.jsonl,
+                             quiet=args.quiet)
+    sys.exit(0 if summary['failed'] == 0 else 1)
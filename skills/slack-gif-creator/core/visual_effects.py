@@ -6,11 +6,12 @@ This module provides high-impact visual effects that make animations feel
 professional and dynamic while keeping file sizes reasonable.
 """
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
 import math
 import random
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 
 class Particle:
@@ -103,12 +104,59 @@ class Particle:
             draw.line(points, fill=color, width=2)
 
 
+PARTICLE_SHAPES = ('circle', 'square', 'star')
+
+
 class ParticleSystem:
-    """Manages a collection of particles."""
+    """
+    Manages a collection of particles as NumPy arrays (one per attribute).
 
-    def __init__(self):
-        """Initialize particle system."""
-        self.particles: list[Particle] = []
+    Emitting, updating and culling are whole-array operations, and render()
+    splats every particle into one buffer and writes it to the frame once,
+    so thousands of particles per frame cost about as much as a few dozen.
+    Particles look and move exactly as individual Particle objects would.
+    """
+
+    def __init__(self, seed: Optional[int] = None, scale: float = 1.0):
+        """
+        Initialize particle system.
+
+        Args:
+            seed: Seed for the emitters' random numbers (None = drawn from the
+                random module, so random.seed() still makes bursts repeatable)
+            scale: Pixels per unit of speed, size and gravity (Canvas.scale),
+                so a burst looks the same at any render size. Emission
+                positions are always in pixels
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.rng = np.random.default_rng(seed)
+        self.scale = scale
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.lifetime = np.zeros(0)
+        self.max_lifetime = np.zeros(0)
+        self.gravity = np.zeros(0)
+        self.drag = np.zeros(0)
+        self.size = np.zeros(0)
+        self.shape = np.zeros(0, dtype=np.int8)        # Index into PARTICLE_SHAPES (-1 = none)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+
+    @property
+    def particles(self) -> list[Particle]:
+        """The live particles as Particle objects (a snapshot; changes are not written back)."""
+        particles = []
+        for i in range(len(self.x)):
+            shape = PARTICLE_SHAPES[self.shape[i]] if self.shape[i] >= 0 else ''
+            particle = Particle(self.x[i], self.y[i], self.vx[i], self.vy[i], self.lifetime[i],
+                                tuple(int(c) for c in self.color[i]), self.size[i], shape)
+            particle.max_lifetime = self.max_lifetime[i]
+            particle.gravity = self.gravity[i]
+            particle.drag = self.drag[i]
+            particles.append(particle)
+        return particles
 
     def emit(self, x: int, y: int, count: int = 10,
              spread: float = 2.0, speed: float = 5.0,
@@ -127,18 +175,15 @@ class ParticleSystem:
             size: Particle size
             shape: Particle shape
         """
-        for _ in range(count):
-            # Random angle and speed
-            angle = random.uniform(0, 2 * math.pi)
-            vel_mag = random.uniform(speed * 0.5, speed * 1.5)
-            vx = math.cos(angle) * vel_mag
-            vy = math.sin(angle) * vel_mag
+        # Random angle and speed
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        vel_mag = self.rng.uniform(speed * 0.5, speed * 1.5, count)
 
-            # Random lifetime variation
-            life = random.uniform(lifetime * 0.7, lifetime * 1.3)
+        # Random lifetime variation
+        life = self.rng.uniform(lifetime * 0.7, lifetime * 1.3, count)
 
-            particle = Particle(x, y, vx, vy, life, color, size, shape)
-            self.particles.append(particle)
+        self._add(x, y, np.cos(angle) * vel_mag, np.sin(angle) * vel_mag, life,
+                  color, size, _shape_code(shape), gravity=0.5, drag=0.98)
 
     def emit_confetti(self, x: int, y: int, count: int = 20,
                       colors: Optional[list[tuple[int, int, int]]] = None):
@@ -156,17 +201,15 @@ class ParticleSystem:
                 (107, 185, 240), (162, 155, 254), (255, 182, 193)
             ]
 
-        for _ in range(count):
-            color = random.choice(colors)
-            vx = random.uniform(-3, 3)
-            vy = random.uniform(-8, -2)
-            shape = random.choice(['square', 'circle'])
-            size = random.randint(2, 4)
-            lifetime = random.uniform(40, 60)
+        color = np.asarray(colors, dtype=np.uint8)[self.rng.integers(len(colors), size=count)]
+        vx = self.rng.uniform(-3, 3, count)
+        vy = self.rng.uniform(-8, -2, count)
+        shape = self.rng.choice([_shape_code('square'), _shape_code('circle')], count)
+        size = self.rng.integers(2, 5, count)
+        lifetime = self.rng.uniform(40, 60, count)
 
-            particle = Particle(x, y, vx, vy, lifetime, color, size, shape)
-            particle.gravity = 0.3  # Lighter gravity for confetti
-            self.particles.append(particle)
+        # Lighter gravity for confetti
+        self._add(x, y, vx, vy, lifetime, color, size, shape, gravity=0.3, drag=0.98)
 
     def emit_sparkles(self, x: int, y: int, count: int = 15):
         """
@@ -176,38 +219,140 @@ class ParticleSystem:
             x, y: Emission position
             count: Number of sparkles
         """
-        colors = [(255, 255, 200), (255, 255, 255), (255, 255, 150)]
+        colors = np.array([(255, 255, 200), (255, 255, 255), (255, 255, 150)], dtype=np.uint8)
+
+        color = colors[self.rng.integers(len(colors), size=count)]
+        angle = self.rng.uniform(0, 2 * math.pi, count)
+        speed = self.rng.uniform(1, 3, count)
+        lifetime = self.rng.uniform(15, 30, count)
 
-        for _ in range(count):
-            color = random.choice(colors)
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 3)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            lifetime = random.uniform(15, 30)
+        self._add(x, y, np.cos(angle) * speed, np.sin(angle) * speed, lifetime,
+                  color, 2, _shape_code('star'), gravity=0.0, drag=0.95)
 
-            particle = Particle(x, y, vx, vy, lifetime, color, 2, 'star')
-            particle.gravity = 0
-            particle.drag = 0.95
-            self.particles.append(particle)
+    def _add(self, x, y, vx, vy, lifetime, color, size, shape, gravity, drag):
+        """Append particles; scalars are broadcast to the number of velocities."""
+        count = len(vx)
+        if count == 0:
+            return
+
+        def column(values, dtype=float):
+            return np.broadcast_to(np.asarray(values, dtype=dtype), (count,))
+
+        if self.scale != 1:
+            vx, vy = vx * self.scale, vy * self.scale
+            gravity = column(gravity) * self.scale
+            size = np.maximum(1, column(size) * self.scale)
+
+        lifetime = column(lifetime)
+        self.x = np.concatenate([self.x, column(x)])
+        self.y = np.concatenate([self.y, column(y)])
+        self.vx = np.concatenate([self.vx, vx])
+        self.vy = np.concatenate([self.vy, vy])
+        self.lifetime = np.concatenate([self.lifetime, lifetime])
+        self.max_lifetime = np.concatenate([self.max_lifetime, lifetime])
+        self.gravity = np.concatenate([self.gravity, column(gravity)])
+        self.drag = np.concatenate([self.drag, column(drag)])
+        self.size = np.concatenate([self.size, column(size)])
+        self.shape = np.concatenate([self.shape, column(shape, np.int8)])
+        self.color = np.concatenate([self.color, np.broadcast_to(
+            np.asarray(color, dtype=np.uint8), (count, 3))])
 
     def update(self):
         """Update all particles."""
-        # Update alive particles
-        for particle in self.particles:
-            particle.update()
+        # Apply physics
+        self.vy += self.gravity
+        self.vx *= self.drag
+        self.vy *= self.drag
+
+        # Update position
+        self.x += self.vx
+        self.y += self.vy
+
+        # Decrease lifetime
+        self.lifetime -= 1
 
         # Remove dead particles
-        self.particles = [p for p in self.particles if p.is_alive()]
+        alive = self.lifetime > 0
+        if not alive.all():
+            for name in ('x', 'y', 'vx', 'vy', 'lifetime', 'max_lifetime',
+                         'gravity', 'drag', 'size', 'shape', 'color'):
+                setattr(self, name, getattr(self, name)[alive])
 
     def render(self, frame: Image.Image):
-        """Render all particles to frame."""
-        for particle in self.particles:
-            particle.render(frame)
+        """
+        Render all particles to frame.
+
+        Each particle's shape is stamped into an owner buffer holding, per
+        pixel, the last particle drawn there; the covered pixels are then
+        written in a single pass. Colors fade with lifetime as in Particle.
+
+        Args:
+            frame: PIL Image to draw on (modified in place)
+        """
+        alive = self.lifetime > 0
+        if not alive.any():
+            return
+
+        width, height = frame.size
+        alpha = np.clip(self.lifetime / self.max_lifetime, 0, 1)
+        colors = (self.color * alpha[:, None]).astype(np.uint8)
+        sizes = np.maximum(1, (self.size * alpha).astype(int))
+        xs = self.x.astype(int)
+        ys = self.y.astype(int)
+
+        # Stamp each (shape, size) group at all of its particles' positions
+        pixels, owners = [], []
+        keys = np.where(alive & (self.shape >= 0), sizes * len(PARTICLE_SHAPES) + self.shape, -1)
+        for key in np.unique(keys[keys >= 0]):
+            members = np.flatnonzero(keys == key)
+            size, shape = divmod(int(key), len(PARTICLE_SHAPES))
+            dy, dx = _particle_stamp(PARTICLE_SHAPES[shape], size)
+            py = ys[members, None] + dy
+            px = xs[members, None] + dx
+            inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+            pixels.append((py * width + px)[inside])
+            owners.append(np.broadcast_to(members[:, None], inside.shape)[inside])
+        if not pixels:
+            return
+
+        # Later particles draw over earlier ones
+        owner = np.full(width * height, -1, dtype=np.int64)
+        np.maximum.at(owner, np.concatenate(pixels), np.concatenate(owners))
+        covered = np.flatnonzero(owner >= 0)
+        if len(covered) == 0:
+            return
+
+        rows = covered // width
+        cols = covered % width
+        box = (int(cols.min()), int(rows.min()), int(cols.max()) + 1, int(rows.max()) + 1)
+        region = np.array(frame.crop(box).convert('RGB'))
+        region[rows - box[1], cols - box[0]] = colors[owner[covered]]
+        frame.paste(Image.fromarray(region).convert(frame.mode), box[:2])
 
     def get_particle_count(self) -> int:
         """Get number of active particles."""
-        return len(self.particles)
+        return len(self.x)
+
+
+def _shape_code(shape: str) -> int:
+    """Index of a shape in PARTICLE_SHAPES (-1 for shapes that are not drawn)."""
+    return PARTICLE_SHAPES.index(shape) if shape in PARTICLE_SHAPES else -1
+
+
+@lru_cache(maxsize=None)
+def _particle_stamp(shape: str, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pixel offsets, from the particle's position, that Particle.render() covers.
+
+    The shape is drawn once with the same ImageDraw calls, so stamped
+    particles match individually drawn ones pixel for pixel.
+    """
+    center = size + 2
+    mask = Image.new('RGB', (2 * center + 1, 2 * center + 1), (0, 0, 0))
+    particle = Particle(center, center, 0, 0, 1, (255, 255, 255), size, shape)
+    particle.render(mask)
+    dy, dx = np.nonzero(np.asarray(mask)[:, :, 0])
+    return dy - center, dx - center
 
 
 def add_motion_blur(frame: Image.Image, prev_frame: Optional[Image.Image],
@@ -491,4 +636,19 @@ def apply_screen_shake(frame: Image.Image, intensity: int, frame_index: int) ->
     # Paste original frame with offset
     shaken.paste(frame, (offset_x, offset_y))
 
-    return shaken
\ No newline at end of file
+    return shaken
+
+
+def iter_screen_shake(frames: Iterable[Image.Image], intensity: int) -> Iterator[Image.Image]:
+    """
+    Apply screen shake to a stream of frames, one frame at a time.
+
+    Args:
+        frames: Frames to shake (any iterable, e.g. a template's iter_* generator)
+        intensity: Shake intensity
+
+    Yields:
+        Shaken frames
+    """
+    for frame_index, frame in enumerate(frames):
+        yield apply_screen_shake(frame, intensity, frame_index)
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Batch Render - Render many GIFs from a manifest on a process pool.
+
+The manifest (JSON, or YAML if PyYAML is installed) lists jobs, each naming
+a template, its parameters, the output path and optionally GIFBuilder and
+save() settings or a size budget. Shared settings go in 'defaults':
+
+    {
+      "defaults": {"builder": {"width": 128, "height": 128, "fps": 10},
+                   "budget": "emoji"},
+      "jobs": [
+        {"template": "bounce", "params": {"object_type": "emoji",
+         "object_data": {"emoji": "🎉", "size": 80}}, "output": "party.gif"},
+        {"template": "spin.create_loading_spinner", "output": "loading.gif",
+         "save": {"num_colors": 32}, "budget": null}
+      ]
+    }
+
+'template' is a module in templates/ (using its create_<name>_animation
+function) or module.function. 'budget' is "emoji", "message", a byte count,
+or a dict of save_within_budget() arguments; without one, save() is used.
+Templates render directly at the builder's size (render_size), so a 128x128
+emoji is never drawn at 480x480 and downscaled; set "render_size": null in
+a job's params to opt out.
+
+Each worker warms its font index, the emoji sprites and the named palettes
+the manifest uses once at startup, so no job pays for them, and jobs are
+queued in template order so each template module's own caches stay warm
+in the workers running it. With --cache,
+finished GIFs also go through core.render_cache, so unchanged jobs are
+copied instead of re-rendered.
+
+Usage:
+    python scripts/batch_render.py manifest.json [--workers 0] [--out-dir out]
+        [--cache DIR] [--jsonl report.jsonl] [--quiet]
+"""
+
+import argparse
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.emoji_atlas import REFERENCE_SIZE, get_atlas
+from core.fonts import FONT_ROLES, font_paths
+from core.gif_builder import GIFBuilder
+from core.parallel import resolve_workers
+from core.quantizer import get_lut, named_palette
+from core.render_cache import RenderCache
+
+
+JOB_KEYS = ('template', 'params', 'output', 'builder', 'save', 'budget')
+
+# Render cache of this worker process (set by _init_worker)
+_cache: Optional[RenderCache] = None
+
+
+def load_manifest(path: str | Path) -> list[dict]:
+    """
+    Read a manifest and return its jobs with defaults applied.
+
+    Args:
+        path: JSON or YAML manifest; either a list of jobs or a dict with
+            'jobs' and optional 'defaults'
+
+    Returns:
+        List of job dicts with every key in JOB_KEYS
+
+    Raises:
+        ValueError: If the manifest or a job is malformed
+    """
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML manifests need PyYAML (pip install pyyaml); or use JSON")
+        manifest = yaml.safe_load(text)
+    else:
+        manifest = json.loads(text)
+
+    if isinstance(manifest, list):
+        manifest = {'jobs': manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list):
+        raise ValueError(f"{path}: expected a list of jobs or a dict with 'jobs'")
+    defaults = manifest.get('defaults') or {}
+
+    jobs = []
+    for number, job in enumerate(manifest['jobs'], 1):
+        unknown = set(job) - set(JOB_KEYS)
+        if unknown:
+            raise ValueError(f"Job {number}: unknown keys {', '.join(sorted(unknown))}")
+        merged = {}
+        for key in JOB_KEYS:
+            value = job.get(key, defaults.get(key))
+            # Dict settings merge one level deep, so a job can override one field
+            if isinstance(value, dict) and isinstance(defaults.get(key), dict):
+                value = {**defaults[key], **value}
+            merged[key] = value
+        if not merged['template'] or not merged['output']:
+            raise ValueError(f"Job {number}: 'template' and 'output' are required")
+        merged['params'] = merged['params'] or {}
+        jobs.append(merged)
+    return jobs
+
+
+def resolve_template(name: str):
+    """
+    Find a template function by name.
+
+    Args:
+        name: 'bounce' (templates.bounce.create_bounce_animation) or
+            'spin.create_loading_spinner'
+
+    Returns:
+        The template function
+    """
+    module_name, _, function_name = name.partition('.')
+    module = importlib.import_module(f'templates.{module_name}')
+    function_name = function_name or f'create_{module_name}_animation'
+    try:
+        return getattr(module, function_name)
+    except AttributeError:
+        raise ValueError(f"Template {name!r}: templates/{module_name}.py has no {function_name}()")
+
+
+def native_params(template, params: dict, builder: Optional[dict]) -> dict:
+    """
+    Template parameters with render_size set to the builder's frame size.
+
+    Args:
+        template: Template function
+        params: The job's parameters (an explicit render_size is kept)
+        builder: GIFBuilder() arguments
+
+    Returns:
+        Parameters to call the template with
+    """
+    if 'render_size' in params or 'render_size' not in inspect.signature(template).parameters:
+        return params
+    defaults = inspect.signature(GIFBuilder).parameters
+    builder = builder or {}
+    size = (builder.get('width', defaults['width'].default),
+            builder.get('height', defaults['height'].default))
+    return {**params, 'render_size': size}
+
+
+def budget_arguments(budget) -> Optional[dict]:
+    """save_within_budget() arguments for a job's 'budget' value (None = use save())."""
+    if budget is None or budget is False:
+        return None
+    if budget in ('emoji', 'message'):
+        return {'is_emoji': budget == 'emoji'}
+    if isinstance(budget, int) and not isinstance(budget, bool):
+        return {'max_bytes': budget}
+    if isinstance(budget, dict):
+        return budget
+    raise ValueError(f"Unknown budget {budget!r} (use 'emoji', 'message', bytes or a dict)")
+
+
+def warm_up(emojis: list[str], palettes: list[str]):
+    """
+    Fill this process's caches with what the jobs will use.
+
+    Args:
+        emojis: Emoji characters to rasterize into the sprite atlas
+        palettes: Palette names to build and make lookup tables for
+    """
+    for role in FONT_ROLES:
+        font_paths(role)
+    atlas = get_atlas()
+    for emoji in emojis:
+        atlas.sprite(emoji, REFERENCE_SIZE)
+    for name in palettes:
+        try:
+            get_lut(named_palette(name))
+        except (KeyError, ValueError):
+            continue  # Unknown name: reported by the job that uses it
+
+
+def _manifest_assets(jobs: list[dict]) -> tuple[list[str], list[str]]:
+    """Emoji characters and palette names mentioned anywhere in the jobs."""
+    emojis, palettes = set(), set()
+
+    def visit(value, key=None):
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                visit(child, child_key)
+        elif isinstance(value, list):
+            for child in value:
+                visit(child, key)
+        elif isinstance(value, str) and key is not None:
+            if 'emoji' in key:
+                emojis.add(value)
+            elif key == 'palette':
+                palettes.add(value)
+
+    for job in jobs:
+        visit({'params': job['params'], 'save': job['save'] or {}})
+    return sorted(emojis), sorted(palettes)
+
+
+def _init_worker(emojis: list[str], palettes: list[str], cache_dir: Optional[str]):
+    """Process pool initializer: warm the caches and open the render cache."""
+    global _cache
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        warm_up(emojis, palettes)
+    _cache = RenderCache(cache_dir) if cache_dir else None
+
+
+def run_job(job: dict) -> dict:
+    """
+    Render one job (in a worker process).
+
+    Args:
+        job: Job dict from load_manifest() with 'output' already resolved
+
+    Returns:
+        Record with 'output', 'template', 'ok', 'seconds', and on success
+        'size_kb', 'frame_count' and 'cached', or 'error' on failure
+    """
+    start = time.perf_counter()
+    record = {'output': job['output'], 'template': job['template']}
+    try:
+        template = resolve_template(job['template'])
+        params = native_params(template, job['params'], job['builder'])
+        budget = budget_arguments(job['budget'])
+        Path(job['output']).parent.mkdir(parents=True, exist_ok=True)
+
+        # Keep the builder's progress output out of the batch report
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            if _cache is not None:
+                info = _cache.render(job['output'], template, kwargs=params,
+                                     builder=job['builder'], save=job['save'], budget=budget)
+            else:
+                builder = GIFBuilder(**(job['builder'] or {}))
+                builder.add_frames(template(**params))
+                if budget is None:
+                    info = builder.save(job['output'], **(job['save'] or {}))
+                else:
+                    info = builder.save_within_budget(job['output'], **budget)
+
+        record.update(ok=True, size_kb=round(info['size_kb'], 2),
+                      frame_count=info['frame_count'], cached=info.get('cached', False))
+    except Exception as e:
+        record.update(ok=False, error=f'{type(e).__name__}: {e}')
+    record['seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def render_batch(jobs: list[dict], workers: int = 0, cache_dir: Optional[str | Path] = None,
+                 jsonl: Optional[str | Path] = None, quiet: bool = False) -> dict:
+    """
+    Render every job on a process pool and report timing.
+
+    Args:
+        jobs: Jobs from load_manifest() (outputs resolved)
+        workers: Number of processes (1 = run inline, 0 = one per CPU)
+        cache_dir: Render cache directory (None = always render)
+        jsonl: Write one JSON record per job here, then a {"summary": ...} line
+        quiet: Skip the per-job lines (the summary is still printed)
+
+    Returns:
+        Summary dict with 'jobs', 'ok', 'failed', 'cached', 'workers',
+        'seconds', 'gifs_per_second', 'frames_per_second' and job time
+        percentiles
+    """
+    start = time.perf_counter()
+    emojis, palettes = _manifest_assets(jobs)
+    cache_dir = str(cache_dir) if cache_dir else None
+    workers = min(resolve_workers(workers), max(1, len(jobs)))
+
+    # Same-template jobs next to each other land in the same worker's chunk
+    ordered = sorted(jobs, key=lambda job: job['template'])
+
+    records = []
+    out = open(jsonl, 'w') if jsonl else None
+    try:
+        def collect(record):
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if not quiet:
+                _print_record(record)
+
+        if workers == 1:
+            _init_worker(emojis, palettes, cache_dir)
+            for job in ordered:
+                collect(run_job(job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(emojis, palettes, cache_dir)) as pool:
+                futures = [pool.submit(run_job, job) for job in ordered]
+                for future in as_completed(futures):
+                    collect(future.result())
+
+        elapsed = time.perf_counter() - start
+        times = sorted(record['seconds'] for record in records)
+        done = [record for record in records if record['ok']]
+        summary = {
+            'jobs': len(records),
+            'ok': len(done),
+            'failed': len(records) - len(done),
+            'cached': sum(1 for record in done if record['cached']),
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'gifs_per_second': round(len(done) / elapsed, 2) if elapsed else 0.0,
+            'frames_per_second': round(sum(r['frame_count'] for r in done) / elapsed, 1) if elapsed else 0.0,
+            'job_seconds_median': round(statistics.median(times), 4) if times else 0.0,
+            'job_seconds_p95': round(times[int(0.95 * (len(times) - 1))], 4) if times else 0.0,
+            'job_seconds_max': round(times[-1], 4) if times else 0.0,
+        }
+        if out is not None:
+            out.write(json.dumps({'summary': summary}) + '\n')
+    finally:
+        if out is not None:
+            out.close()
+
+    print(f"\n{summary['ok']}/{summary['jobs']} GIFs in {summary['seconds']:.2f}s with "
+          f"{workers} worker{'s' if workers != 1 else ''}: {summary['gifs_per_second']:.1f} GIFs/s, "
+          f"{summary['frames_per_second']:.0f} frames/s"
+          + (f", {summary['cached']} from cache" if cache_dir else ""))
+    print(f"Job time: median {summary['job_seconds_median']:.3f}s, "
+          f"p95 {summary['job_seconds_p95']:.3f}s, max {summary['job_seconds_max']:.3f}s")
+    if summary['failed']:
+        print(f"✗ {summary['failed']} failed")
+    return summary
+
+
+def _print_record(record: dict):
+    """One line per finished job."""
+    if record['ok']:
+        source = ' (cached)' if record['cached'] else ''
+        print(f"✓ {record['output']}: {record['size_kb']:.1f} KB, {record['frame_count']} frames, "
+              f"{record['seconds']:.3f}s{source}")
+    else:
+        print(f"✗ {record['output']}: {record['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('manifest', help='JSON or YAML manifest of jobs')
+    parser.add_argument('--workers', type=int, default=0, help='Processes (0 = one per CPU)')
+    parser.add_argument('--out-dir', default='.', help='Directory relative outputs are written under')
+    parser.add_argument('--cache', help='Render cache directory (reuse unchanged GIFs)')
+    parser.add_argument('--jsonl', help='Write per-job records and the summary to this file')
+    parser.add_argument('--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    for job in jobs:
+        job['output'] = str(Path(args.out_dir) / job['output'])
+
+    summary = render_batch(jobs, args.workers, args.cache, args.jsonl, args.quiet)
+    sys.exit(0 if summary['failed'] == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark Workers - Measure how GIFBuilder.save() scales with workers=.
+
+Renders a synthetic animation once, then saves it with increasing worker
+counts for each executor and prints wall time and speedup over workers=1.
+Every run must produce byte-identical output, which is checked as well.
+
+Usage:
+    python scripts/benchmark_workers.py [--frames 60] [--size 480] [--emoji]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.gif_builder import GIFBuilder
+
+
+def make_frames(num_frames: int, size: int) -> list[np.ndarray]:
+    """Moving gradient with a textured disc - enough detail to stress every stage."""
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 40, (size, size, 1), dtype=np.int16)
+
+    frames = []
+    for i in range(num_frames):
+        t = i / num_frames
+        frame = np.stack([
+            255 * (0.5 + 0.5 * np.sin(2 * np.pi * (x + t))),
+            255 * y,
+            255 * (0.5 + 0.5 * np.cos(2 * np.pi * (y - t))),
+        ], axis=-1).astype(np.int16)
+
+        cx, cy = size * (0.3 + 0.4 * t), size * 0.5
+        disc = (x * size - cx) ** 2 + (y * size - cy) ** 2 < (size * 0.15) ** 2
+        frame[disc] = 200 + texture[disc]
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames
+
+
+def time_save(frames: list[np.ndarray], size: int, output: Path, emoji: bool,
+              workers: int, executor: str, repeats: int) -> tuple[float, str]:
+    """Return the best wall time over repeats and the output's digest."""
+    best = float('inf')
+    for _ in range(repeats):
+        builder = GIFBuilder(width=size, height=size, fps=20)
+        builder.add_frames(frames)
+        start = time.perf_counter()
+        builder.save(output, num_colors=128, optimize_for_emoji=emoji,
+                     remove_duplicates=False, workers=workers, executor=executor)
+        best = min(best, time.perf_counter() - start)
+    return best, hashlib.md5(output.read_bytes()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--frames', type=int, default=60, help='Number of frames')
+    parser.add_argument('--size', type=int, default=480, help='Frame width and height')
+    parser.add_argument('--emoji', action='store_true', help='Save in emoji mode (adds resizing)')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per configuration (best is kept)')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help='Largest worker count to try')
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.size)
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    print(f"{args.frames} frames at {args.size}x{args.size}, "
+          f"{os.cpu_count()} CPUs{', emoji mode' if args.emoji else ''}\n")
+    print(f"{'executor':<10}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+
+    def run(workers, executor, repeats):
+        # Keep save()'s own progress output out of the table
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                return time_save(frames, args.size, output, args.emoji,
+                                 workers, executor, repeats)
+            finally:
+                sys.stdout = stdout
+
+    digests = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'benchmark.gif'
+
+        # Warm-up: fills the palette and lookup-table caches, so every timed
+        # run measures the per-frame work only
+        run(1, 'thread', 1)
+
+        for executor in ('thread', 'process'):
+            baseline = None
+            for workers in worker_counts:
+                seconds, digest = run(workers, executor, args.repeats)
+                baseline = baseline or seconds
+                digests.add(digest)
+                print(f"{executor:<10}{workers:>8}{seconds:>10.3f}{baseline / seconds:>8.2f}x")
+
+    print(f"\nOutput identical across runs: {'yes' if len(digests) == 1 else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
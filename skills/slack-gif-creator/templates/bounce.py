@@ -7,16 +7,21 @@ Use this to make objects bounce up and down or horizontally with realistic physi
 
 import sys
 from pathlib import Path
+from typing import Iterator
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_circle, draw_emoji
-from core.easing import ease_out_bounce, interpolate
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_circle, draw_emoji
+from core.easing import ease_out_bounce, frame_progress, interpolate
+from core.scene import Scene, render_sprite
 
 
-def create_bounce_animation(
+def iter_bounce_animation(
     object_type: str = 'circle',
     object_data: dict = None,
     num_frames: int = 30,
@@ -25,8 +30,11 @@ def create_bounce_animation(
     start_x: int = 240,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1,
+    with_rects: bool = False
+) -> Iterator[Image.Image | tuple[Image.Image, tuple[int, int, int, int]]]:
     """
     Create frames for a bouncing animation.
 
@@ -40,12 +48,15 @@ def create_bounce_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
-
-    Returns:
-        List of frames
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
+        with_rects: Yield (frame, dirty_rect) pairs for GIFBuilder.add_frames(),
+            so delta encoding skips diffing frames
+
+    Yields:
+        Frames, one at a time ((frame, dirty_rect) pairs with with_rects)
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'circle':
@@ -53,35 +64,47 @@ def create_bounce_animation(
         elif object_type == 'emoji':
             object_data = {'emoji': '⚽', 'size': 60}
 
-    for i in range(num_frames):
-        # Create blank frame
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
-
-        # Calculate progress (0.0 to 1.0)
-        t = i / (num_frames - 1) if num_frames > 1 else 0
-
-        # Calculate Y position using bounce easing
-        y = ground_y - int(ease_out_bounce(t) * bounce_height)
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
 
-        # Draw object
-        if object_type == 'circle':
-            draw_circle(
+    # The object is rasterized once; each frame only repaints where it moved
+    scene = Scene(*canvas.size, bg_color)
+    if object_type == 'circle':
+        ball = scene.add_sprite(*render_sprite(
+            lambda frame, center: draw_circle(
                 frame,
-                center=(start_x, y),
+                center=center,
                 radius=object_data['radius'],
                 fill_color=object_data['color']
-            )
-        elif object_type == 'emoji':
-            draw_emoji(
+            ),
+            object_data['radius'] + 1
+        ))
+    elif object_type == 'emoji':
+        size = object_data['size']
+        ball = scene.add_sprite(*render_sprite(
+            lambda frame, center: draw_emoji(
                 frame,
                 emoji=object_data['emoji'],
-                position=(start_x - object_data['size'] // 2, y - object_data['size'] // 2),
-                size=object_data['size']
-            )
+                position=(center[0] - size // 2, center[1] - size // 2),
+                size=size
+            ),
+            size * 2
+        ))
+    else:
+        ball = None
+
+    # Y position of every frame using bounce easing
+    heights = (ease_out_bounce(frame_progress(num_frames)) * bounce_height).astype(int)
+
+    for i in range(num_frames):
+        if ball is not None:
+            ball.position = canvas.point((start_x, ground_y - int(heights[i])))
+
+        frame = canvas.finish(scene.render())
+        yield (frame, canvas.finish_rect(scene.dirty_rect)) if with_rects else frame
 
-        frames.append(frame)
 
-    return frames
+create_bounce_animation = collect_frames(iter_bounce_animation)
 
 
 # Example usage
@@ -7,6 +7,7 @@ Creates explosion, shatter, and particle burst effects.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 import random
 
@@ -15,12 +16,14 @@ sys.path.append(str(Path(__file__).parent.parent))
 from PIL import Image, ImageDraw
 import numpy as np
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_emoji_enhanced
 from core.visual_effects import ParticleSystem
 from core.easing import interpolate
 
 
-def create_explode_animation(
+def iter_explode_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -30,8 +33,10 @@ def create_explode_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create explosion animation.
 
@@ -46,18 +51,23 @@ def create_explode_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '💣', 'size': 100}
 
-    # Generate pieces/particles
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+    center_pos = canvas.point(center_pos)
+
+    # Generate pieces/particles (velocities and sizes in pixels)
     pieces = []
     for _ in range(num_pieces):
         angle = random.uniform(0, 2 * math.pi)
@@ -73,9 +83,9 @@ def create_explode_animation(
         rotation_speed = random.uniform(-20, 20)
 
         pieces.append({
-            'vx': vx,
-            'vy': vy,
-            'size': size,
+            'vx': vx * canvas.scale_x,
+            'vy': vy * canvas.scale_y,
+            'size': size * canvas.scale,
             'color': color,
             'rotation': 0,
             'rotation_speed': rotation_speed
@@ -83,7 +93,7 @@ def create_explode_animation(
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
         draw = ImageDraw.Draw(frame)
 
         if explode_type == 'burst':
@@ -106,7 +116,7 @@ def create_explode_animation(
                 for piece in pieces:
                     # Update position
                     x = center_pos[0] + piece['vx'] * explosion_t * 50
-                    y = center_pos[1] + piece['vy'] * explosion_t * 50 + 0.5 * 300 * explosion_t ** 2  # Gravity
+                    y = center_pos[1] + piece['vy'] * explosion_t * 50 + 0.5 * 300 * canvas.scale_y * explosion_t ** 2  # Gravity
 
                     # Fade out
                     alpha = 1.0 - explosion_t
@@ -139,7 +149,7 @@ def create_explode_animation(
                 # Draw triangular shards
                 for piece in pieces[:min(10, len(pieces))]:
                     x = center_pos[0] + piece['vx'] * shatter_t * 30
-                    y = center_pos[1] + piece['vy'] * shatter_t * 30 + 0.5 * 200 * shatter_t ** 2
+                    y = center_pos[1] + piece['vy'] * shatter_t * 30 + 0.5 * 200 * canvas.scale_y * shatter_t ** 2
 
                     # Update rotation
                     rotation = piece['rotation_speed'] * shatter_t * 100
@@ -168,7 +178,7 @@ def create_explode_animation(
                     size = int(object_data['size'] * dissolve_scale)
                     size = max(12, size)
 
-                    emoji_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
+                    emoji_canvas = canvas.layer()
                     draw_emoji_enhanced(
                         emoji_canvas,
                         emoji=object_data['emoji'],
@@ -232,20 +242,23 @@ def create_explode_animation(
                         shadow=False
                     )
 
-        frames.append(frame)
+        yield canvas.finish(frame)
 
-    return frames
 
+create_explode_animation = collect_frames(iter_explode_animation)
 
-def create_particle_burst(
+
+def iter_particle_burst(
     num_frames: int = 25,
     particle_count: int = 30,
     center_pos: tuple[int, int] = (240, 240),
     colors: list[tuple[int, int, int]] | None = None,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create simple particle burst effect.
 
@@ -257,11 +270,16 @@ def create_particle_burst(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    particles = ParticleSystem()
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    center_pos = canvas.point(center_pos)
+    particles = ParticleSystem(scale=canvas.scale)
 
     # Emit particles
     if colors is None:
@@ -281,16 +299,16 @@ def create_particle_burst(
             shape='star'
         )
 
-    frames = []
     for _ in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         particles.update()
         particles.render(frame)
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_particle_burst = collect_frames(iter_particle_burst)
 
 
 # Example usage
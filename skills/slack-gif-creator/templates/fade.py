@@ -7,17 +7,20 @@ Creates smooth opacity transitions for appearing, disappearing, and transitionin
 
 import sys
 from pathlib import Path
+from typing import Iterator
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image, ImageDraw
 import numpy as np
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_emoji_enhanced
 from core.easing import interpolate
 
 
-def create_fade_animation(
+def iter_fade_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -26,8 +29,10 @@ def create_fade_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create fade animation.
 
@@ -41,17 +46,22 @@ def create_fade_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '✨', 'size': 100}
 
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+    center_pos = canvas.point(center_pos)
+
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
@@ -77,19 +87,20 @@ def create_fade_animation(
             opacity = interpolate(0, 1, t, easing)
 
         # Create background
-        frame_bg = create_blank_frame(frame_width, frame_height, bg_color)
+        frame_bg = canvas.blank(bg_color)
 
         # Create object layer with transparency
         if object_type == 'emoji':
             # Create RGBA canvas for emoji
-            emoji_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
+            emoji_canvas = canvas.layer()
             emoji_size = object_data['size']
             draw_emoji_enhanced(
                 emoji_canvas,
                 emoji=object_data['emoji'],
                 position=(center_pos[0] - emoji_size // 2, center_pos[1] - emoji_size // 2),
                 size=emoji_size,
-                shadow=object_data.get('shadow', False)
+                shadow=object_data.get('shadow', False),
+                scale=canvas.scale
             )
 
             # Apply opacity
@@ -104,18 +115,18 @@ def create_fade_animation(
             from core.typography import draw_text_with_outline
 
             # Create text on separate layer
-            text_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
+            text_canvas = canvas.layer()
             text_canvas_rgb = text_canvas.convert('RGB')
-            text_canvas_rgb.paste(bg_color, (0, 0, frame_width, frame_height))
+            text_canvas_rgb.paste(bg_color, (0, 0, *canvas.size))
 
             draw_text_with_outline(
                 text_canvas_rgb,
                 text=object_data.get('text', 'FADE'),
                 position=center_pos,
-                font_size=object_data.get('font_size', 60),
+                font_size=object_data.get('font_size', canvas.length(60)),
                 text_color=object_data.get('text_color', (0, 0, 0)),
                 outline_color=object_data.get('outline_color', (255, 255, 255)),
-                outline_width=3,
+                outline_width=canvas.length(3),
                 centered=True
             )
 
@@ -141,9 +152,10 @@ def create_fade_animation(
         else:
             frame = frame_bg
 
-        frames.append(frame)
+        yield canvas.finish(frame)
 
-    return frames
+
+create_fade_animation = collect_frames(iter_fade_animation)
 
 
 def apply_opacity(image: Image.Image, opacity: float) -> Image.Image:
@@ -172,7 +184,7 @@ def apply_opacity(image: Image.Image, opacity: float) -> Image.Image:
     return Image.merge('RGBA', (r, g, b, a))
 
 
-def create_crossfade(
+def iter_crossfade(
     object1_data: dict,
     object2_data: dict,
     num_frames: int = 30,
@@ -181,8 +193,10 @@ def create_crossfade(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Crossfade between two objects.
 
@@ -196,11 +210,17 @@ def create_crossfade(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object1_data = canvas.scale_lengths(object1_data)
+    object2_data = canvas.scale_lengths(object2_data)
+    center_pos = canvas.point(center_pos)
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -210,11 +230,11 @@ def create_crossfade(
         opacity2 = interpolate(0, 1, t, easing)
 
         # Create background
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         if object_type == 'emoji':
             # Create first emoji
-            emoji1_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
+            emoji1_canvas = canvas.layer()
             size1 = object1_data['size']
             draw_emoji_enhanced(
                 emoji1_canvas,
@@ -226,7 +246,7 @@ def create_crossfade(
             emoji1_canvas = apply_opacity(emoji1_canvas, opacity1)
 
             # Create second emoji
-            emoji2_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
+            emoji2_canvas = canvas.layer()
             size2 = object2_data['size']
             draw_emoji_enhanced(
                 emoji2_canvas,
@@ -243,19 +263,21 @@ def create_crossfade(
             frame_rgba = Image.alpha_composite(frame_rgba, emoji2_canvas)
             frame = frame_rgba.convert('RGB')
 
-        frames.append(frame)
+        yield canvas.finish(frame)
 
-    return frames
 
+create_crossfade = collect_frames(iter_crossfade)
 
-def create_fade_to_color(
+
+def iter_fade_to_color(
     start_color: tuple[int, int, int],
     end_color: tuple[int, int, int],
     num_frames: int = 20,
     easing: str = 'linear',
     frame_width: int = 480,
-    frame_height: int = 480
-) -> list[Image.Image]:
+    frame_height: int = 480,
+    render_size: int | tuple[int, int] | None = None
+) -> Iterator[Image.Image]:
     """
     Fade from one solid color to another.
 
@@ -266,11 +288,12 @@ def create_fade_to_color(
         easing: Easing function
         frame_width: Frame width
         frame_height: Frame height
+        render_size: Output size in pixels (None = frame_width x frame_height)
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size)
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -281,10 +304,10 @@ def create_fade_to_color(
         b = int(interpolate(start_color[2], end_color[2], t, easing))
 
         color = (r, g, b)
-        frame = create_blank_frame(frame_width, frame_height, color)
-        frames.append(frame)
+        yield canvas.blank(color)
+
 
-    return frames
+create_fade_to_color = collect_frames(iter_fade_to_color)
 
 
 # Example usage
@@ -7,17 +7,20 @@ Creates horizontal and vertical flips with perspective.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.emoji_atlas import paste_emoji
 from core.easing import interpolate
 
 
-def create_flip_animation(
+def iter_flip_animation(
     object1_data: dict,
     object2_data: dict | None = None,
     num_frames: int = 30,
@@ -27,8 +30,10 @@ def create_flip_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create 3D-style flip animation.
 
@@ -43,18 +48,25 @@ def create_flip_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     if object2_data is None:
         object2_data = object1_data
 
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object1_data = canvas.scale_lengths(object1_data)
+    object2_data = canvas.scale_lengths(object2_data)
+    center_pos = canvas.point(center_pos)
+    width, height = canvas.size
+
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         # Calculate rotation angle (0 to 180 degrees)
         angle = interpolate(0, 180, t, easing)
@@ -71,54 +83,27 @@ def create_flip_animation(
 
         # Don't draw when edge-on (very thin)
         if scale_factor < 0.05:
-            frames.append(frame)
+            yield canvas.finish(frame)
             continue
 
         if object_type == 'emoji':
-            size = current_object['size']
-
-            # Create emoji on canvas
-            canvas_size = size * 2
-            emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-            draw_emoji_enhanced(
-                emoji_canvas,
-                emoji=current_object['emoji'],
-                position=(canvas_size // 2 - size // 2, canvas_size // 2 - size // 2),
-                size=size,
-                shadow=False
-            )
-
-            # Apply flip scaling
+            # Squash along the flip axis to simulate 3D rotation
             if flip_axis == 'horizontal':
-                # Scale horizontally for horizontal flip
-                new_width = max(1, int(canvas_size * scale_factor))
-                new_height = canvas_size
+                stretch = (scale_factor, 1.0)
             else:
-                # Scale vertically for vertical flip
-                new_width = canvas_size
-                new_height = max(1, int(canvas_size * scale_factor))
-
-            # Resize to simulate 3D rotation
-            emoji_scaled = emoji_canvas.resize((new_width, new_height), Image.LANCZOS)
+                stretch = (1.0, scale_factor)
 
-            # Position centered
-            paste_x = center_pos[0] - new_width // 2
-            paste_y = center_pos[1] - new_height // 2
-
-            # Composite onto frame
-            frame_rgba = frame.convert('RGBA')
-            frame_rgba.paste(emoji_scaled, (paste_x, paste_y), emoji_scaled)
-            frame = frame_rgba.convert('RGB')
+            paste_emoji(frame, current_object['emoji'], center_pos, current_object['size'],
+                        scale=stretch)
 
         elif object_type == 'text':
             from core.typography import draw_text_with_outline
 
             # Create text on canvas
             text = current_object.get('text', 'FLIP')
-            font_size = current_object.get('font_size', 50)
+            font_size = current_object.get('font_size', canvas.length(50))
 
-            canvas_size = max(frame_width, frame_height)
+            canvas_size = max(width, height)
             text_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
 
             # Draw on RGB for text rendering
@@ -132,7 +117,7 @@ def create_flip_animation(
                 font_size=font_size,
                 text_color=current_object.get('text_color', (0, 0, 0)),
                 outline_color=current_object.get('outline_color', (255, 255, 255)),
-                outline_width=3,
+                outline_width=canvas.length(3),
                 centered=True
             )
 
@@ -159,37 +144,38 @@ def create_flip_animation(
 
             # Center and crop
             if flip_axis == 'horizontal':
-                left = (new_width - frame_width) // 2 if new_width > frame_width else 0
-                top = (canvas_size - frame_height) // 2
-                paste_x = center_pos[0] - min(new_width, frame_width) // 2
+                left = (new_width - width) // 2 if new_width > width else 0
+                top = (canvas_size - height) // 2
+                paste_x = center_pos[0] - min(new_width, width) // 2
                 paste_y = 0
 
                 text_cropped = text_scaled.crop((
                     left,
                     top,
-                    left + min(new_width, frame_width),
-                    top + frame_height
+                    left + min(new_width, width),
+                    top + height
                 ))
             else:
-                left = (canvas_size - frame_width) // 2
-                top = (new_height - frame_height) // 2 if new_height > frame_height else 0
+                left = (canvas_size - width) // 2
+                top = (new_height - height) // 2 if new_height > height else 0
                 paste_x = 0
-                paste_y = center_pos[1] - min(new_height, frame_height) // 2
+                paste_y = center_pos[1] - min(new_height, height) // 2
 
                 text_cropped = text_scaled.crop((
                     left,
                     top,
-                    left + frame_width,
-                    top + min(new_height, frame_height)
+                    left + width,
+                    top + min(new_height, height)
                 ))
 
             frame_rgba = frame.convert('RGBA')
             frame_rgba.paste(text_cropped, (paste_x, paste_y), text_cropped)
             frame = frame_rgba.convert('RGB')
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_flip_animation = collect_frames(iter_flip_animation)
 
 
 def create_quick_flip(
@@ -227,7 +213,9 @@ def create_quick_flip(
 def create_nope_flip(
     num_frames: int = 25,
     frame_width: int = 480,
-    frame_height: int = 480
+    frame_height: int = 480,
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
 ) -> list[Image.Image]:
     """
     Create "nope" reaction flip (like flipping table).
@@ -236,6 +224,9 @@ def create_nope_flip(
         num_frames: Number of frames
         frame_width: Frame width
         frame_height: Frame height
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
     Returns:
         List of frames
@@ -249,7 +240,9 @@ def create_nope_flip(
         object_type='text',
         frame_width=frame_width,
         frame_height=frame_height,
-        bg_color=(255, 255, 255)
+        bg_color=(255, 255, 255),
+        render_size=render_size,
+        supersample=supersample
     )
 
 
@@ -6,7 +6,9 @@ Apply kaleidoscope effects to frames or objects for psychedelic visuals.
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
@@ -14,73 +16,140 @@ sys.path.append(str(Path(__file__).parent.parent))
 from PIL import Image, ImageOps, ImageDraw
 import numpy as np
 
+from core.canvas import Canvas
+from core.frame_source import collect_frames
 
-def apply_kaleidoscope(frame: Image.Image, segments: int = 8,
-                       center: tuple[int, int] | None = None) -> Image.Image:
+
+KALEIDOSCOPE_CACHE_SIZE = 16  # Cached unrotated maps (about 6 MB each at 480x480)
+
+
+def _mirror_coordinates(width: int, height: int, segments: int,
+                        center: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
     """
-    Apply kaleidoscope effect by mirroring/rotating frame sections.
+    Source pixel of every output pixel for an unrotated kaleidoscope.
 
-    Args:
-        frame: Input frame
-        segments: Number of mirror segments (4, 6, 8, 12 work well)
-        center: Center point for effect (None = frame center)
+    Each pixel's angle around the center is folded into the first pair of
+    segments (every other segment mirrored) at the same distance.
 
     Returns:
-        Frame with kaleidoscope effect
+        (source_x, source_y) int32 arrays of shape (height, width); may be
+        out of bounds near the corners
     """
-    width, height = frame.size
+    center_x, center_y = center
+    angle_per_segment = 360 / segments
 
-    if center is None:
-        center = (width // 2, height // 2)
+    y, x = np.mgrid[0:height, 0:width]
+    dx = x - center_x
+    dy = y - center_y
 
-    # Create output frame
-    output = Image.new('RGB', (width, height))
+    angle = (np.degrees(np.arctan2(dy, dx)) + 180) % 360
+    distance = np.hypot(dx, dy)
 
-    # Calculate angle per segment
-    angle_per_segment = 360 / segments
+    # Which segment does each pixel belong to? Mirror every other one
+    segment = (angle // angle_per_segment).astype(np.int32)
+    segment_angle = angle % angle_per_segment
+    segment_angle = np.where(segment % 2 == 1, angle_per_segment - segment_angle, segment_angle)
 
-    # For simplicity, we'll create a radial mirror effect
-    # A full implementation would rotate and mirror properly
-    # This is a simplified version that creates interesting patterns
+    source_angle = np.radians(segment_angle + (segment // 2) * angle_per_segment * 2 - 180)
+    # Truncate toward zero, as int() does
+    source_x = (center_x + distance * np.cos(source_angle)).astype(np.int32)
+    source_y = (center_y + distance * np.sin(source_angle)).astype(np.int32)
+    return source_x, source_y
 
-    # Convert to numpy for easier manipulation
-    frame_array = np.array(frame)
-    output_array = np.zeros_like(frame_array)
 
-    center_x, center_y = center
+@lru_cache(maxsize=KALEIDOSCOPE_CACHE_SIZE)
+def _unrotated_map(width: int, height: int, segments: int,
+                   center: tuple[int, int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The kaleidoscope's source pixels, built once per (size, segments, center).
 
-    # Create wedge mask and mirror it
-    for y in range(height):
-        for x in range(width):
-            # Calculate angle from center
-            dx = x - center_x
-            dy = y - center_y
+    Returns:
+        (index_map, rel_x, rel_y): flat gather indices for rotation 0, and
+        each source pixel's center relative to the frame center, which
+        kaleidoscope_map() rotates per frame
+    """
+    source_x, source_y = _mirror_coordinates(width, height, segments, center)
 
-            angle = (math.degrees(math.atan2(dy, dx)) + 180) % 360
-            distance = math.sqrt(dx * dx + dy * dy)
+    # Pixels whose mirrored source falls outside the frame keep their own
+    y, x = np.mgrid[0:height, 0:width]
+    outside = (source_x < 0) | (source_x >= width) | (source_y < 0) | (source_y >= height)
+    source_x = np.where(outside, x, source_x)
+    source_y = np.where(outside, y, source_y)
 
-            # Which segment does this pixel belong to?
-            segment = int(angle / angle_per_segment)
+    index_map = source_y.astype(np.intp) * width + source_x
+    rel_x = source_x + 0.5 - width / 2
+    rel_y = source_y + 0.5 - height / 2
+    for array in (index_map, rel_x, rel_y):
+        array.setflags(write=False)
+    return index_map, rel_x, rel_y
 
-            # Mirror angle within segment
-            segment_angle = angle % angle_per_segment
-            if segment % 2 == 1:  # Mirror every other segment
-                segment_angle = angle_per_segment - segment_angle
 
-            # Calculate source position
-            source_angle = segment_angle + (segment // 2) * angle_per_segment * 2
-            source_angle_rad = math.radians(source_angle - 180)
+def kaleidoscope_map(width: int, height: int, segments: int = 8,
+                     center: tuple[int, int] | None = None,
+                     rotation: float = 0.0) -> np.ndarray:
+    """
+    Flat gather indices that turn a frame into its kaleidoscope.
 
-            source_x = int(center_x + distance * math.cos(source_angle_rad))
-            source_y = int(center_y + distance * math.sin(source_angle_rad))
+    The mirror map is computed once per (size, segments, center) and
+    cached; a rotation only turns the cached source positions, so every
+    frame of a rotating animation reuses it. Applying the result is a
+    single fancy-indexing gather: np.append(pixels, black, axis=0)[index_map],
+    where pixels is the frame reshaped to (height * width, channels).
+    Index height * width selects the appended black pixel.
 
-            # Bounds check
-            if 0 <= source_x < width and 0 <= source_y < height:
-                output_array[y, x] = frame_array[source_y, source_x]
-            else:
-                output_array[y, x] = frame_array[y, x]
+    Args:
+        width: Frame width
+        height: Frame height
+        segments: Number of mirror segments
+        center: Center point for effect (None = frame center)
+        rotation: Degrees to rotate the source counterclockwise about the
+            frame center first (same direction as Image.rotate)
 
-    return Image.fromarray(output_array)
+    Returns:
+        (height, width) intp array of indices into the flattened frame
+        (read-only)
+    """
+    if center is None:
+        center = (width // 2, height // 2)
+    index_map, rel_x, rel_y = _unrotated_map(width, height, segments, tuple(center))
+    if not rotation % 360:
+        return index_map
+
+    # Sample the unrotated frame where Image.rotate would (nearest neighbour)
+    theta = math.radians(rotation)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    source_x = np.floor(cos_t * rel_x - sin_t * rel_y + width / 2).astype(np.intp)
+    source_y = np.floor(sin_t * rel_x + cos_t * rel_y + height / 2).astype(np.intp)
+    inside = (source_x >= 0) & (source_x < width) & (source_y >= 0) & (source_y < height)
+    return np.where(inside, source_y * width + source_x, width * height)
+
+
+def apply_kaleidoscope(frame: Image.Image, segments: int = 8,
+                       center: tuple[int, int] | None = None,
+                       rotation: float = 0.0) -> Image.Image:
+    """
+    Apply kaleidoscope effect by mirroring/rotating frame sections.
+
+    Args:
+        frame: Input frame
+        segments: Number of mirror segments (4, 6, 8, 12 work well)
+        center: Center point for effect (None = frame center)
+        rotation: Rotate the frame by this many degrees counterclockwise
+            first, folded into the same lookup (areas rotated in from
+            outside the frame are black)
+
+    Returns:
+        Frame with kaleidoscope effect
+    """
+    width, height = frame.size
+    frame_array = np.asarray(frame)
+    index_map = kaleidoscope_map(width, height, segments,
+                                 None if center is None else tuple(center), rotation)
+
+    channels = frame_array.shape[2:]
+    pixels = frame_array.reshape((width * height,) + channels)
+    pixels = np.concatenate([pixels, np.zeros((1,) + channels, dtype=pixels.dtype)])
+    return Image.fromarray(pixels[index_map], mode=frame.mode)
 
 
 def apply_simple_mirror(frame: Image.Image, mode: str = 'quad') -> Image.Image:
@@ -137,14 +206,16 @@ def apply_simple_mirror(frame: Image.Image, mode: str = 'quad') -> Image.Image:
         return frame
 
 
-def create_kaleidoscope_animation(
+def iter_kaleidoscope_animation(
     base_frame: Image.Image | None = None,
     num_frames: int = 30,
     segments: int = 8,
     rotation_speed: float = 1.0,
     width: int = 480,
-    height: int = 480
-) -> list[Image.Image]:
+    height: int = 480,
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create animated kaleidoscope effect.
 
@@ -155,15 +226,20 @@ def create_kaleidoscope_animation(
         rotation_speed: How fast pattern rotates (0.5-2.0)
         width: Frame width if generating demo
         height: Frame height if generating demo
+        render_size: Output size in pixels (None = the base frame's or
+            width x height); the base frame is resized to it once
+        supersample: Mirror at this multiple of render_size to smooth edges
 
-    Returns:
-        List of frames with kaleidoscope effect
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    if base_frame is not None:
+        width, height = base_frame.size
+    canvas = Canvas(width, height, render_size, supersample)
 
     # Create demo pattern if no base frame
     if base_frame is None:
-        base_frame = Image.new('RGB', (width, height), (255, 255, 255))
+        base_frame = canvas.blank()
         draw = ImageDraw.Draw(base_frame)
 
         # Draw some colored shapes
@@ -175,21 +251,23 @@ def create_kaleidoscope_animation(
         for i, color in enumerate(colors):
             x = width // 2 + int(100 * math.cos(i * 2 * math.pi / 3))
             y = height // 2 + int(100 * math.sin(i * 2 * math.pi / 3))
-            draw.ellipse([x - 40, y - 40, x + 40, y + 40], fill=color)
+            x, y = canvas.point((x, y))
+            radius = canvas.length(40)
+            draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=color)
+    elif base_frame.size != canvas.size:
+        base_frame = base_frame.resize(canvas.size, Image.Resampling.LANCZOS)
 
     # Rotate base frame and apply kaleidoscope
     for i in range(num_frames):
         angle = (i / num_frames) * 360 * rotation_speed
 
-        # Rotate base frame
-        rotated = base_frame.rotate(angle, resample=Image.BICUBIC)
+        # Rotate and mirror in one cached lookup
+        kaleido_frame = apply_kaleidoscope(base_frame, segments=segments, rotation=angle)
 
-        # Apply kaleidoscope
-        kaleido_frame = apply_kaleidoscope(rotated, segments=segments)
+        yield canvas.finish(kaleido_frame)
 
-        frames.append(kaleido_frame)
 
-    return frames
+create_kaleidoscope_animation = collect_frames(iter_kaleidoscope_animation)
 
 
 # Example usage
@@ -7,17 +7,21 @@ Creates smooth transitions and transformations.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 import numpy as np
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced, draw_circle
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_circle
+from core.emoji_atlas import get_atlas, paste_emoji
 from core.easing import interpolate
 
 
-def create_morph_animation(
+def iter_morph_animation(
     object1_data: dict,
     object2_data: dict,
     num_frames: int = 30,
@@ -27,8 +31,10 @@ def create_morph_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create morphing animation between two objects.
 
@@ -43,15 +49,21 @@ def create_morph_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object1_data = canvas.scale_lengths(object1_data)
+    object2_data = canvas.scale_lengths(object2_data)
+    center_pos = canvas.point(center_pos)
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         if morph_type == 'crossfade':
             # Simple crossfade between two objects
@@ -59,39 +71,13 @@ def create_morph_animation(
             opacity2 = interpolate(0, 1, t, easing)
 
             if object_type == 'emoji':
-                # Create first emoji
-                emoji1_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-                size1 = object1_data['size']
-                draw_emoji_enhanced(
-                    emoji1_canvas,
-                    emoji=object1_data['emoji'],
-                    position=(center_pos[0] - size1 // 2, center_pos[1] - size1 // 2),
-                    size=size1,
-                    shadow=False
-                )
-
-                # Apply opacity
                 from templates.fade import apply_opacity
-                emoji1_canvas = apply_opacity(emoji1_canvas, opacity1)
-
-                # Create second emoji
-                emoji2_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-                size2 = object2_data['size']
-                draw_emoji_enhanced(
-                    emoji2_canvas,
-                    emoji=object2_data['emoji'],
-                    position=(center_pos[0] - size2 // 2, center_pos[1] - size2 // 2),
-                    size=size2,
-                    shadow=False
-                )
-
-                emoji2_canvas = apply_opacity(emoji2_canvas, opacity2)
 
-                # Composite both
-                frame_rgba = frame.convert('RGBA')
-                frame_rgba = Image.alpha_composite(frame_rgba, emoji1_canvas)
-                frame_rgba = Image.alpha_composite(frame_rgba, emoji2_canvas)
-                frame = frame_rgba.convert('RGB')
+                # Fade both cached sprites and composite them in order
+                for data, opacity in ((object1_data, opacity1), (object2_data, opacity2)):
+                    sprite, (offset_x, offset_y) = get_atlas().sprite(data['emoji'], data['size'])
+                    sprite = apply_opacity(sprite, opacity)
+                    frame.paste(sprite, (center_pos[0] + offset_x, center_pos[1] + offset_y), sprite)
 
             elif object_type == 'circle':
                 # Morph between two circles
@@ -119,35 +105,13 @@ def create_morph_animation(
                 if scale1 > 0.05:
                     size1 = int(object1_data['size'] * scale1)
                     size1 = max(12, size1)
-                    emoji1_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-                    draw_emoji_enhanced(
-                        emoji1_canvas,
-                        emoji=object1_data['emoji'],
-                        position=(center_pos[0] - size1 // 2, center_pos[1] - size1 // 2),
-                        size=size1,
-                        shadow=False
-                    )
-
-                    frame_rgba = frame.convert('RGBA')
-                    frame = Image.alpha_composite(frame_rgba, emoji1_canvas)
-                    frame = frame.convert('RGB')
+                    paste_emoji(frame, object1_data['emoji'], center_pos, size1)
 
                 # Draw second emoji (growing)
                 if scale2 > 0.05:
                     size2 = int(object2_data['size'] * scale2)
                     size2 = max(12, size2)
-                    emoji2_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-                    draw_emoji_enhanced(
-                        emoji2_canvas,
-                        emoji=object2_data['emoji'],
-                        position=(center_pos[0] - size2 // 2, center_pos[1] - size2 // 2),
-                        size=size2,
-                        shadow=False
-                    )
-
-                    frame_rgba = frame.convert('RGBA')
-                    frame = Image.alpha_composite(frame_rgba, emoji2_canvas)
-                    frame = frame.convert('RGB')
+                    paste_emoji(frame, object2_data['emoji'], center_pos, size2)
 
         elif morph_type == 'spin_morph':
             # Spin while morphing (flip-like)
@@ -165,36 +129,18 @@ def create_morph_animation(
 
             # Skip when edge-on
             if scale_factor < 0.05:
-                frames.append(frame)
+                yield canvas.finish(frame)
                 continue
 
             if object_type == 'emoji':
-                size = current_object['size']
-                canvas_size = size * 2
-                emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-                draw_emoji_enhanced(
-                    emoji_canvas,
-                    emoji=current_object['emoji'],
-                    position=(canvas_size // 2 - size // 2, canvas_size // 2 - size // 2),
-                    size=size,
-                    shadow=False
-                )
-
                 # Scale horizontally for spin effect
-                new_width = max(1, int(canvas_size * scale_factor))
-                emoji_scaled = emoji_canvas.resize((new_width, canvas_size), Image.LANCZOS)
+                paste_emoji(frame, current_object['emoji'], center_pos, current_object['size'],
+                            scale=(scale_factor, 1.0))
 
-                paste_x = center_pos[0] - new_width // 2
-                paste_y = center_pos[1] - canvas_size // 2
+        yield canvas.finish(frame)
 
-                frame_rgba = frame.convert('RGBA')
-                frame_rgba.paste(emoji_scaled, (paste_x, paste_y), emoji_scaled)
-                frame = frame_rgba.convert('RGB')
 
-        frames.append(frame)
-
-    return frames
+create_morph_animation = collect_frames(iter_morph_animation)
 
 
 def create_reaction_morph(
@@ -229,14 +175,16 @@ def create_reaction_morph(
     )
 
 
-def create_shape_morph(
+def iter_shape_morph(
     shapes: list[dict],
     num_frames: int = 60,
     frames_per_shape: int = 20,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Morph through a sequence of shapes.
 
@@ -247,12 +195,16 @@ def create_shape_morph(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-    center = (frame_width // 2, frame_height // 2)
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    shapes = [canvas.scale_lengths(shape) for shape in shapes]
+    center = canvas.point((frame_width // 2, frame_height // 2))
 
     for i in range(num_frames):
         # Determine which shapes we're morphing between
@@ -274,12 +226,13 @@ def create_shape_morph(
         )
 
         # Draw frame
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
         draw_circle(frame, center, radius, fill_color=color)
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_shape_morph = collect_frames(iter_shape_morph)
 
 
 # Example usage
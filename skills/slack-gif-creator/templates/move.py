@@ -7,16 +7,24 @@ Provides flexible movement primitives for objects along linear, arc, or custom p
 
 import sys
 from pathlib import Path
+from typing import Iterable, Iterator
 import math
 
+import numpy as np
+
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_circle, draw_emoji_enhanced
-from core.easing import interpolate, calculate_arc_motion
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_circle, draw_emoji_enhanced
+from core.easing import interpolate, calculate_arc_motion, frame_progress
+from core.scene import Scene, render_sprite
+from core.temporal_effects import iter_ring_trail
 
 
-def create_move_animation(
+def iter_move_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     start_pos: tuple[int, int] = (50, 240),
@@ -27,8 +35,11 @@ def create_move_animation(
     motion_params: dict | None = None,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1,
+    with_rects: bool = False
+) -> Iterator[Image.Image | tuple[Image.Image, tuple[int, int, int, int]]]:
     """
     Create frames showing object moving along a path.
 
@@ -44,12 +55,15 @@ def create_move_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
-
-    Returns:
-        List of frames
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
+        with_rects: Yield (frame, dirty_rect) pairs for GIFBuilder.add_frames(),
+            so delta encoding skips diffing frames
+
+    Yields:
+        Frames, one at a time ((frame, dirty_rect) pairs with with_rects)
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'circle':
@@ -61,100 +75,117 @@ def create_move_animation(
     if motion_params is None:
         motion_params = {}
 
-    for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
-
-        t = i / (num_frames - 1) if num_frames > 1 else 0
-
-        # Calculate position based on motion type
-        if motion_type == 'linear':
-            # Straight line with easing
-            x = interpolate(start_pos[0], end_pos[0], t, easing)
-            y = interpolate(start_pos[1], end_pos[1], t, easing)
-
-        elif motion_type == 'arc':
-            # Parabolic arc
-            arc_height = motion_params.get('arc_height', 100)
-            x, y = calculate_arc_motion(start_pos, end_pos, arc_height, t)
-
-        elif motion_type == 'circle':
-            # Circular motion around a center
-            center = motion_params.get('center', (frame_width // 2, frame_height // 2))
-            radius = motion_params.get('radius', 150)
-            start_angle = motion_params.get('start_angle', 0)
-            angle_range = motion_params.get('angle_range', 360)  # Full circle
-
-            angle = start_angle + (angle_range * t)
-            angle_rad = math.radians(angle)
-
-            x = center[0] + radius * math.cos(angle_rad)
-            y = center[1] + radius * math.sin(angle_rad)
-
-        elif motion_type == 'wave':
-            # Move in straight line but add wave motion
-            wave_amplitude = motion_params.get('wave_amplitude', 50)
-            wave_frequency = motion_params.get('wave_frequency', 2)
-
-            # Base linear motion
-            base_x = interpolate(start_pos[0], end_pos[0], t, easing)
-            base_y = interpolate(start_pos[1], end_pos[1], t, easing)
-
-            # Add wave offset perpendicular to motion direction
-            dx = end_pos[0] - start_pos[0]
-            dy = end_pos[1] - start_pos[1]
-            length = math.sqrt(dx * dx + dy * dy)
-
-            if length > 0:
-                # Perpendicular direction
-                perp_x = -dy / length
-                perp_y = dx / length
-
-                # Wave offset
-                wave_offset = math.sin(t * wave_frequency * 2 * math.pi) * wave_amplitude
-
-                x = base_x + perp_x * wave_offset
-                y = base_y + perp_y * wave_offset
-            else:
-                x, y = base_x, base_y
-
-        elif motion_type == 'bezier':
-            # Quadratic bezier curve
-            control_point = motion_params.get('control_point', (
-                (start_pos[0] + end_pos[0]) // 2,
-                (start_pos[1] + end_pos[1]) // 2 - 100
-            ))
-
-            # Quadratic Bezier formula: B(t) = (1-t)²P0 + 2(1-t)tP1 + t²P2
-            x = (1 - t) ** 2 * start_pos[0] + 2 * (1 - t) * t * control_point[0] + t ** 2 * end_pos[0]
-            y = (1 - t) ** 2 * start_pos[1] + 2 * (1 - t) * t * control_point[1] + t ** 2 * end_pos[1]
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
 
-        else:
-            # Default to linear
-            x = interpolate(start_pos[0], end_pos[0], t, easing)
-            y = interpolate(start_pos[1], end_pos[1], t, easing)
-
-        # Draw object at calculated position
-        x, y = int(x), int(y)
-
-        if object_type == 'circle':
-            draw_circle(
+    # The object is rasterized once; each frame only repaints where it moved
+    scene = Scene(*canvas.size, bg_color)
+    if object_type == 'circle':
+        sprite = scene.add_sprite(*render_sprite(
+            lambda frame, center: draw_circle(
                 frame,
-                center=(x, y),
+                center=center,
                 radius=object_data['radius'],
                 fill_color=object_data['color']
-            )
-        elif object_type == 'emoji':
-            draw_emoji_enhanced(
+            ),
+            object_data['radius'] + 1
+        ))
+    elif object_type == 'emoji':
+        size = object_data['size']
+        sprite = scene.add_sprite(*render_sprite(
+            lambda frame, center: draw_emoji_enhanced(
                 frame,
                 emoji=object_data['emoji'],
-                position=(x - object_data['size'] // 2, y - object_data['size'] // 2),
-                size=object_data['size'],
-                shadow=object_data.get('shadow', True)
-            )
+                position=(center[0] - size // 2, center[1] - size // 2),
+                size=size,
+                shadow=object_data.get('shadow', True),
+                scale=canvas.scale
+            ),
+            size * 2
+        ))
+    else:
+        sprite = None
+
+    # Positions for every frame at once (t is the progress of each frame)
+    t = frame_progress(num_frames)
+
+    # Calculate position based on motion type
+    if motion_type == 'linear':
+        # Straight line with easing
+        x = interpolate(start_pos[0], end_pos[0], t, easing)
+        y = interpolate(start_pos[1], end_pos[1], t, easing)
+
+    elif motion_type == 'arc':
+        # Parabolic arc
+        arc_height = motion_params.get('arc_height', 100)
+        x, y = calculate_arc_motion(start_pos, end_pos, arc_height, t)
+
+    elif motion_type == 'circle':
+        # Circular motion around a center
+        center = motion_params.get('center', (frame_width // 2, frame_height // 2))
+        radius = motion_params.get('radius', 150)
+        start_angle = motion_params.get('start_angle', 0)
+        angle_range = motion_params.get('angle_range', 360)  # Full circle
+
+        angle = start_angle + (angle_range * t)
+        angle_rad = np.radians(angle)
+
+        x = center[0] + radius * np.cos(angle_rad)
+        y = center[1] + radius * np.sin(angle_rad)
+
+    elif motion_type == 'wave':
+        # Move in straight line but add wave motion
+        wave_amplitude = motion_params.get('wave_amplitude', 50)
+        wave_frequency = motion_params.get('wave_frequency', 2)
+
+        # Base linear motion
+        base_x = interpolate(start_pos[0], end_pos[0], t, easing)
+        base_y = interpolate(start_pos[1], end_pos[1], t, easing)
+
+        # Add wave offset perpendicular to motion direction
+        dx = end_pos[0] - start_pos[0]
+        dy = end_pos[1] - start_pos[1]
+        length = math.sqrt(dx * dx + dy * dy)
+
+        if length > 0:
+            # Perpendicular direction
+            perp_x = -dy / length
+            perp_y = dx / length
+
+            # Wave offset
+            wave_offset = np.sin(t * wave_frequency * 2 * np.pi) * wave_amplitude
+
+            x = base_x + perp_x * wave_offset
+            y = base_y + perp_y * wave_offset
+        else:
+            x, y = base_x, base_y
+
+    elif motion_type == 'bezier':
+        # Quadratic bezier curve
+        control_point = motion_params.get('control_point', (
+            (start_pos[0] + end_pos[0]) // 2,
+            (start_pos[1] + end_pos[1]) // 2 - 100
+        ))
 
-        frames.append(frame)
+        # Quadratic Bezier formula: B(t) = (1-t)²P0 + 2(1-t)tP1 + t²P2
+        x = (1 - t) ** 2 * start_pos[0] + 2 * (1 - t) * t * control_point[0] + t ** 2 * end_pos[0]
+        y = (1 - t) ** 2 * start_pos[1] + 2 * (1 - t) * t * control_point[1] + t ** 2 * end_pos[1]
 
-    return frames
+    else:
+        # Default to linear
+        x = interpolate(start_pos[0], end_pos[0], t, easing)
+        y = interpolate(start_pos[1], end_pos[1], t, easing)
+
+    for i in range(num_frames):
+        # Place object at calculated position
+        if sprite is not None:
+            sprite.position = canvas.point((int(x[i]), int(y[i])))
+
+        frame = canvas.finish(scene.render())
+        yield (frame, canvas.finish_rect(scene.dirty_rect)) if with_rects else frame
+
+
+create_move_animation = collect_frames(iter_move_animation)
 
 
 def create_path_from_points(points: list[tuple[int, int]],
@@ -196,6 +227,29 @@ def create_path_from_points(points: list[tuple[int, int]],
     return path
 
 
+def iter_trail_effect(frames: Iterable[Image.Image], trail_length: int = 5,
+                      fade_alpha: float = 0.3) -> Iterator[Image.Image]:
+    """
+    Add motion trail effect to moving object, as a streaming stage.
+
+    Only the last trail_length input frames are kept, so this can wrap any
+    frame generator (e.g. iter_move_animation()) without buffering it. The
+    frame j steps back is blended over the result at opacity fade_alpha ** j,
+    newest first.
+
+    Args:
+        frames: Frames with moving object (any iterable)
+        trail_length: Number of previous frames to blend
+        fade_alpha: Opacity of trail frames
+
+    Yields:
+        Frames with trail effect, one at a time
+    """
+    # Blends run on a uint8 ring of the last trail_length frames in reused
+    # float32 buffers, with no image round-trip per blend
+    return iter_ring_trail(frames, trail_length, decay=fade_alpha, weights='chained')
+
+
 def apply_trail_effect(frames: list, trail_length: int = 5,
                       fade_alpha: float = 0.3) -> list:
     """
@@ -209,32 +263,7 @@ def apply_trail_effect(frames: list, trail_length: int = 5,
     Returns:
         List of frames with trail effect
     """
-    from PIL import Image, ImageChops
-    import numpy as np
-
-    trailed_frames = []
-
-    for i, frame in enumerate(frames):
-        # Start with current frame
-        result = frame.copy()
-
-        # Blend previous frames
-        for j in range(1, min(trail_length + 1, i + 1)):
-            prev_frame = frames[i - j]
-
-            # Calculate fade
-            alpha = fade_alpha ** j
-
-            # Blend
-            result_array = np.array(result, dtype=np.float32)
-            prev_array = np.array(prev_frame, dtype=np.float32)
-
-            blended = result_array * (1 - alpha) + prev_array * alpha
-            result = Image.fromarray(blended.astype(np.uint8))
-
-        trailed_frames.append(result)
-
-    return trailed_frames
+    return list(iter_trail_effect(frames, trail_length, fade_alpha))
 
 
 # Example usage
@@ -7,17 +7,20 @@ Creates pulsing, heartbeat, and throbbing effects.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced, draw_circle
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_emoji_enhanced, draw_circle
 from core.easing import interpolate
 
 
-def create_pulse_animation(
+def iter_pulse_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -27,8 +30,10 @@ def create_pulse_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create pulsing/scaling animation.
 
@@ -43,12 +48,13 @@ def create_pulse_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -57,9 +63,12 @@ def create_pulse_animation(
             object_data = {'radius': 50, 'color': (255, 100, 100)}
 
     min_scale, max_scale = scale_range
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+    center_pos = canvas.point(center_pos)
 
     for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
         # Calculate scale based on pulse type
@@ -120,7 +129,8 @@ def create_pulse_animation(
                 emoji=object_data['emoji'],
                 position=(center_pos[0] - current_size // 2, center_pos[1] - current_size // 2),
                 size=current_size,
-                shadow=object_data.get('shadow', True)
+                shadow=object_data.get('shadow', True),
+                scale=canvas.scale
             )
 
         elif object_type == 'circle':
@@ -135,7 +145,7 @@ def create_pulse_animation(
 
         elif object_type == 'text':
             from core.typography import draw_text_with_outline
-            base_size = object_data.get('font_size', 50)
+            base_size = object_data.get('font_size', canvas.length(50))
             current_size = int(base_size * scale)
             draw_text_with_outline(
                 frame,
@@ -144,13 +154,14 @@ def create_pulse_animation(
                 font_size=current_size,
                 text_color=object_data.get('text_color', (255, 100, 100)),
                 outline_color=object_data.get('outline_color', (0, 0, 0)),
-                outline_width=3,
+                outline_width=canvas.length(3),
                 centered=True
             )
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_pulse_animation = collect_frames(iter_pulse_animation)
 
 
 def create_attention_pulse(
@@ -193,7 +204,9 @@ def create_breathing_animation(
     scale_range: tuple[float, float] = (0.9, 1.1),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (240, 248, 255)
+    bg_color: tuple[int, int, int] = (240, 248, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
 ) -> list[Image.Image]:
     """
     Create slow, calming breathing animation (in and out).
@@ -207,6 +220,9 @@ def create_breathing_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
     Returns:
         List of frames
@@ -224,7 +240,9 @@ def create_breathing_animation(
         center_pos=(frame_width // 2, frame_height // 2),
         frame_width=frame_width,
         frame_height=frame_height,
-        bg_color=bg_color
+        bg_color=bg_color,
+        render_size=render_size,
+        supersample=supersample
     )
 
 
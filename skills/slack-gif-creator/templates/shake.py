@@ -8,15 +8,19 @@ Use this for impact effects, emphasis, or nervous/excited reactions.
 import sys
 import math
 from pathlib import Path
+from typing import Iterator
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_circle, draw_emoji, draw_text
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_circle, draw_emoji, draw_text
 from core.easing import ease_out_quad
 
 
-def create_shake_animation(
+def iter_shake_animation(
     object_type: str = 'emoji',
     object_data: dict = None,
     num_frames: int = 20,
@@ -26,8 +30,10 @@ def create_shake_animation(
     direction: str = 'horizontal',  # 'horizontal', 'vertical', or 'both'
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create frames for a shaking animation.
 
@@ -42,12 +48,13 @@ def create_shake_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -55,8 +62,11 @@ def create_shake_animation(
         elif object_type == 'text':
             object_data = {'text': 'SHAKE!', 'font_size': 50, 'color': (255, 0, 0)}
 
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+
     for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         # Calculate progress
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -76,8 +86,7 @@ def create_shake_animation(
             offset_y = int(math.cos(t * freq * 2 * math.pi) * intensity)
 
         # Apply offset
-        x = center_x + offset_x
-        y = center_y + offset_y
+        x, y = canvas.point((center_x + offset_x, center_y + offset_y))
 
         # Draw object
         if object_type == 'emoji':
@@ -100,13 +109,14 @@ def create_shake_animation(
             draw_circle(
                 frame,
                 center=(x, y),
-                radius=object_data.get('radius', 30),
+                radius=object_data.get('radius', canvas.length(30)),
                 fill_color=object_data.get('color', (100, 100, 255))
             )
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_shake_animation = collect_frames(iter_shake_animation)
 
 
 # Example usage
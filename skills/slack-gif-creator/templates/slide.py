@@ -7,16 +7,21 @@ Creates smooth entrance and exit animations.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
-from core.easing import interpolate
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_emoji_enhanced
+from core.easing import frame_progress, interpolate
+from core.scene import Scene, render_sprite
+from core.typography import render_text_sprite
 
 
-def create_slide_animation(
+def iter_slide_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -27,8 +32,11 @@ def create_slide_animation(
     final_pos: tuple[int, int] | None = None,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1,
+    with_rects: bool = False
+) -> Iterator[Image.Image | tuple[Image.Image, tuple[int, int, int, int]]]:
     """
     Create slide animation.
 
@@ -44,12 +52,15 @@ def create_slide_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
-
-    Returns:
-        List of frames
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
+        with_rects: Yield (frame, dirty_rect) pairs for GIFBuilder.add_frames(),
+            so delta encoding skips diffing frames
+
+    Yields:
+        Frames, one at a time ((frame, dirty_rect) pairs with with_rects)
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -100,51 +111,58 @@ def create_slide_animation(
     if overshoot and slide_type == 'in':
         easing = 'back_out'
 
+    # Positions above are in frame units; the sprite is rasterized in pixels
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+
+    # The object is rasterized once; each frame only repaints where it moved
+    scene = Scene(*canvas.size, bg_color)
+    if object_type == 'emoji':
+        sprite = scene.add_sprite(*_emoji_sprite(object_data, object_data.get('shadow', True),
+                                                   canvas.scale))
+
+    elif object_type == 'text':
+        # Same sprite as draw_text_with_outline(..., centered=True)
+        image, (offset_x, offset_y), (text_width, text_height) = render_text_sprite(
+            object_data.get('text', 'SLIDE'),
+            object_data.get('font_size', canvas.length(50)),
+            tuple(object_data.get('text_color', (0, 0, 0))),
+            'outline',
+            tuple(object_data.get('outline_color', (255, 255, 255))),
+            canvas.length(3)
+        )
+        sprite = scene.add_sprite(image, (offset_x - text_width // 2, offset_y - text_height // 2))
+
+    else:
+        sprite = None
+
+    # Position of every frame
+    t = frame_progress(num_frames)
+    xs = interpolate(start_pos[0], end_pos[0], t, easing)
+    ys = interpolate(start_pos[1], end_pos[1], t, easing)
+
     for i in range(num_frames):
-        t = i / (num_frames - 1) if num_frames > 1 else 0
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        if sprite is not None:
+            sprite.position = canvas.point((int(xs[i]), int(ys[i])))
 
-        # Calculate current position
-        x = int(interpolate(start_pos[0], end_pos[0], t, easing))
-        y = int(interpolate(start_pos[1], end_pos[1], t, easing))
+        frame = canvas.finish(scene.render())
+        yield (frame, canvas.finish_rect(scene.dirty_rect)) if with_rects else frame
 
-        # Draw object
-        if object_type == 'emoji':
-            size = object_data['size']
-            draw_emoji_enhanced(
-                frame,
-                emoji=object_data['emoji'],
-                position=(x - size // 2, y - size // 2),
-                size=size,
-                shadow=object_data.get('shadow', True)
-            )
-
-        elif object_type == 'text':
-            from core.typography import draw_text_with_outline
-            draw_text_with_outline(
-                frame,
-                text=object_data.get('text', 'SLIDE'),
-                position=(x, y),
-                font_size=object_data.get('font_size', 50),
-                text_color=object_data.get('text_color', (0, 0, 0)),
-                outline_color=object_data.get('outline_color', (255, 255, 255)),
-                outline_width=3,
-                centered=True
-            )
-
-        frames.append(frame)
-
-    return frames
-
-
-def create_multi_slide(
+
+create_slide_animation = collect_frames(iter_slide_animation)
+
+
+def iter_multi_slide(
     objects: list[dict],
     num_frames: int = 30,
     stagger_delay: int = 3,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1,
+    with_rects: bool = False
+) -> Iterator[Image.Image | tuple[Image.Image, tuple[int, int, int, int]]]:
     """
     Create animation with multiple objects sliding in sequence.
 
@@ -155,16 +173,32 @@ def create_multi_slide(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
-
-    Returns:
-        List of frames
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
+        with_rects: Yield (frame, dirty_rect) pairs for GIFBuilder.add_frames(),
+            so delta encoding skips diffing frames
+
+    Yields:
+        Frames, one at a time ((frame, dirty_rect) pairs with with_rects)
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    scene = Scene(*canvas.size, bg_color)
+    sprites = []
+    for obj in objects:
+        obj_data = canvas.scale_lengths(obj.get('data', {'emoji': '➡️', 'size': 80}))
+        if obj.get('type', 'emoji') == 'emoji':
+            sprites.append(scene.add_sprite(*_emoji_sprite(obj_data, shadow=False)))
+        else:
+            sprites.append(None)
 
     for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
-
         for idx, obj in enumerate(objects):
+            sprite = sprites[idx]
+            if sprite is None:
+                continue
+            sprite.visible = False
+
             # Calculate when this object starts moving
             start_frame = idx * stagger_delay
             if i < start_frame:
@@ -179,7 +213,6 @@ def create_multi_slide(
             t = obj_frame / obj_duration
 
             # Get object properties
-            obj_type = obj.get('type', 'emoji')
             obj_data = obj.get('data', {'emoji': '➡️', 'size': 80})
             direction = obj.get('direction', 'left')
             final_pos = obj.get('final_pos', (frame_width // 2, frame_height // 2))
@@ -216,19 +249,32 @@ def create_multi_slide(
             else:
                 y = int(interpolate(start_y, end_y, t, easing))
 
-            # Draw object
-            if obj_type == 'emoji':
-                draw_emoji_enhanced(
-                    frame,
-                    emoji=obj_data['emoji'],
-                    position=(x - size // 2, y - size // 2),
-                    size=size,
-                    shadow=False
-                )
+            # Place object
+            sprite.position = canvas.point((x, y))
+            sprite.visible = True
 
-        frames.append(frame)
+        frame = canvas.finish(scene.render())
+        yield (frame, canvas.finish_rect(scene.dirty_rect)) if with_rects else frame
 
-    return frames
+
+create_multi_slide = collect_frames(iter_multi_slide)
+
+
+def _emoji_sprite(object_data: dict, shadow: bool,
+                  scale: float = 1.0) -> tuple[Image.Image, tuple[int, int]]:
+    """Rasterize an emoji object once, as draw_emoji_enhanced() would draw it."""
+    size = object_data['size']
+    return render_sprite(
+        lambda frame, center: draw_emoji_enhanced(
+            frame,
+            emoji=object_data['emoji'],
+            position=(center[0] - size // 2, center[1] - size // 2),
+            size=size,
+            shadow=shadow,
+            scale=scale
+        ),
+        size * 2
+    )
 
 
 # Example usage
@@ -7,17 +7,21 @@ Creates spinning, rotating, and wobbling effects.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced, draw_circle
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_circle
+from core.emoji_atlas import paste_emoji
 from core.easing import interpolate
 
 
-def create_spin_animation(
+def iter_spin_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -27,8 +31,10 @@ def create_spin_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create spinning/rotating animation.
 
@@ -43,19 +49,24 @@ def create_spin_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '🔄', 'size': 100}
 
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+    center_pos = canvas.point(center_pos)
+
     for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
         # Calculate rotation angle
@@ -74,36 +85,16 @@ def create_spin_animation(
 
         # Create object on transparent background to rotate
         if object_type == 'emoji':
-            # For emoji, we need to create a larger canvas to avoid clipping during rotation
-            emoji_size = object_data['size']
-            canvas_size = int(emoji_size * 1.5)
-            emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-            # Draw emoji in center of canvas
-            from core.frame_composer import draw_emoji_enhanced
-            draw_emoji_enhanced(
-                emoji_canvas,
-                emoji=object_data['emoji'],
-                position=(canvas_size // 2 - emoji_size // 2, canvas_size // 2 - emoji_size // 2),
-                size=emoji_size,
-                shadow=False
-            )
-
-            # Rotate the canvas
-            rotated = emoji_canvas.rotate(angle, resample=Image.BICUBIC, expand=False)
-
-            # Paste onto frame
-            paste_x = center_pos[0] - canvas_size // 2
-            paste_y = center_pos[1] - canvas_size // 2
-            frame.paste(rotated, (paste_x, paste_y), rotated)
+            # Rotated sprites come from the atlas, so spin loops reuse them
+            paste_emoji(frame, object_data['emoji'], center_pos, object_data['size'], angle=angle)
 
         elif object_type == 'text':
             from core.typography import draw_text_with_outline
             # Similar approach - create canvas, draw text, rotate
             text = object_data.get('text', 'SPIN!')
-            font_size = object_data.get('font_size', 50)
+            font_size = object_data.get('font_size', canvas.length(50))
 
-            canvas_size = max(frame_width, frame_height)
+            canvas_size = max(canvas.size)
             text_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
 
             # Draw text
@@ -116,7 +107,7 @@ def create_spin_animation(
                 font_size=font_size,
                 text_color=object_data.get('text_color', (0, 0, 0)),
                 outline_color=object_data.get('outline_color', (255, 255, 255)),
-                outline_width=3,
+                outline_width=canvas.length(3),
                 centered=True
             )
 
@@ -141,20 +132,23 @@ def create_spin_animation(
             frame_rgba = Image.alpha_composite(frame_rgba, rotated)
             frame = frame_rgba.convert('RGB')
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_spin_animation = collect_frames(iter_spin_animation)
 
 
-def create_loading_spinner(
+def iter_loading_spinner(
     num_frames: int = 20,
     spinner_type: str = 'dots',  # 'dots', 'arc', 'emoji'
     size: int = 100,
     color: tuple[int, int, int] = (100, 150, 255),
     frame_width: int = 128,
     frame_height: int = 128,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create a loading spinner animation.
 
@@ -166,16 +160,20 @@ def create_loading_spinner(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
     from PIL import ImageDraw
-    frames = []
-    center = (frame_width // 2, frame_height // 2)
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    center = canvas.point((frame_width // 2, frame_height // 2))
+    size = canvas.length(size)
 
     for i in range(num_frames):
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
         draw = ImageDraw.Draw(frame)
 
         angle_offset = (i / num_frames) * 360
@@ -214,21 +212,12 @@ def create_loading_spinner(
 
         elif spinner_type == 'emoji':
             # Rotating emoji spinner
-            angle = angle_offset
-            emoji_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-            draw_emoji_enhanced(
-                emoji_canvas,
-                emoji='⏳',
-                position=(center[0] - size // 2, center[1] - size // 2),
-                size=size,
-                shadow=False
-            )
-            rotated = emoji_canvas.rotate(angle, center=center, resample=Image.BICUBIC)
-            frame.paste(rotated, (0, 0), rotated)
+            paste_emoji(frame, '⏳', center, size, angle=angle_offset)
+
+        yield canvas.finish(frame)
 
-        frames.append(frame)
 
-    return frames
+create_loading_spinner = collect_frames(iter_loading_spinner)
 
 
 # Example usage
@@ -7,17 +7,21 @@ Creates playful, elastic movements that are smoother than shake.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.frame_composer import draw_emoji_enhanced
+from core.emoji_atlas import paste_emoji
 from core.easing import interpolate
 
 
-def create_wiggle_animation(
+def iter_wiggle_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -27,8 +31,10 @@ def create_wiggle_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create wiggle/wobble animation.
 
@@ -43,20 +49,26 @@ def create_wiggle_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '🎈', 'size': 100}
 
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    object_data = canvas.scale_lengths(object_data)
+    center_pos = canvas.point(center_pos)
+    width, height = canvas.size
+
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         # Calculate wiggle transformations
         offset_x = 0
@@ -123,50 +135,24 @@ def create_wiggle_animation(
             rotation = wag * 20
             offset_x = wag * 15
 
+        offset_x *= canvas.scale_x
+        offset_y *= canvas.scale_y
+
         # Apply transformations
         if object_type == 'emoji':
             size = object_data['size']
-            size_x = int(size * scale_x)
-            size_y = int(size * scale_y)
 
-            # For non-uniform scaling or rotation, we need to use PIL transforms
+            # For non-uniform scaling or rotation, use a transformed sprite
             if abs(scale_x - scale_y) > 0.01 or abs(rotation) > 0.1:
-                # Create emoji on transparent canvas
-                canvas_size = int(size * 2)
-                emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-                # Draw emoji
-                draw_emoji_enhanced(
-                    emoji_canvas,
-                    emoji=object_data['emoji'],
-                    position=(canvas_size // 2 - size // 2, canvas_size // 2 - size // 2),
+                stretch = (scale_x, scale_y) if abs(scale_x - scale_y) > 0.01 else (1.0, 1.0)
+                paste_emoji(
+                    frame,
+                    object_data['emoji'],
+                    center=(center_pos[0] + offset_x, center_pos[1] + offset_y),
                     size=size,
-                    shadow=False
+                    angle=rotation if abs(rotation) > 0.1 else 0.0,
+                    scale=stretch
                 )
-
-                # Scale
-                if abs(scale_x - scale_y) > 0.01:
-                    new_size = (int(canvas_size * scale_x), int(canvas_size * scale_y))
-                    emoji_canvas = emoji_canvas.resize(new_size, Image.LANCZOS)
-                    canvas_size_x, canvas_size_y = new_size
-                else:
-                    canvas_size_x = canvas_size_y = canvas_size
-
-                # Rotate
-                if abs(rotation) > 0.1:
-                    emoji_canvas = emoji_canvas.rotate(
-                        rotation,
-                        resample=Image.BICUBIC,
-                        expand=False
-                    )
-
-                # Position with offset
-                paste_x = int(center_pos[0] - canvas_size_x // 2 + offset_x)
-                paste_y = int(center_pos[1] - canvas_size_y // 2 + offset_y)
-
-                frame_rgba = frame.convert('RGBA')
-                frame_rgba.paste(emoji_canvas, (paste_x, paste_y), emoji_canvas)
-                frame = frame_rgba.convert('RGB')
             else:
                 # Simple case - just offset
                 pos_x = int(center_pos[0] - size // 2 + offset_x)
@@ -176,14 +162,15 @@ def create_wiggle_animation(
                     emoji=object_data['emoji'],
                     position=(pos_x, pos_y),
                     size=size,
-                    shadow=object_data.get('shadow', True)
+                    shadow=object_data.get('shadow', True),
+                    scale=canvas.scale
                 )
 
         elif object_type == 'text':
             from core.typography import draw_text_with_outline
 
             # Create text on canvas for transformation
-            canvas_size = max(frame_width, frame_height)
+            canvas_size = max(width, height)
             text_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
 
             # Convert to RGB for drawing
@@ -194,10 +181,10 @@ def create_wiggle_animation(
                 text_canvas_rgb,
                 text=object_data.get('text', 'WIGGLE'),
                 position=(canvas_size // 2, canvas_size // 2),
-                font_size=object_data.get('font_size', 50),
+                font_size=object_data.get('font_size', canvas.length(50)),
                 text_color=object_data.get('text_color', (0, 0, 0)),
                 outline_color=object_data.get('outline_color', (255, 255, 255)),
-                outline_width=3,
+                outline_width=canvas.length(3),
                 centered=True
             )
 
@@ -217,17 +204,18 @@ def create_wiggle_animation(
                 text_canvas = text_canvas.rotate(rotation, center=(canvas_size // 2, canvas_size // 2), resample=Image.BICUBIC)
 
             # Crop to frame with offset
-            left = (canvas_size - frame_width) // 2 - int(offset_x)
-            top = (canvas_size - frame_height) // 2 - int(offset_y)
-            text_cropped = text_canvas.crop((left, top, left + frame_width, top + frame_height))
+            left = (canvas_size - width) // 2 - int(offset_x)
+            top = (canvas_size - height) // 2 - int(offset_y)
+            text_cropped = text_canvas.crop((left, top, left + width, top + height))
 
             frame_rgba = frame.convert('RGBA')
             frame = Image.alpha_composite(frame_rgba, text_cropped)
             frame = frame.convert('RGB')
 
-        frames.append(frame)
+        yield canvas.finish(frame)
+
 
-    return frames
+create_wiggle_animation = collect_frames(iter_wiggle_animation)
 
 
 def create_excited_wiggle(
@@ -7,17 +7,20 @@ Creates zoom in, zoom out, and dramatic scaling effects.
 
 import sys
 from pathlib import Path
+from typing import Iterator
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from PIL import Image, ImageFilter
+from PIL import Image
 from core.gif_builder import GIFBuilder
-from core.frame_composer import create_blank_frame, draw_emoji_enhanced
+from core.frame_source import collect_frames
+from core.canvas import Canvas
+from core.emoji_atlas import paste_emoji
 from core.easing import interpolate
 
 
-def create_zoom_animation(
+def iter_zoom_animation(
     object_type: str = 'emoji',
     object_data: dict | None = None,
     num_frames: int = 30,
@@ -28,8 +31,10 @@ def create_zoom_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create zoom animation.
 
@@ -45,18 +50,25 @@ def create_zoom_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '🔍', 'size': 100}
 
-    base_size = object_data.get('size', 100) if object_type == 'emoji' else object_data.get('font_size', 60)
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    width, height = canvas.size
+    object_data = canvas.scale_lengths(object_data)
+    if object_type == 'emoji':
+        base_size = object_data.get('size', canvas.length(100))
+    else:
+        base_size = object_data.get('font_size', canvas.length(60))
     start_scale, end_scale = scale_range
 
     for i in range(num_frames):
@@ -82,40 +94,22 @@ def create_zoom_animation(
             scale = interpolate(start_scale, end_scale, t, easing)
 
         # Create frame
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
         if object_type == 'emoji':
             current_size = int(base_size * scale)
 
             # Clamp size to reasonable bounds
-            current_size = max(12, min(current_size, frame_width * 2))
-
-            # Create emoji on transparent background
-            canvas_size = max(frame_width, frame_height, current_size) * 2
-            emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-            draw_emoji_enhanced(
-                emoji_canvas,
-                emoji=object_data['emoji'],
-                position=(canvas_size // 2 - current_size // 2, canvas_size // 2 - current_size // 2),
-                size=current_size,
-                shadow=False
-            )
+            current_size = max(12, min(current_size, width * 2))
 
             # Optional motion blur for fast zooms
+            blur_amount = 0
             if add_motion_blur and abs(scale - 1.0) > 0.5:
-                blur_amount = min(5, int(abs(scale - 1.0) * 3))
-                emoji_canvas = emoji_canvas.filter(ImageFilter.GaussianBlur(blur_amount))
+                blur_amount = min(5, int(abs(scale - 1.0) * 3)) * canvas.scale
 
-            # Crop to frame size centered
-            left = (canvas_size - frame_width) // 2
-            top = (canvas_size - frame_height) // 2
-            emoji_cropped = emoji_canvas.crop((left, top, left + frame_width, top + frame_height))
-
-            # Composite
-            frame_rgba = frame.convert('RGBA')
-            frame = Image.alpha_composite(frame_rgba, emoji_cropped)
-            frame = frame.convert('RGB')
+            # Sprite centered on the frame (clipped by paste if larger)
+            paste_emoji(frame, object_data['emoji'], (width // 2, height // 2),
+                        current_size, blur=blur_amount)
 
         elif object_type == 'text':
             from core.typography import draw_text_with_outline
@@ -124,7 +118,7 @@ def create_zoom_animation(
             current_size = max(10, min(current_size, 500))
 
             # Create oversized canvas for large text
-            canvas_size = max(frame_width, frame_height, current_size * 10)
+            canvas_size = max(width, height, current_size * 10)
             text_canvas = Image.new('RGB', (canvas_size, canvas_size), bg_color)
 
             draw_text_with_outline(
@@ -139,22 +133,25 @@ def create_zoom_animation(
             )
 
             # Crop to frame
-            left = (canvas_size - frame_width) // 2
-            top = (canvas_size - frame_height) // 2
-            frame = text_canvas.crop((left, top, left + frame_width, top + frame_height))
+            left = (canvas_size - width) // 2
+            top = (canvas_size - height) // 2
+            frame = text_canvas.crop((left, top, left + width, top + height))
+
+        yield canvas.finish(frame)
 
-        frames.append(frame)
 
-    return frames
+create_zoom_animation = collect_frames(iter_zoom_animation)
 
 
-def create_explosion_zoom(
+def iter_explosion_zoom(
     emoji: str = '💥',
     num_frames: int = 20,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create dramatic explosion zoom effect.
 
@@ -164,11 +161,15 @@ def create_explosion_zoom(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
+    width, height = canvas.size
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -179,52 +180,33 @@ def create_explosion_zoom(
         # Add rotation for drama
         angle = t * 360 * 2
 
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
-
-        current_size = int(100 * scale)
-        current_size = max(12, min(current_size, frame_width * 3))
-
-        # Create emoji
-        canvas_size = max(frame_width, frame_height, current_size) * 2
-        emoji_canvas = Image.new('RGBA', (canvas_size, canvas_size), (0, 0, 0, 0))
-
-        draw_emoji_enhanced(
-            emoji_canvas,
-            emoji=emoji,
-            position=(canvas_size // 2 - current_size // 2, canvas_size // 2 - current_size // 2),
-            size=current_size,
-            shadow=False
-        )
+        frame = canvas.blank(bg_color)
 
-        # Rotate
-        emoji_canvas = emoji_canvas.rotate(angle, center=(canvas_size // 2, canvas_size // 2), resample=Image.BICUBIC)
+        current_size = canvas.length(int(100 * scale))
+        current_size = max(12, min(current_size, width * 3))
 
         # Add motion blur for later frames
-        if t > 0.5:
-            blur_amount = int((t - 0.5) * 10)
-            emoji_canvas = emoji_canvas.filter(ImageFilter.GaussianBlur(blur_amount))
+        blur_amount = (int((t - 0.5) * 10) if t > 0.5 else 0) * canvas.scale
 
-        # Crop and composite
-        left = (canvas_size - frame_width) // 2
-        top = (canvas_size - frame_height) // 2
-        emoji_cropped = emoji_canvas.crop((left, top, left + frame_width, top + frame_height))
+        # Rotated, blurred sprite centered on the frame
+        paste_emoji(frame, emoji, (width // 2, height // 2), current_size,
+                    angle=angle, blur=blur_amount)
 
-        frame_rgba = frame.convert('RGBA')
-        frame = Image.alpha_composite(frame_rgba, emoji_cropped)
-        frame = frame.convert('RGB')
+        yield canvas.finish(frame)
 
-        frames.append(frame)
 
-    return frames
+create_explosion_zoom = collect_frames(iter_explosion_zoom)
 
 
-def create_mind_blown_zoom(
+def iter_mind_blown_zoom(
     emoji: str = '🤯',
     num_frames: int = 30,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
-) -> list[Image.Image]:
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    render_size: int | tuple[int, int] | None = None,
+    supersample: int = 1
+) -> Iterator[Image.Image]:
     """
     Create "mind blown" dramatic zoom with shake.
 
@@ -234,11 +216,14 @@ def create_mind_blown_zoom(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        render_size: Output size in pixels (None = frame_width x frame_height);
+            all other lengths are in frame units and scaled to it
+        supersample: Draw at this multiple of render_size to antialias shapes
 
-    Returns:
-        List of frames
+    Yields:
+        Frames, one at a time
     """
-    frames = []
+    canvas = Canvas(frame_width, frame_height, render_size, supersample)
 
     for i in range(num_frames):
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -255,28 +240,17 @@ def create_mind_blown_zoom(
             shake_x = int(math.sin(t * 50) * shake_intensity)
             shake_y = int(math.cos(t * 45) * shake_intensity)
 
-        frame = create_blank_frame(frame_width, frame_height, bg_color)
+        frame = canvas.blank(bg_color)
 
-        current_size = int(100 * scale)
-        center_x = frame_width // 2 + shake_x
-        center_y = frame_height // 2 + shake_y
+        current_size = canvas.length(int(100 * scale))
+        center = canvas.point((frame_width // 2 + shake_x, frame_height // 2 + shake_y))
 
-        emoji_canvas = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-        draw_emoji_enhanced(
-            emoji_canvas,
-            emoji=emoji,
-            position=(center_x - current_size // 2, center_y - current_size // 2),
-            size=current_size,
-            shadow=False
-        )
+        paste_emoji(frame, emoji, center, current_size)
 
-        frame_rgba = frame.convert('RGBA')
-        frame = Image.alpha_composite(frame_rgba, emoji_canvas)
-        frame = frame.convert('RGB')
+        yield canvas.finish(frame)
 
-        frames.append(frame)
 
-    return frames
+create_mind_blown_zoom = collect_frames(iter_mind_blown_zoom)
 
 
 # Example usage